@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+"""Compares the memory held by regular and compact instances.
+
+Usage: ./benchmarks/compact_layout.py [SIZE ...]
+
+For every store size (default 100000 objects) it reports the traced
+memory held by the instances after reload() and after a save(), with
+the regular classes and with the compact ones HBNB_COMPACT=1 registers.
+A save() calls to_dict() on every instance, which gives every regular
+instance a __dict__ of its own.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+import synthetic
+import models
+from models import compact
+from models.engine.file_storage import FileStorage, classes
+
+
+def measure():
+    """Returns the (seconds, MiB) of one reload() and the MiB after save().
+    """
+    FileStorage._FileStorage__objects = {}
+    tracemalloc.start()
+    start = time.perf_counter()
+    models.storage.reload()
+    elapsed = time.perf_counter() - start
+    loaded = tracemalloc.get_traced_memory()[0]
+    models.storage.save()
+    saved = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    FileStorage._FileStorage__objects = {}
+    return elapsed, loaded / 2 ** 20, saved / 2 ** 20
+
+
+def main():
+    """Prints one line per store size and layout.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sizes", type=int, nargs="*", default=[100000])
+    args = parser.parse_args()
+
+    print("{:>9} {:<8} {:>8} {:>10} {:>9} {:>6}".format(
+        "objects", "layout", "seconds", "load MiB", "save MiB", "ratio"))
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "file.json")
+            FileStorage._FileStorage__file_path = path
+            synthetic.write_store(path, synthetic.make_records(size))
+            compact.disable(classes)
+            elapsed, loaded, regular = measure()
+            print("{:>9} {:<8} {:>8.2f} {:>10.1f} {:>9.1f} {:>6.2f}".format(
+                size, "regular", elapsed, loaded, regular, 1.0))
+            compact.enable(classes)
+            elapsed, loaded, saved = measure()
+            compact.disable(classes)
+            print("{:>9} {:<8} {:>8.2f} {:>10.1f} {:>9.1f} {:>6.2f}".format(
+                size, "compact", elapsed, loaded, saved, saved / regular))
+            sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
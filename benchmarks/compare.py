@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+"""Compares two result files of suite.py.
+
+Usage: ./benchmarks/compare.py [--threshold PERCENT] [--fail] BASE NEW
+
+For every size, layer and operation found in both files it prints the
+throughput and p99 latency of each run and how much they changed.
+Operations whose throughput dropped or whose p99 latency grew by more
+than --threshold percent (default 10) are marked as regressions, and
+with --fail the script then exits with status 1.
+"""
+import sys
+import json
+import argparse
+
+
+def load(path):
+    """Returns the results of the file at path by (size, layer, op).
+    """
+    with open(path) as f:
+        results = json.load(f)["results"]
+    return {(r["size"], r["layer"], r["operation"]): r for r in results}
+
+
+def change(base, new):
+    """Returns the relative change in percent from base to new.
+    """
+    if not base or new is None:
+        return None
+    return (new - base) / base * 100
+
+
+def main():
+    """Prints one line per operation of both runs.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=10.0)
+    parser.add_argument("--fail", action="store_true",
+                        help="exit with status 1 on a regression")
+    args = parser.parse_args()
+    base, new = load(args.base), load(args.new)
+
+    print("{:>9} {:<8} {:<7} {:>12} {:>12} {:>8} {:>9} {:>9} {:>8}".format(
+        "objects", "layer", "op", "base ops/s", "new ops/s", "change",
+        "base p99", "new p99", "change"))
+    regressions = 0
+    for key in sorted(set(base) & set(new)):
+        old, now = base[key], new[key]
+        speed = change(old["throughput"], now["throughput"])
+        latency = change(old["p99_ms"], now["p99_ms"])
+        regressed = ((speed is not None and speed < -args.threshold) or
+                     (latency is not None and latency > args.threshold))
+        regressions += regressed
+        print("{:>9} {:<8} {:<7} {:>12.0f} {:>12.0f} {:>7.1f}% {:>9.3f} "
+              "{:>9.3f} {:>7.1f}%{}".format(
+                  *key, old["throughput"] or 0, now["throughput"] or 0,
+                  speed or 0, old["p99_ms"], now["p99_ms"], latency or 0,
+                  "  regression" if regressed else ""))
+    for key in sorted(set(base) ^ set(new)):
+        print("{:>9} {:<8} {:<7} only in {}".format(
+            *key, args.base if key in base else args.new))
+    if regressions:
+        print("{} regression(s) over {}%".format(regressions, args.threshold))
+    return 1 if regressions and args.fail else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+#!/usr/bin/python3
+"""Measures the memory the console's all command needs.
+
+Usage: ./benchmarks/console_all.py [SIZE ...]
+
+For every store size (default 100000 objects) it reports the time and
+the peak traced memory of `all` written to /dev/null, next to the
+list of every str() the command used to build before printing.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+import contextlib
+
+import synthetic
+import models
+from console import HBNBCommand
+from models.engine.file_storage import FileStorage
+
+
+def measure(function):
+    """Returns the (seconds, peak MiB) of function.
+    """
+    with open(os.devnull, "w") as devnull:
+        with contextlib.redirect_stdout(devnull):
+            tracemalloc.start()
+            start = time.perf_counter()
+            function()
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return elapsed, peak / 2 ** 20
+
+
+def main():
+    """Prints one line per store size and way of printing.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sizes", type=int, nargs="*", default=[100000])
+    args = parser.parse_args()
+
+    print("{:>9} {:<12} {:>8} {:>9}".format(
+        "objects", "output", "seconds", "peak MiB"))
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "file.json")
+            FileStorage._FileStorage__file_path = path
+            synthetic.write_store(path, synthetic.make_records(size))
+            FileStorage._FileStorage__objects = {}
+            models.storage.reload()
+            models.storage.all()
+            runs = (("list", lambda: print(
+                        [str(v) for v in models.storage.all().values()])),
+                    ("all", lambda: HBNBCommand().onecmd("all")),
+                    ("all --lines", lambda: HBNBCommand().onecmd(
+                        "all --lines")))
+            for name, function in runs:
+                elapsed, peak = measure(function)
+                print("{:>9} {:<12} {:>8.2f} {:>9.1f}".format(
+                    size, name, elapsed, peak))
+                sys.stdout.flush()
+            FileStorage._FileStorage__objects = {}
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+"""Measures the per-command overhead of the console's dispatch.
+
+Usage: ./benchmarks/console_dispatch.py [LINES ...]
+
+For every script length (default 1000000 lines) it runs a mix of
+<class>.<command>(<arguments>) and plain command lines through
+precmd() and onecmd(), the way cmdloop() and --batch do. The handlers
+are stubbed, so the time is the parsing and dispatch alone.
+"""
+import os
+import sys
+import time
+import argparse
+import contextlib
+
+import synthetic  # noqa: F401
+from console import HBNBCommand
+
+templates = ('User.show("{id}")',
+             'User.update("{id}", "first_name", "Betty")',
+             'User.update("{id}", {{"age": 89, "city": "SF"}})',
+             'User.count()',
+             'show User {id}',
+             'update User {id} first_name "Betty"')
+
+
+class Stubbed(HBNBCommand):
+    """The console with handlers that do nothing.
+    """
+
+    def do_show(self, arg):
+        """Does nothing.
+        """
+
+    def do_update(self, arg):
+        """Does nothing.
+        """
+
+    def do_count(self, arg):
+        """Does nothing.
+        """
+
+
+def main():
+    """Prints one line per script length.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sizes", type=int, nargs="*", default=[1000000])
+    args = parser.parse_args()
+
+    print("{:>9} {:>8} {:>12}".format("lines", "seconds", "us per line"))
+    for size in args.sizes:
+        lines = [templates[i % len(templates)].format(
+            id="1f9a1d2e-8c1b-4f6e-9d0a-0b6c2f1e3a4d")
+            for i in range(size)]
+        console = Stubbed()
+        with open(os.devnull, "w") as devnull:
+            with contextlib.redirect_stdout(devnull):
+                start = time.perf_counter()
+                for line in lines:
+                    console.onecmd(console.precmd(line))
+                elapsed = time.perf_counter() - start
+        print("{:>9} {:>8.2f} {:>12.2f}".format(
+            size, elapsed, elapsed / size * 10 ** 6))
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/python3
+"""Compares the FileStorage fsync policies.
+
+Usage: ./benchmarks/fsync_policies.py [-n OBJECTS] [-s SAVES]
+
+For every policy it times single-object saves against a store of
+OBJECTS instances, both as full snapshots and as journal appends.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+import models  # noqa: E402
+from models.engine.durability import FsyncPolicy, policies  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.user import User  # noqa: E402
+
+
+def run(policy, journaled, objects, saves):
+    """Returns the mean latency in ms of `saves` single-object saves.
+    """
+    storage = models.storage
+    FileStorage._FileStorage__objects = {}
+    users = [User() for _ in range(objects)]
+    storage.fsync = FsyncPolicy(policy, interval=0.05)
+    storage.journaled = journaled
+    storage.save()
+    start = time.perf_counter()
+    for i in range(saves):
+        users[i % objects].first_name = str(i)
+        storage.save()
+    storage.fsync.close()
+    return (time.perf_counter() - start) * 1000 / saves
+
+
+def main():
+    """Prints one line per policy and save mode.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--objects", type=int, default=10000)
+    parser.add_argument("-s", "--saves", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        FileStorage._FileStorage__file_path = os.path.join(tmp, "file.json")
+        print("{:<8} {:<10} {:>12}".format("policy", "mode", "ms/save"))
+        for policy in policies:
+            for journaled in (False, True):
+                ms = run(policy, journaled, args.objects, args.saves)
+                print("{:<8} {:<10} {:>12.3f}".format(
+                    policy, "journal" if journaled else "snapshot", ms))
+
+
+if __name__ == "__main__":
+    main()
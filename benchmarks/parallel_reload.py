@@ -0,0 +1,66 @@
+#!/usr/bin/python3
+"""Compares the serial and the parallel reload of a sharded FileStorage.
+
+Usage: ./benchmarks/parallel_reload.py [-w WORKERS] [-b BUCKETS] [SIZE ...]
+
+For every store size (default 100000 1000000 5000000 objects) it times
+reload() of a directory of BUCKETS shards per class, serially and with
+the shards parsed on WORKERS processes (default: one per CPU), next to
+the reload of the same objects from a single file.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import synthetic
+import models
+from models.engine.file_storage import FileStorage
+
+
+def time_reload(workers, shards):
+    """Returns the seconds taken by one reload().
+    """
+    storage = models.storage
+    storage.workers = workers
+    storage.shards = shards
+    FileStorage._FileStorage__objects = {}
+    start = time.perf_counter()
+    storage.reload()
+    elapsed = time.perf_counter() - start
+    FileStorage._FileStorage__objects = {}
+    return elapsed
+
+
+def main():
+    """Prints one line per store size and layout.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count())
+    parser.add_argument("-b", "--buckets", type=int, default=4)
+    parser.add_argument("sizes", type=int, nargs="*",
+                        default=[100000, 1000000, 5000000])
+    args = parser.parse_args()
+
+    print("{:>9} {:<8} {:>10} {:>10} {:>8}".format(
+        "objects", "layout", "serial s", "parallel s", "speedup"))
+    for size in args.sizes:
+        records = synthetic.make_records(size)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "file.json")
+            FileStorage._FileStorage__file_path = path
+            synthetic.write_store(path, records)
+            synthetic.write_store(path, records, shards=args.buckets)
+            del records
+            single = time_reload(0, 0)
+            print("{:>9} {:<8} {:>10.2f}".format(size, "file", single))
+            serial = time_reload(0, args.buckets)
+            par = time_reload(args.workers, args.buckets)
+            print("{:>9} {:<8} {:>10.2f} {:>10.2f} {:>7.2f}x".format(
+                size, "shards", serial, par, serial / par))
+            sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
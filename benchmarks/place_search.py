@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+"""Compares storage.search() with a scan of the Place instances.
+
+Usage: ./benchmarks/place_search.py [SIZE ...]
+
+For every store size (default 100000 objects) it times a price range
+and guest count filter over the numeric columns, over the attributes
+of the instances all_of() returns, and through storage.query().
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import synthetic
+import models
+from models.engine.file_storage import FileStorage
+
+
+def scan(storage):
+    """Returns the ids of the matching places, read off the instances.
+    """
+    return [v.id for v in storage.all_of("Place").values()
+            if 100 <= v.price_by_night <= 200 and v.max_guest >= 4]
+
+
+def search(storage):
+    """Returns the ids of the matching places, read off the columns.
+    """
+    return storage.search("Place", price_by_night=(100, 200),
+                          max_guest=(4, None))
+
+
+def query(storage):
+    """Returns the ids of the matching places, through a query.
+    """
+    return [v.id for v in storage.query("Place").where(
+        price_by_night__ge=100, price_by_night__le=200, max_guest__ge=4)]
+
+
+def best(function, repeat=5):
+    """Returns the fastest of repeat runs of function in seconds.
+    """
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        function(models.storage)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    """Prints one line per store size.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sizes", type=int, nargs="*", default=[100000])
+    args = parser.parse_args()
+
+    print("{:>9} {:>7} {:>9} {:>9} {:>8} {:>8}".format(
+        "objects", "matches", "scan ms", "search ms", "query ms", "speedup"))
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "file.json")
+            FileStorage._FileStorage__file_path = path
+            synthetic.write_store(path, synthetic.make_records(size))
+            FileStorage._FileStorage__objects = {}
+            models.storage.reload()
+            assert sorted(scan(models.storage)) == sorted(
+                search(models.storage)) == sorted(query(models.storage))
+            scanned = best(scan)
+            searched = best(search)
+            queried = best(query)
+            print("{:>9} {:>7} {:>9.2f} {:>9.2f} {:>8.2f} {:>8.1f}".format(
+                size, len(search(models.storage)), scanned * 1000,
+                searched * 1000, queried * 1000, scanned / searched))
+            sys.stdout.flush()
+            FileStorage._FileStorage__objects = {}
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+"""Measures the cold start of the console on a JSON and a snapshot store.
+
+Usage: ./benchmarks/snapshot_startup.py [SIZE ...]
+
+For every store size (default 10000 100000 objects) it starts a fresh
+interpreter per format that imports models (which reloads the store)
+and then shows one Place, and reports the time of each step and the
+peak resident memory of the process (Linux only).
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+import synthetic
+
+CHILD = """
+import json, time
+start = time.perf_counter()
+import models
+loaded = time.perf_counter()
+obj = models.storage.get("Place", {id!r})
+shown = time.perf_counter()
+with open("/proc/self/status") as f:
+    peak = next(int(line.split()[1]) for line in f
+                if line.startswith("VmHWM:"))
+print(json.dumps([loaded - start, shown - loaded, str(obj) != "None", peak]))
+"""
+
+
+def main():
+    """Prints one line per store size and format.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sizes", type=int, nargs="*", default=[10000, 100000])
+    args = parser.parse_args()
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    print("{:>9} {:<9} {:>10} {:>10} {:>8}".format(
+        "objects", "format", "import s", "show ms", "peak MiB"))
+    for size in args.sizes:
+        records = synthetic.make_records(size)
+        place = next(k for k in records if k.startswith("Place."))
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, extension in (("json", ".json"),
+                                    ("snapshot", ".snap")):
+                path = os.path.join(tmp, "file" + extension)
+                synthetic.write_store(path, records, format=name)
+                env = dict(os.environ, HBNB_STORAGE_PATH=path,
+                           PYTHONPATH=root)
+                env.pop("HBNB_STORAGE_FORMAT", None)
+                output = subprocess.run(
+                    [sys.executable, "-c", CHILD.format(
+                        id=place.partition('.')[2])],
+                    env=env, cwd=tmp, capture_output=True, text=True,
+                    check=True).stdout
+                loaded, shown, found, rss = json.loads(output)
+                print("{:>9} {:<9} {:>10.3f} {:>10.3f} {:>8.1f}".format(
+                    size, name, loaded, shown * 1000, rss / 1024))
+                sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+"""Compares the peak memory of the regular and the streaming reload.
+
+Usage: ./benchmarks/streaming_reload.py [SIZE ...]
+
+For every store size (default 100000 objects) it reports the traced
+memory held by the loaded instances and the peak traced memory during
+reload(), with and without HBNB_STORAGE_STREAMING.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+import synthetic
+import models
+from models.engine.file_storage import FileStorage
+
+
+def measure(streaming):
+    """Returns the (seconds, final MiB, peak MiB) of one reload().
+    """
+    storage = models.storage
+    storage.streaming = streaming
+    FileStorage._FileStorage__objects = {}
+    tracemalloc.start()
+    start = time.perf_counter()
+    storage.reload()
+    elapsed = time.perf_counter() - start
+    final, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    FileStorage._FileStorage__objects = {}
+    return elapsed, final / 2 ** 20, peak / 2 ** 20
+
+
+def main():
+    """Prints one line per store size and mode.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sizes", type=int, nargs="*", default=[100000])
+    args = parser.parse_args()
+
+    print("{:>9} {:<10} {:>8} {:>10} {:>9} {:>6}".format(
+        "objects", "mode", "seconds", "final MiB", "peak MiB", "ratio"))
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "file.json")
+            FileStorage._FileStorage__file_path = path
+            synthetic.write_store(path, synthetic.make_records(size))
+            for streaming in (False, True):
+                elapsed, final, peak = measure(streaming)
+                print("{:>9} {:<10} {:>8.2f} {:>10.1f} {:>9.1f} {:>6.2f}"
+                      .format(size, "streaming" if streaming else "json.load",
+                              elapsed, final, peak, peak / final))
+                sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
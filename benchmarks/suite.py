@@ -0,0 +1,254 @@
+#!/usr/bin/python3
+"""Times every storage and console operation over synthetic stores.
+
+Usage: ./benchmarks/suite.py [-o RESULTS.json] [--calls N] [--repeat N]
+                             [SIZE ...]
+
+For every store size (default 1000 10000 100000 objects of every
+class, see synthetic.weights) it times, through FileStorage and through
+the console (output to /dev/null):
+
+- reload, and save with every instance changed, --repeat times;
+- create, show, all and count, one class after the other;
+  show and count --calls times, create and all --repeat times
+  on the console since they print or save the whole store.
+
+Each operation reports its throughput (objects or calls per second),
+its p50, p95 and p99 latencies and the peak memory tracemalloc sees
+during one more run, kept apart from the timed ones. The storage is
+configured by the usual HBNB_* variables, which the results record.
+
+With -o the results are also written as JSON for compare.py.
+"""
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import contextlib
+from datetime import datetime
+
+import synthetic
+import models
+from console import HBNBCommand
+from models.engine.file_storage import FileStorage, classes
+
+units = {"objects": "obj/s", "calls": "op/s"}
+
+
+def percentile(samples, p):
+    """Returns the nearest-rank p-th percentile of sorted samples.
+    """
+    return samples[max(0, math.ceil(p / 100 * len(samples)) - 1)]
+
+
+def summarize(samples, items):
+    """Returns the throughput and latencies (ms) of samples in seconds,
+    each of them processing `items` objects or calls.
+    """
+    ordered = sorted(samples)
+    total = sum(samples)
+    return {"samples": len(samples),
+            "throughput": items * len(samples) / total if total else None,
+            "mean_ms": total / len(samples) * 1000,
+            "p50_ms": percentile(ordered, 50) * 1000,
+            "p95_ms": percentile(ordered, 95) * 1000,
+            "p99_ms": percentile(ordered, 99) * 1000,
+            "max_ms": ordered[-1] * 1000}
+
+
+def peak(function):
+    """Returns the peak MiB tracemalloc sees while function runs.
+    """
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1] / 2 ** 20
+    finally:
+        tracemalloc.stop()
+
+
+def run(calls, setup=None):
+    """Returns the seconds each of calls took, calling setup untimed
+    before each of them.
+    """
+    samples = []
+    for call in calls:
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def reload():
+    """Drops every instance and reads the store again.
+    """
+    FileStorage._FileStorage__objects = {}
+    models.storage.reload()
+    models.storage.all()
+
+
+class Suite():
+    """The operations of one store size.
+    """
+
+    def __init__(self, size, records, calls, repeat, seed):
+        """Keeps the keys of records to look up.
+        """
+        self.size = size
+        self.calls = calls
+        self.repeat = repeat
+        rng = random.Random(seed)
+        keys = list(records)
+        self.keys = [k.split('.') for k in rng.choices(keys, k=calls)]
+        self.names = [list(classes)[i % len(classes)] for i in range(
+            max(calls, repeat))]
+        self.console = HBNBCommand()
+        self.results = []
+
+    def measure(self, layer, operation, unit, calls, setup=None,
+                items=1, cleanup=None):
+        """Times calls and then one more of them under tracemalloc.
+        """
+        samples = run(calls, setup)
+        if cleanup is not None:
+            cleanup()
+        if setup is not None:
+            setup()
+        memory = peak(calls[0])
+        if cleanup is not None:
+            cleanup()
+        result = {"size": self.size, "layer": layer,
+                  "operation": operation, "unit": unit}
+        result.update(summarize(samples, items))
+        result["peak_mib"] = memory
+        self.results.append(result)
+        return result
+
+    def created(self, before):
+        """Deletes the instances created since the keys in before.
+        """
+        for key in set(models.storage.all()) - before:
+            models.storage.delete(models.storage.all()[key])
+
+    def touch(self):
+        """Flags every instance as changed, so that a save encodes
+        all of them again.
+        """
+        for obj in models.storage.all().values():
+            models.storage.touch(obj)
+
+    def storage(self):
+        """Times the FileStorage operations.
+        """
+        storage = models.storage
+        self.measure("storage", "reload", "objects",
+                     [reload] * self.repeat, items=self.size)
+        self.measure("storage", "save", "objects", [storage.save] *
+                     self.repeat, setup=self.touch, items=self.size)
+        self.measure("storage", "show", "calls",
+                     [lambda n=n, i=i: storage.get(n, i)
+                      for n, i in self.keys])
+        self.measure("storage", "all", "calls",
+                     [lambda n=n: list(storage.all_of(n).values())
+                      for n in self.names[:self.calls]])
+        self.measure("storage", "count", "calls",
+                     [lambda n=n: storage.count(n)
+                      for n in self.names[:self.calls]])
+        before = set(storage.all())
+        self.measure("storage", "create", "calls",
+                     [classes[n] for n in self.names[:self.calls]],
+                     cleanup=lambda: self.created(before))
+
+    def commands(self):
+        """Times the console commands.
+        """
+        onecmd = self.console.onecmd
+        precmd = self.console.precmd
+        self.measure("console", "show", "calls",
+                     [lambda n=n, i=i: onecmd(precmd("show {} {}".format(
+                         n, i))) for n, i in self.keys])
+        self.measure("console", "all", "calls",
+                     [lambda n=n: onecmd(precmd("all {}".format(n)))
+                      for n in self.names[:self.repeat]])
+        self.measure("console", "count", "calls",
+                     [lambda n=n: onecmd(precmd("{}.count()".format(n)))
+                      for n in self.names[:self.calls]])
+        before = set(models.storage.all())
+        self.measure("console", "create", "calls",
+                     [lambda n=n: onecmd(precmd("create {}".format(n)))
+                      for n in self.names[:self.repeat]],
+                     cleanup=lambda: self.created(before))
+        models.storage.save()
+
+
+def settings():
+    """Returns the HBNB_* variables the storage was configured with.
+    """
+    return {k: v for k, v in sorted(os.environ.items())
+            if k.startswith("HBNB_")}
+
+
+def main():
+    """Prints one line per size, layer and operation.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sizes", type=int, nargs="*",
+                        default=[1000, 10000, 100000])
+    parser.add_argument("-o", "--output", help="JSON file of the results")
+    parser.add_argument("--calls", type=int, default=1000,
+                        help="timed calls of the cheap operations")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="timed calls of the whole store operations")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if args.calls < 1 or args.repeat < 1:
+        parser.error("--calls and --repeat must be positive")
+
+    print("{:>9} {:<8} {:<7} {:>14} {:>9} {:>9} {:>9} {:>9}".format(
+        "objects", "layer", "op", "throughput", "p50 ms", "p95 ms",
+        "p99 ms", "peak MiB"))
+    results = []
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "file.json")
+            FileStorage._FileStorage__file_path = path
+            records = synthetic.make_records(size, args.seed)
+            synthetic.write_store(path, records)
+            reload()
+            suite = Suite(size, records, args.calls, args.repeat, args.seed)
+            del records
+            with open(os.devnull, "w") as devnull:
+                with contextlib.redirect_stdout(devnull):
+                    suite.storage()
+                    suite.commands()
+            models.storage.flush()
+            for r in suite.results:
+                print("{:>9} {:<8} {:<7} {:>8.0f} {:<5} {:>9.3f} {:>9.3f} "
+                      "{:>9.3f} {:>9.1f}".format(
+                          size, r["layer"], r["operation"],
+                          r["throughput"] or 0, units[r["unit"]], r["p50_ms"],
+                          r["p95_ms"], r["p99_ms"], r["peak_mib"]))
+                sys.stdout.flush()
+            results.extend(suite.results)
+            FileStorage._FileStorage__objects = {}
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"python": platform.python_version(),
+                       "platform": platform.platform(),
+                       "date": datetime.now().isoformat(),
+                       "settings": settings(),
+                       "calls": args.calls, "repeat": args.repeat,
+                       "seed": args.seed, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+"""Synthetic stores for the benchmarks.
+"""
+import os
+import sys
+import uuid
+import random
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from models.engine import serializers  # noqa: E402
+from models.engine.shards import shard_of, shard_path  # noqa: E402
+
+weights = {'User': 10, 'State': 1, 'City': 4, 'Amenity': 1,
+           'Place': 20, 'Review': 60, 'BaseModel': 4}
+
+
+def make_record(name, rng):
+    """Returns the to_dict() of a random `name` instance.
+    """
+    created = datetime(2023, 1, 1) + timedelta(
+        seconds=rng.randrange(10 ** 7), microseconds=rng.randrange(10 ** 6))
+    record = {"id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+              "created_at": created.isoformat(),
+              "updated_at": (created + timedelta(days=1)).isoformat()}
+    if name == "User":
+        record.update(email="user{}@mail.com".format(rng.randrange(10 ** 6)),
+                      password="pwd", first_name="Betty",
+                      last_name="Holberton")
+    elif name in ("State", "Amenity"):
+        record["name"] = "name{}".format(rng.randrange(10 ** 6))
+    elif name == "City":
+        record.update(name="city", state_id=str(uuid.uuid4()))
+    elif name == "Place":
+        record.update(name="place", city_id=str(uuid.uuid4()),
+                      user_id=str(uuid.uuid4()), description="A nice place",
+                      number_rooms=rng.randrange(1, 8),
+                      number_bathrooms=rng.randrange(1, 4),
+                      max_guest=rng.randrange(1, 12),
+                      price_by_night=rng.randrange(20, 500),
+                      latitude=rng.uniform(-90, 90),
+                      longitude=rng.uniform(-180, 180))
+    elif name == "Review":
+        record.update(text="Great stay", place_id=str(uuid.uuid4()),
+                      user_id=str(uuid.uuid4()))
+    record["__class__"] = name
+    return record
+
+
+def make_records(count, seed=0):
+    """Returns `count` records of every class by key.
+    """
+    rng = random.Random(seed)
+    names = rng.choices(list(weights), list(weights.values()), k=count)
+    records = {}
+    for name in names:
+        record = make_record(name, rng)
+        records["{}.{}".format(name, record["id"])] = record
+    return records
+
+
+def write_store(path, records, shards=0, format="json"):
+    """Writes records as a FileStorage file at path,
+    or as its shard directory when shards > 0.
+    """
+    serializer = serializers.serializers[format]()
+    if not shards:
+        with open(path, 'w' + serializer.mode) as f:
+            serializer.dump(((k, serializer.encode_record(v))
+                             for k, v in records.items()), f)
+        return
+    groups = {}
+    for k in records:
+        groups.setdefault(shard_of(k, shards), []).append(k)
+    os.makedirs(path + ".d", exist_ok=True)
+    for shard, keys in groups.items():
+        with open(shard_path(path + ".d", shard, serializer.extension),
+                  'w' + serializer.mode) as f:
+            serializer.dump(((k, serializer.encode_record(records[k]))
+                             for k in keys), f)
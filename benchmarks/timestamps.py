@@ -0,0 +1,62 @@
+#!/usr/bin/python3
+"""Times building instances from records and turning them back.
+
+Usage: ./benchmarks/timestamps.py [SIZE ...]
+
+For every size (default 100000 records) it reports the best of five
+runs of building the instances from their to_dict() records, of
+to_dict() on untouched instances, and of to_dict() once created_at
+and updated_at were read.
+"""
+import sys
+import time
+import argparse
+
+import synthetic
+from models.engine.file_storage import classes
+
+
+def best(function, repeat=5):
+    """Returns the fastest of repeat runs of function in seconds.
+    """
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    """Prints one line per size.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sizes", type=int, nargs="*", default=[100000])
+    args = parser.parse_args()
+
+    print("{:>9} {:>9} {:>11} {:>12}".format(
+        "records", "build ms", "to_dict ms", "read+to_dict"))
+    for size in args.sizes:
+        records = list(synthetic.make_records(size).items())
+        objs = []
+
+        def build():
+            objs[:] = [classes[k.partition('.')[0]](**v)
+                       for k, v in records]
+
+        def to_dict():
+            for obj in objs:
+                obj.to_dict()
+
+        built = best(build)
+        untouched = best(to_dict)
+        for obj in objs:
+            obj.created_at, obj.updated_at
+        read = best(to_dict)
+        print("{:>9} {:>9.1f} {:>11.1f} {:>12.1f}".format(
+            size, built * 1000, untouched * 1000, read * 1000))
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,20 +2,20 @@
 """console module.
 """
 import re
+import ast
 import cmd
+import sys
 import json
+import time
+import itertools
 from models import storage
-from models.base_model import BaseModel
-from models.user import User
-from models.state import State
-from models.city import City
-from models.review import Review
-from models.amenity import Amenity
-from models.place import Place
+from models.engine import metrics
+from models.engine.file_storage import classes as curr_classes
 
-curr_classes = {'BaseModel': BaseModel,
-                'User': User, 'Amenity': Amenity, 'City': City, 'State': State,
-                'Place': Place, 'Review': Review}
+CALL = re.compile(r"(\w+)\.(\w+)\((.*)\)")
+QUERY = re.compile(r"\s*(\w+)\.(where\(.*\))\s*$")
+QUOTES = re.compile("[\"\']")
+JSON_OBJECT = re.compile(r"{.*}")
 
 
 class HBNBCommand(cmd.Cmd):
@@ -23,44 +23,56 @@ class HBNBCommand(cmd.Cmd):
     """
 
     prompt = "(hbnb) "
+    errors = 0
+    batch = False
+    __parsed = None
 
+    @metrics.timed("console.precmd")
     def precmd(self, line):
         """Defines instructions to execute.
         """
         if not line:
             return '\n'
 
-        pattern = re.compile(r"(\w+)\.(\w+)\((.*)\)")
-        match_list = pattern.findall(line)
-        if not match_list:
+        command = tokenize(line)
+        if command is None:
             return super().precmd(line)
+        line = "{} {}".format(*command)
+        self.__parsed = (line, command)
+        return line
 
-        match_tuple = match_list[0]
-        if not match_tuple[2]:
-            if match_tuple[1] == "count":
-                instance_objs = storage.all()
-                print(len([
-                    v for _, v in instance_objs.items()
-                    if type(v).__name__ == match_tuple[0]]))
-                return "\n"
-            return "{} {}".format(match_tuple[1], match_tuple[0])
+    def onecmd(self, line):
+        """Runs line, timing it by command while metrics are enabled.
+        """
+        if not metrics.enabled:
+            return self.__dispatch(line)
+        parsed = self.__parsed
+        if parsed is not None and parsed[0] is line:
+            name = parsed[1][0]
         else:
-            args = match_tuple[2].split(", ")
-            if len(args) == 1:
-                return "{} {} {}".format(
-                    match_tuple[1], match_tuple[0],
-                    re.sub("[\"\']", "", match_tuple[2]))
-            else:
-                match_json = re.findall(r"{.*}", match_tuple[2])
-                if (match_json):
-                    return "{} {} {} {}".format(
-                        match_tuple[1], match_tuple[0],
-                        re.sub("[\"\']", "", args[0]),
-                        re.sub("\'", "\"", match_json[0]))
-                return "{} {} {} {} {}".format(
-                    match_tuple[1], match_tuple[0],
-                    re.sub("[\"\']", "", args[0]),
-                    re.sub("[\"\']", "", args[1]), args[2])
+            name = self.parseline(line)[0] or "emptyline"
+        if name != "emptyline" and not hasattr(self, "do_" + name):
+            name = "default"
+        start = time.perf_counter()
+        try:
+            return self.__dispatch(line)
+        finally:
+            metrics.record("console." + name, time.perf_counter() - start)
+
+    def __dispatch(self, line):
+        """Runs line, calling the handler precmd() parsed it for directly,
+        after picking up what other processes saved in the meantime.
+        """
+        storage.refresh()
+        parsed, self.__parsed = self.__parsed, None
+        if parsed is None or parsed[0] is not line:
+            return super().onecmd(line)
+        name, arg = parsed[1]
+        self.lastcmd = line
+        handler = getattr(self, "do_" + name, None)
+        if handler is None:
+            return self.default(line)
+        return handler(arg)
 
     def do_help(self, arg):
         """help method- type help to get help using commands.
@@ -71,13 +83,37 @@ class HBNBCommand(cmd.Cmd):
         """Inbuilt EOF command to catch errors.
         """
         print("")
-        return True
+        return self.do_quit(line)
 
     def do_quit(self, arg):
         """Quit command to exit the program.
         """
+        if not self.batch:
+            storage.close()
         return True
 
+    def do_begin(self, arg):
+        """Defers saves until commit: begin [max_saves] [max_seconds]
+        """
+        args = arg.split()
+        try:
+            max_saves = int(args[0]) if len(args) > 0 else None
+            max_seconds = float(args[1]) if len(args) > 1 else None
+        except ValueError:
+            print_error("** invalid syntax")
+            return
+        storage.begin(max_saves, max_seconds)
+
+    def do_commit(self, arg):
+        """Writes the saves deferred since begin.
+        """
+        storage.commit()
+
+    def default(self, line):
+        """Reports a line that is no command.
+        """
+        print_error("*** Unknown syntax: {}".format(line))
+
     def emptyline(self):
         """Override default.
         """
@@ -101,11 +137,9 @@ class HBNBCommand(cmd.Cmd):
         if not validate_classname(args, check_id=True):
             return
 
-        instance_objs = storage.all()
-        key = "{}.{}".format(args[0], args[1])
-        req_instance = instance_objs.get(key, None)
+        req_instance = storage.get(args[0], args[1])
         if req_instance is None:
-            print("** no instance found **")
+            print_error("** no instance found **")
             return
         print(req_instance)
 
@@ -116,32 +150,80 @@ class HBNBCommand(cmd.Cmd):
         if not validate_classname(args, check_id=True):
             return
 
-        instance_objs = storage.all()
-        key = "{}.{}".format(args[0], args[1])
-        req_instance = instance_objs.get(key, None)
+        req_instance = storage.get(args[0], args[1])
         if req_instance is None:
-            print("** no instance found **")
+            print_error("** no instance found **")
             return
 
-        del instance_objs[key]
+        storage.delete(req_instance)
         storage.save()
 
     def do_all(self, arg):
-        """Prints string rep of all instances.
+        """Prints string rep of all instances:
+        all [class] [--offset N] [--limit N] [--after ID] [--lines]
         """
         args = arg.split()
-        all_objs = storage.all()
+        try:
+            options = parse_all_options(args)
+        except ValueError:
+            print_error("** invalid syntax")
+            return
 
         if len(args) < 1:
-            print(["{}".format(str(v)) for _, v in all_objs.items()])
+            write_all(storage.all().values(), **options)
             return
         if args[0] not in curr_classes.keys():
-            print("** class doesn't exist **")
+            print_error("** class doesn't exist **")
+            return
+        else:
+            write_all(storage.all_of(args[0]).values(), **options)
             return
+
+    def do_stats(self, arg):
+        """Prints the metrics recorded so far: stats [on|off|reset]
+        """
+        if arg.strip() == "on":
+            metrics.enable()
+        elif arg.strip() == "off":
+            metrics.disable()
+        elif arg.strip() == "reset":
+            metrics.reset()
+        elif arg.strip():
+            print_error("** invalid syntax")
         else:
-            print(["{}".format(str(v))
-                  for _, v in all_objs.items() if type(v).__name__ == args[0]])
+            write_stats(metrics.snapshot())
+
+    def do_count(self, arg):
+        """Prints the number of instances: count [class]
+        """
+        args = arg.split()
+        if args and not validate_classname(args):
+            return
+        print(storage.count(args[0] if args else None))
+
+    def do_where(self, arg):
+        """Prints the instances matching a query: <class>.where(field=value,
+        field__lt=value, ...)[.order_by(field, "-field")][.offset(n)]
+        [.limit(n)][.only(field, ...)][.count()]
+        """
+        args = arg.split(maxsplit=1)
+        if not validate_classname(args):
+            return
+        text = args[1].strip() if len(args) > 1 else ""
+        count = text.endswith(".count()")
+        if count:
+            text = text[:-len(".count()")]
+        try:
+            query = build_query(storage.query(args[0]), text)
+        except (SyntaxError, ValueError, TypeError):
+            print_error("** invalid syntax")
             return
+        if count:
+            print(query.count())
+        elif query.fields is None:
+            write_all(query)
+        else:
+            print(list(query))
 
     def do_update(self, arg: str):
         """Updates instances based on the class name and id.
@@ -150,23 +232,22 @@ class HBNBCommand(cmd.Cmd):
         if not validate_classname(args, check_id=True):
             return
 
-        instance_objs = storage.all()
-        key = "{}.{}".format(args[0], args[1])
-        req_instance = instance_objs.get(key, None)
+        req_instance = storage.get(args[0], args[1])
         if req_instance is None:
-            print("** no instance found **")
+            print_error("** no instance found **")
             return
 
-        match_json = re.findall(r"{.*}", arg)
+        match_json = JSON_OBJECT.findall(arg)
         if match_json:
             payload = None
             try:
                 payload: dict = json.loads(match_json[0])
             except Exception:
-                print("** invalid syntax")
+                print_error("** invalid syntax")
                 return
             for k, v in payload.items():
                 setattr(req_instance, k, v)
+            storage.new(req_instance)
             storage.save()
             return
         if not validate_attrs(args):
@@ -177,20 +258,88 @@ class HBNBCommand(cmd.Cmd):
         else:
             value_list = args[3].split()
             setattr(req_instance, args[2], parse_str(value_list[0]))
+        storage.new(req_instance)
         storage.save()
 
 
+def tokenize(line):
+    """Returns the (command, argument) pair `line` stands for when it is
+    written <class>.<command>(<arguments>), None otherwise.
+    """
+    query = QUERY.match(line)
+    if query:
+        return "where", "{} {}".format(query.group(1), query.group(2))
+
+    call = CALL.search(line)
+    if call is None:
+        return None
+    name, command, arguments = call.groups()
+    if not arguments:
+        return command, name
+    args = arguments.split(", ")
+    if len(args) == 1:
+        return command, "{} {}".format(name, QUOTES.sub("", arguments))
+    payload = JSON_OBJECT.search(arguments)
+    if payload:
+        return command, "{} {} {}".format(
+            name, QUOTES.sub("", args[0]),
+            payload.group().replace("\'", "\""))
+    return command, "{} {} {} {}".format(
+        name, QUOTES.sub("", args[0]), QUOTES.sub("", args[1]),
+        args[2] if len(args) > 2 else "")
+
+
+def print_error(message):
+    """Prints an error `message` and counts it in HBNBCommand.errors.
+    """
+    HBNBCommand.errors += 1
+    print(message)
+
+
+def run_batch(stream):
+    """Runs the commands read from `stream` as one transaction:
+    saves are deferred until the last line and written at once, the
+    first failing command stops the run and drops every change made
+    since the start. Returns the exit status.
+    """
+    console = HBNBCommand()
+    console.batch = True
+    errors = HBNBCommand.errors
+    failed = None
+    storage.begin()
+    for number, line in enumerate(stream, 1):
+        try:
+            stop = console.onecmd(console.precmd(line.rstrip("\n")))
+        except Exception as e:
+            HBNBCommand.errors += 1
+            print("*** {}: {}".format(type(e).__name__, e), file=sys.stderr)
+            stop = False
+        if HBNBCommand.errors != errors:
+            failed = number
+            break
+        if stop:
+            break
+    if failed is not None:
+        storage.rollback()
+        print("** line {}: rolled back".format(failed), file=sys.stderr)
+        storage.close()
+        return 1
+    storage.commit()
+    storage.close()
+    return 0
+
+
 def validate_classname(args, check_id=False):
     """Runs checks on arguments to validate classname entry.
     """
     if len(args) < 1:
-        print("** class name missing **")
+        print_error("** class name missing **")
         return False
     if args[0] not in curr_classes.keys():
-        print("** class doesn't exist **")
+        print_error("** class doesn't exist **")
         return False
     if len(args) < 2 and check_id:
-        print("** instance id missing **")
+        print_error("** instance id missing **")
         return False
     return True
 
@@ -200,14 +349,107 @@ def validate_attrs(args):
     validate classname attributes and values.
     """
     if len(args) < 3:
-        print("** attribute name missing **")
+        print_error("** attribute name missing **")
         return False
     if len(args) < 4:
-        print("** value missing **")
+        print_error("** value missing **")
         return False
     return True
 
 
+def parse_all_options(args):
+    """Removes the --offset, --limit, --after and --lines options
+    from `args` and returns them by name.
+    """
+    options = {"offset": 0, "limit": None, "after": None, "lines": False}
+    rest = []
+    words = iter(args)
+    for word in words:
+        if word == "--lines":
+            options["lines"] = True
+        elif word in ("--offset", "--limit"):
+            value = int(next(words, ""))
+            if value < 0:
+                raise ValueError("{} must be positive".format(word))
+            options[word[2:]] = value
+        elif word == "--after":
+            options["after"] = next(words, None)
+            if options["after"] is None:
+                raise ValueError("--after needs an id")
+        elif word.startswith("--"):
+            raise ValueError("unknown option {}".format(word))
+        else:
+            rest.append(word)
+    args[:] = rest
+    return options
+
+
+def write_all(objs, offset=0, limit=None, after=None, lines=False):
+    """Writes the string representation of `objs` one at a time,
+    as the repr of their list or one per line, starting after the
+    instance whose id is `after` and skipping `offset` of them.
+    """
+    objs = iter(objs)
+    if after is not None:
+        for obj in objs:
+            if after in (obj.id, "{}.{}".format(type(obj).__name__, obj.id)):
+                break
+    objs = itertools.islice(
+        objs, offset, None if limit is None else offset + limit)
+    write = sys.stdout.write
+    if lines:
+        for obj in objs:
+            write(str(obj))
+            write("\n")
+        return
+    separator = "["
+    for obj in objs:
+        write(separator)
+        write(repr(str(obj)))
+        separator = ", "
+    write("[]\n" if separator == "[" else "]\n")
+
+
+def write_stats(stats):
+    """Prints the counters and timers of a metrics snapshot, one per line.
+    """
+    if not metrics.enabled:
+        print("metrics are off, turn them on with: stats on")
+    for name, value in sorted(stats["counters"].items()):
+        print("{} {}".format(name, value))
+    for name, timer in sorted(stats["timers"].items()):
+        print("{} calls={} total={:.3f}ms mean={:.3f}ms max={:.3f}ms".format(
+            name, timer["calls"], timer["total_ms"], timer["mean_ms"],
+            timer["max_ms"]))
+
+
+def build_query(query, text):
+    """Applies the method calls chained in `text` to `query`,
+    their arguments being Python literals.
+    """
+    methods = ("where", "order_by", "offset", "limit", "only")
+    calls = []
+    node = ast.parse(text, mode="eval").body if text.strip() else None
+    while isinstance(node, ast.Call):
+        if isinstance(node.func, ast.Name):
+            calls.append((node.func.id, node))
+            node = None
+        elif isinstance(node.func, ast.Attribute):
+            calls.append((node.func.attr, node))
+            node = node.func.value
+        else:
+            break
+    if node is not None:
+        raise SyntaxError("not a chain of calls")
+    for name, call in reversed(calls):
+        if name not in methods or any(k.arg is None for k in call.keywords):
+            raise SyntaxError("{} is not a query method".format(name))
+        args = [ast.literal_eval(a) for a in call.args]
+        kwargs = {k.arg: ast.literal_eval(k.value) for k in call.keywords}
+        query = getattr(query, name)(*args, **kwargs)
+    return query
+
+
 def is_float(x):
     """Checks if `x` is float.
     """
@@ -245,4 +487,9 @@ def parse_str(arg):
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--batch":
+        if len(sys.argv) > 2:
+            with open(sys.argv[2]) as f:
+                sys.exit(run_batch(f))
+        sys.exit(run_batch(sys.stdin))
     HBNBCommand().cmdloop()
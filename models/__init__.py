@@ -2,7 +2,23 @@
 """
 __init__.py: Module
 """
-from models.engine import file_storage
+import os
+from models import compact
+from models.engine import file_storage, metrics
 
-storage = file_storage.FileStorage()
-storage.reload()
+if os.getenv("HBNB_COMPACT") == "1":
+    compact.enable(file_storage.classes)
+if os.getenv("HBNB_METRICS") == "1" or os.getenv("HBNB_METRICS_FILE"):
+    metrics.enable(os.getenv("HBNB_METRICS_FILE"))
+
+if os.getenv("HBNB_TYPE_STORAGE") == "db":
+    from models.engine.db_storage import DBStorage
+    storage = DBStorage()
+    storage.reload()
+else:
+    storage = file_storage.FileStorage()
+    # worker processes would wait for the import lock this import holds
+    # to unpickle their job, so this first reload reads shards serially
+    workers, storage.workers = storage.workers, 0
+    storage.reload()
+    storage.workers = workers
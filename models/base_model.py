@@ -5,7 +5,109 @@ BaseModel module
 """
 import models
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def to_datetime(value):
+    """
+    returns the datetime of value, an ISO string, epoch microseconds
+    or a datetime
+    """
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    if isinstance(value, int):
+        return EPOCH + timedelta(microseconds=value)
+    return value
+
+
+def to_isoformat(value):
+    """
+    returns the ISO string of value, an ISO string, epoch microseconds
+    or a datetime, reusing value when it is a string already
+    """
+    if isinstance(value, str):
+        return value
+    return to_datetime(value).isoformat()
+
+
+class Timestamp:
+    """
+    created_at or updated_at: keeps the ISO string or the epoch
+    microseconds an instance was loaded with and only builds the
+    datetime the first time it is read; slot is where the value lives
+    for the compact classes, the instance __dict__ otherwise
+    """
+
+    def __init__(self, name, slot=None):
+        """
+        describes the attribute called name
+        """
+        self.name = name
+        self.slot = slot
+
+    def __get__(self, obj, owner=None):
+        """
+        returns the datetime, parsing and keeping it on first access
+        """
+        if obj is None:
+            return self
+        if self.slot is not None:
+            value = self.slot.__get__(obj)
+        else:
+            try:
+                value = obj.__dict__[self.name]
+            except KeyError:
+                raise AttributeError("'{}' object has no attribute '{}'"
+                                     .format(type(obj).__name__,
+                                             self.name)) from None
+        if type(value) is not datetime:
+            value = to_datetime(value)
+            self.__set__(obj, value)
+        return value
+
+    def __set__(self, obj, value):
+        """
+        stores value as it is
+        """
+        if self.slot is not None:
+            self.slot.__set__(obj, value)
+        else:
+            obj.__dict__[self.name] = value
+
+    def __delete__(self, obj):
+        """
+        removes the value
+        """
+        if self.slot is not None:
+            self.slot.__delete__(obj)
+        else:
+            del obj.__dict__[self.name]
+
+
+class Relation:
+    """
+    the instances of the class called cls whose field holds the id of
+    the instance, looked up by storage.related(); a value set on the
+    instance under the same name is stored and read instead
+    """
+
+    def __init__(self, cls, field):
+        """
+        describes the instances of cls pointing back through field
+        """
+        self.cls = cls
+        self.field = field
+
+    def __get__(self, obj, owner=None):
+        """
+        returns the related instances
+        """
+        if obj is None:
+            return self
+        return list(models.storage.related(
+            self.cls, self.field, obj.id).values())
 
 
 class BaseModel:
@@ -13,30 +115,43 @@ class BaseModel:
     BaseModels class
     """
 
+    created_at = Timestamp("created_at")
+    updated_at = Timestamp("updated_at")
+
     def __init__(self, *args, **kwargs):
         """
         instatiates objects with it's attributes
         """
         if len(kwargs) > 0:
+            attributes = self.__dict__
             for key, value in kwargs.items():
                 if key == '__class__':
                     continue
-                if key == "created_at" or key == "updated_at":
-                    value = datetime.fromisoformat(value)
-                setattr(self, key, value)
+                attributes[key] = value
             return
 
-        self.id = str(uuid.uuid4())
-        self.created_at = datetime.now()
-        self.updated_at = datetime.now()
+        object.__setattr__(self, "id", str(uuid.uuid4()))
+        object.__setattr__(self, "created_at", datetime.now())
+        object.__setattr__(self, "updated_at", datetime.now())
 
         models.storage.new(self)
 
+    def __setattr__(self, name, value):
+        """
+        sets the attribute and flags the instance as changed in storage
+        """
+        super().__setattr__(name, value)
+        models.storage.touch(self, name)
+
     def __str__(self):
         """ 
         Returns the string representation of the instance
         """
-        return "[{}] ({}) {}".format(self.__class__.__name__, self.id, self.__dict__)
+        attributes = dict(self.__dict__)
+        for name in ("created_at", "updated_at"):
+            if name in attributes:
+                attributes[name] = getattr(self, name)
+        return "[{}] ({}) {}".format(self.__class__.__name__, self.id, attributes)
 
     def save(self):
         """
@@ -51,6 +166,6 @@ class BaseModel:
         """
         obj_dict = self.__dict__.copy()
         obj_dict["__class__"] = self.__class__.__name__
-        obj_dict["created_at"] = self.created_at.isoformat()
-        obj_dict["updated_at"] = self.updated_at.isoformat()
+        obj_dict["created_at"] = to_isoformat(obj_dict["created_at"])
+        obj_dict["updated_at"] = to_isoformat(obj_dict["updated_at"])
         return obj_dict
@@ -1,7 +1,7 @@
 #!/usr/bin/python3
 """`city` module
 """
-from models.base_model import BaseModel
+from models.base_model import BaseModel, Relation
 
 
 class City(BaseModel):
@@ -9,3 +9,4 @@ class City(BaseModel):
     """
     name = ""
     state_id = ""
+    places = Relation("Place", "city_id")
@@ -0,0 +1,152 @@
+#!/usr/bin/python3
+"""
+Module compact
+"""
+from models.base_model import Timestamp, Relation, to_isoformat
+
+originals = {}
+timestamps = ("created_at", "updated_at")
+
+
+def fields_of(cls):
+    """
+    returns the names of the attributes declared on cls and its bases,
+    id and the timestamps first
+    """
+    names = ["id", "created_at", "updated_at"]
+    for klass in reversed(cls.__mro__):
+        for name, value in vars(klass).items():
+            if (name.startswith('_') or name in names or callable(value) or
+                    isinstance(value, (property, classmethod, staticmethod,
+                                       Relation))):
+                continue
+            names.append(name)
+    return names
+
+
+def compact(cls):
+    """
+    returns a subclass of cls of the same name keeping the declared
+    attributes in slots, ad-hoc attributes go to the instance __dict__
+    which is only read once the instance has some, and unset declared
+    attributes read as the class defaults; the timestamps keep their
+    raw values in the _created_at and _updated_at slots
+    """
+    fields = fields_of(cls)
+    slotted = frozenset(fields + ["__class__"])
+    defaults = {name: getattr(cls, name) for name in fields
+                if name not in timestamps and hasattr(cls, name)}
+    slots = tuple("_" + name if name in timestamps else name
+                  for name in fields)
+    defaults["_extra"] = False
+    init = cls.__init__
+    setattr_ = cls.__setattr__
+
+    def __init__(self, *args, **kwargs):
+        """
+        instatiates objects with it's attributes
+        """
+        if not kwargs:
+            init(self, *args)
+            return
+        for key, value in kwargs.items():
+            if key == '__class__':
+                continue
+            if key not in slotted:
+                object.__setattr__(self, "_extra", True)
+            object.__setattr__(self, key, value)
+
+    def __setattr__(self, name, value):
+        """
+        sets the attribute, flagging the instance when it goes to __dict__
+        """
+        if name not in slotted:
+            object.__setattr__(self, "_extra", True)
+        setattr_(self, name, value)
+
+    def __getattr__(self, name):
+        """
+        returns the class default of an unset declared attribute
+        """
+        try:
+            return defaults[name]
+        except KeyError:
+            raise AttributeError("'{}' object has no attribute '{}'".format(
+                type(self).__name__, name)) from None
+
+    def __str__(self):
+        """
+        Returns the string representation of the instance
+        """
+        attributes = state(self)
+        for name in timestamps:
+            if name in attributes:
+                attributes[name] = getattr(self, name)
+        return "[{}] ({}) {}".format(type(self).__name__, self.id, attributes)
+
+    def to_dict(self):
+        """
+        Returns a dictionary containing all attributes of the instance
+        """
+        obj_dict = state(self)
+        obj_dict["__class__"] = type(self).__name__
+        obj_dict["created_at"] = to_isoformat(obj_dict["created_at"])
+        obj_dict["updated_at"] = to_isoformat(obj_dict["updated_at"])
+        return obj_dict
+
+    klass = type(cls.__name__, (cls,), {
+        "__slots__": slots + ("_extra",),
+        "__module__": cls.__module__,
+        "__qualname__": cls.__qualname__,
+        "__doc__": cls.__doc__,
+        "__init__": __init__,
+        "__setattr__": __setattr__,
+        "__getattr__": __getattr__,
+        "__str__": __str__,
+        "to_dict": to_dict,
+    })
+    klass._members = tuple((name, vars(klass)[slot])
+                           for name, slot in zip(fields, slots))
+    for name in timestamps:
+        setattr(klass, name, Timestamp(name, vars(klass)["_" + name]))
+    return klass
+
+
+def state(obj):
+    """
+    returns the attributes set on obj by name, which is obj.__dict__
+    itself for an instance of a regular class and a new dict for an
+    instance of a compact class
+    """
+    members = vars(type(obj)).get("_members")
+    if members is None:
+        return obj.__dict__
+    attributes = {}
+    for name, member in members:
+        try:
+            attributes[name] = member.__get__(obj)
+        except AttributeError:
+            pass
+    if obj._extra:
+        attributes.update(obj.__dict__)
+    return attributes
+
+
+def enable(classes):
+    """
+    replaces each class of the classes registry by its compact variant,
+    so that instances created by name and by reload() are compact
+    """
+    for name, cls in list(classes.items()):
+        if name not in originals:
+            originals[name] = cls
+            classes[name] = compact(cls)
+
+
+def disable(classes):
+    """
+    puts the regular classes back in the classes registry
+    """
+    for name, cls in list(originals.items()):
+        classes[name] = cls
+    originals.clear()
@@ -0,0 +1,234 @@
+#!/usr/bin/python3
+"""
+Module columns
+"""
+import math
+from array import array
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+numeric = {'Place': ('price_by_night', 'number_rooms', 'number_bathrooms',
+                     'max_guest', 'latitude', 'longitude')}
+MISSING = math.nan
+
+
+def as_number(value):
+    """
+    returns value as a float, MISSING when it is not a number
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    return MISSING
+
+
+def matches(value, bounds):
+    """
+    tells if value is a number within the (low, high) pair bounds
+    """
+    low, high = bounds
+    value = as_number(value)
+    return ((-math.inf if low is None else low) <= value <=
+            (math.inf if high is None else high))
+
+
+class Table():
+    """
+    the numeric fields of the objects of one class, one array of
+    doubles per field and one row per object; a removed row is
+    replaced by the last one so that the arrays stay dense
+    """
+
+    def __init__(self, fields):
+        """
+        creates an empty table of fields
+        """
+        self.keys = []
+        self.rows = {}
+        self.columns = {f: array('d') for f in fields}
+
+    def add(self, key, values):
+        """
+        sets the row of key to values, a callable returning the value
+        of a field
+        """
+        row = self.rows.get(key)
+        if row is None:
+            self.rows[key] = len(self.keys)
+            self.keys.append(key)
+            for field, column in self.columns.items():
+                column.append(as_number(values(field)))
+        else:
+            for field, column in self.columns.items():
+                column[row] = as_number(values(field))
+
+    def set(self, key, field, value):
+        """
+        sets field in the row of key
+        """
+        row = self.rows.get(key)
+        if row is not None:
+            self.columns[field][row] = as_number(value)
+
+    def remove(self, key):
+        """
+        drops the row of key
+        """
+        row = self.rows.pop(key, None)
+        if row is None:
+            return
+        last = self.keys.pop()
+        for column in self.columns.values():
+            value = column.pop()
+            if last != key:
+                column[row] = value
+        if last != key:
+            self.keys[row] = last
+            self.rows[last] = row
+
+    def search(self, ranges):
+        """
+        returns the keys of the rows whose fields fall in ranges,
+        a dict of field to an inclusive (low, high) pair where None
+        leaves an end open, NaN never falls in a range
+        """
+        if numpy is not None:
+            return self.__search_numpy(ranges)
+        rows = None
+        for field, (low, high) in ranges.items():
+            column = self.columns[field]
+            low = -math.inf if low is None else low
+            high = math.inf if high is None else high
+            if rows is None:
+                rows = [i for i, v in enumerate(column) if low <= v <= high]
+            else:
+                rows = [i for i in rows if low <= column[i] <= high]
+        if rows is None:
+            rows = range(len(self.keys))
+        keys = self.keys
+        return [keys[i] for i in rows]
+
+    def __search_numpy(self, ranges):
+        """
+        search() over numpy views of the arrays
+        """
+        mask = numpy.ones(len(self.keys), dtype=bool)
+        for field, (low, high) in ranges.items():
+            view = numpy.frombuffer(self.columns[field], dtype=numpy.float64)
+            mask &= ~numpy.isnan(view)
+            if low is not None:
+                mask &= view >= low
+            if high is not None:
+                mask &= view <= high
+            del view
+        keys = self.keys
+        return [keys[i] for i in numpy.flatnonzero(mask)]
+
+
+class Columns():
+    """
+    the tables of the numeric fields listed in `numeric`
+    """
+
+    def __init__(self, classes=None, lazy=False):
+        """
+        creates one empty table per class, or none until build() asks
+        for it when lazy; classes maps the class names to the classes
+        whose defaults stand for the fields a parsed record does not have
+        """
+        self.__tables = {} if lazy else {
+            name: Table(fields) for name, fields in numeric.items()}
+        self.__classes = classes or {}
+
+    def __len__(self):
+        """
+        returns the number of tables built
+        """
+        return len(self.__tables)
+
+    def built(self, name):
+        """
+        tells if the table of the `name` objects exists
+        """
+        return name in self.__tables
+
+    def build(self, name, entries):
+        """
+        creates the table of the `name` objects from entries, the (key,
+        instance or parsed record) pairs of all of them
+        """
+        self.__tables[name] = Table(numeric[name])
+        for key, entry in entries:
+            self.add(key, entry)
+
+    def add(self, key, entry):
+        """
+        stores the fields of entry, an instance or its parsed record
+        """
+        name = key.partition('.')[0]
+        table = self.__tables.get(name)
+        if table is None:
+            return
+        if isinstance(entry, dict):
+            cls = self.__classes.get(name)
+            table.add(key, lambda field: entry.get(
+                field, getattr(cls, field, None)))
+        else:
+            table.add(key, lambda field: getattr(entry, field, None))
+
+    def update(self, key, obj, field):
+        """
+        stores field of obj again after it was set
+        """
+        table = self.__tables.get(key.partition('.')[0])
+        if table is None:
+            return
+        if field is None:
+            self.add(key, obj)
+        elif field in table.columns:
+            table.set(key, field, getattr(obj, field, None))
+
+    def remove(self, key):
+        """
+        drops the row of key
+        """
+        table = self.__tables.get(key.partition('.')[0])
+        if table is not None:
+            table.remove(key)
+
+    def search(self, name, ranges):
+        """
+        returns the keys of the `name` objects whose fields fall in
+        ranges, a dict of field to a (low, high) pair or to the value
+        the field must equal
+        """
+        table = self.__tables.get(name)
+        if table is None or not set(ranges) <= set(table.columns):
+            raise KeyError("{} has no column among {}".format(
+                name, ", ".join(ranges)))
+        return table.search({f: bounds(v) for f, v in ranges.items()})
+
+    def column(self, name, field):
+        """
+        returns the (keys, values) of field of the `name` objects,
+        values being a numpy array when numpy is installed
+        and an array of doubles otherwise, NaN where it is not a number
+        """
+        table = self.__tables.get(name)
+        if table is None or field not in table.columns:
+            raise KeyError("{}.{} is not a column".format(name, field))
+        values = table.columns[field]
+        if numpy is not None:
+            return list(table.keys), numpy.array(values, dtype=numpy.float64)
+        return list(table.keys), array('d', values)
+
+
+def bounds(value):
+    """
+    returns the (low, high) pair of a range given as a pair or a value
+    """
+    if isinstance(value, (tuple, list)):
+        low, high = value
+        return low, high
+    return value, value
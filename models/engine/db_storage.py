@@ -0,0 +1,591 @@
+#!/usr/bin/python3
+"""
+Module db_storage
+"""
+import os
+import json
+import time
+import sqlite3
+from array import array
+from contextlib import contextmanager
+from models.engine.file_storage import classes
+from models.engine.indexes import relations
+from models.engine.columns import numpy, bounds, matches as in_range
+from models.engine.query import Query
+from models.engine import serializers
+from models.engine import metrics
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    class TEXT NOT NULL,
+    id TEXT NOT NULL,
+    record TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS objects_key ON objects (class, id);
+"""
+UPSERT = ("INSERT INTO objects (class, id, record) VALUES (?, ?, ?) "
+          "ON CONFLICT (class, id) DO UPDATE SET record = excluded.record")
+synchronous = {"always": "FULL", "batch": "NORMAL", "never": "OFF"}
+comparisons = {'eq': '=', 'ne': '!=', 'lt': '<', 'le': '<=',
+               'gt': '>', 'ge': '>='}
+NUMBER_TYPES = "('integer', 'real', 'true', 'false')"
+MISSING = object()
+
+
+def json_type(value):
+    """
+    returns the SQL list of the JSON types value compares with,
+    None when it is no string or number
+    """
+    if isinstance(value, str):
+        return "('text')"
+    if isinstance(value, (int, float)):
+        return NUMBER_TYPES
+    return None
+
+
+def field_sql(cls, field):
+    """
+    returns the SQL of the value and of the JSON type of field in the
+    record of a `cls` instance, the class default standing in for a
+    missing field the way getattr() does, and their parameters;
+    None when field cannot be compared in SQL
+    """
+    if field == "id":
+        return "id", "'text'", ()
+    if not field.isidentifier() or field in ("created_at", "updated_at"):
+        return None
+    path = "'$.{}'".format(field)
+    value = "json_extract(record, {})".format(path)
+    kind = "json_type(record, {})".format(path)
+    default = getattr(cls, field, MISSING)
+    if default is MISSING:
+        return value, kind, ()
+    if isinstance(default, bool):
+        default_type = "true" if default else "false"
+    elif isinstance(default, int):
+        default_type = "integer"
+    elif isinstance(default, float):
+        default_type = "real"
+    elif isinstance(default, str):
+        default_type = "text"
+    else:
+        return None
+    return ("CASE WHEN {} IS NULL THEN ? ELSE {} END".format(kind, value),
+            "COALESCE({}, '{}')".format(kind, default_type), (default,))
+
+
+def condition_sql(cls, field, op, value):
+    """
+    returns the SQL of a (field, operator name, value) condition and
+    its parameters, holding for the same records as query.matches();
+    None when it cannot be written in SQL
+    """
+    compiled = field_sql(cls, field)
+    if compiled is None:
+        return None
+    column, kind, params = compiled
+    if op == 'in':
+        if not isinstance(value, (list, tuple, set, frozenset)):
+            return None
+        clauses = [condition_sql(cls, field, 'eq', v) for v in value]
+        if None in clauses:
+            return None
+        if not clauses:
+            return "0", ()
+        return ("(" + " OR ".join(c for c, _ in clauses) + ")",
+                tuple(p for _, ps in clauses for p in ps))
+    types = json_type(value)
+    if types is None or op not in comparisons:
+        return None
+    if (op == 'eq' and field != "id" and
+            getattr(cls, field, MISSING) != value):
+        path = "'$.{}'".format(field)
+        return ("json_extract(record, {0}) = ? AND "
+                "json_type(record, {0}) IN {1}".format(path, types),
+                (value,))
+    test = "{} IN {} AND {} {} ?".format(kind, types, column,
+                                         comparisons[op])
+    if op == 'ne':
+        test = "{} IS NOT NULL AND NOT ({} IN {} AND {} = ?)".format(
+            kind, kind, types, column)
+    return test, (*params, value)
+
+
+class DBStorage():
+    """
+    keeps the instances in a SQLite database, one row of the JSON
+    record of an instance per class and id
+
+    The file is HBNB_STORAGE_PATH, file.db by default, and
+    HBNB_STORAGE_FSYNC (always, batch or never) sets how SQLite syncs
+    its commits. Instances are built from their row the first time
+    they are asked for and kept by key, so a row has a single instance;
+    refresh() drops them once another process committed.
+
+    new() and touch() only flag the instance; its row is written before
+    the next read and a save commits, so a save costs one upsert per
+    changed instance instead of a rewrite of the whole store. Inside a
+    batch() block (or between begin() and commit()) saves are deferred
+    to the end of the block and rollback() drops what the block wrote.
+
+    query() compiles the conditions and the order of a Query to SQL
+    where it can and checks the others on the instances.
+    """
+
+    def __init__(self):
+        """
+        reads the storage settings from the environment
+        """
+        self.path = os.getenv("HBNB_STORAGE_PATH", "file.db")
+        self.fsync = os.getenv("HBNB_STORAGE_FSYNC", "never")
+        if self.fsync not in synchronous:
+            raise ValueError("fsync policy must be one of {}".format(
+                ", ".join(synchronous)))
+        self.__connection = None
+        self.__objects = {}
+        self.__changed = {}
+        self.__removed = set()
+        self.__depth = 0
+        self.__deferred = 0
+        self.__max_saves = None
+        self.__max_seconds = None
+        self.__committed_at = 0
+        self.__encoder = serializers.JSONSerializer()
+        self.__data_version = None
+
+    def all(self):
+        """
+        returns every instance by key
+        """
+        return self.__select("SELECT class, id, record FROM objects "
+                             "ORDER BY rowid")
+
+    def get(self, cls, id):
+        """
+        returns the instance of cls (a class or its name) with id,
+        None if there is none
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        obj = self.__objects.get("{}.{}".format(cls, id))
+        if obj is not None:
+            return obj
+        return next(iter(self.select(cls, "id = ?", (id,)).values()), None)
+
+    def all_of(self, cls):
+        """
+        returns the instances of cls (a class or its name) by key
+        """
+        return self.select(cls)
+
+    def select(self, cls, where="1", params=(), order="rowid",
+               limit=None, offset=0):
+        """
+        returns by key the instances of cls (a class or its name) whose
+        row satisfies the SQL condition where, sorted on the SQL order
+        and paged by limit and offset; params are the parameters of
+        where followed by those of order
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        return self.__select(
+            "SELECT class, id, record FROM objects WHERE class = ? AND "
+            "({}) ORDER BY {} LIMIT ? OFFSET ?".format(where, order),
+            (cls, *params, -1 if limit is None else limit, offset))
+
+    def select_count(self, cls, where="1", params=()):
+        """
+        returns the number of instances of cls (a class or its name)
+        whose row satisfies the SQL condition where
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        self.__write_changes()
+        return self.__connect().execute(
+            "SELECT COUNT(*) FROM objects WHERE class = ? AND ({})".format(
+                where), (cls, *params)).fetchone()[0]
+
+    def related(self, cls, field, value):
+        """
+        returns the instances of cls (a class or its name) whose field
+        equals value by key
+        """
+        return {"{}.{}".format(type(obj).__name__, obj.id): obj
+                for obj in self.query(cls).where(**{field: value})}
+
+    def search(self, cls, **ranges):
+        """
+        returns the ids of the instances of cls (a class or its name)
+        whose numeric fields fall in ranges, each given as an inclusive
+        (low, high) pair where None leaves an end open, or as a value
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        klass = classes[cls]
+        clauses = []
+        params = []
+        for field, value in ranges.items():
+            compiled = field_sql(klass, field)
+            if compiled is None:
+                return [obj.id for obj in self.all_of(cls).values()
+                        if all(in_range(getattr(obj, f, None), bounds(r))
+                               for f, r in ranges.items())]
+            column, kind, column_params = compiled
+            clauses.append("{} IN {}".format(kind, NUMBER_TYPES))
+            for bound, op in zip(bounds(value), (">=", "<=")):
+                if bound is not None:
+                    clauses.append("{} {} ?".format(column, op))
+                    params += [*column_params, bound]
+        return [obj.id for obj in self.select(
+            cls, " AND ".join(clauses) or "1", params).values()]
+
+    def column(self, cls, field):
+        """
+        returns the ids of the instances of cls (a class or its name)
+        and the values of their numeric field, see Columns.column()
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        compiled = field_sql(classes[cls], field)
+        if compiled is None:
+            raise KeyError("{}.{} is not a column".format(cls, field))
+        column, kind, params = compiled
+        self.__write_changes()
+        rows = self.__connect().execute(
+            "SELECT id, CASE WHEN {} IN {} THEN {} END FROM objects "
+            "WHERE class = ? ORDER BY rowid".format(kind, NUMBER_TYPES,
+                                                    column),
+            (*params, cls)).fetchall()
+        values = array('d', (float("nan") if v is None else v
+                             for _, v in rows))
+        if numpy is not None:
+            values = numpy.array(values, dtype=numpy.float64)
+        return [id for id, _ in rows], values
+
+    def query(self, cls):
+        """
+        returns a Query over the instances of cls (a class or its name)
+        running in SQL
+        """
+        return SQLQuery(self, cls)
+
+    def count(self, cls=None):
+        """
+        returns the number of instances of cls (a class or its name),
+        of every class when cls is None
+        """
+        if cls is not None:
+            return self.select_count(cls)
+        self.__write_changes()
+        return self.__connect().execute(
+            "SELECT COUNT(*) FROM objects").fetchone()[0]
+
+    def new(self, obj):
+        """
+        adds obj, its row is written before the next read
+        """
+        key = "{}.{}".format(type(obj).__name__, obj.id)
+        self.__objects[key] = obj
+        self.__changed[key] = obj
+        self.__removed.discard(key)
+
+    def touch(self, obj, name=None):
+        """
+        flags obj as changed since its row was written
+        """
+        key = "{}.{}".format(type(obj).__name__, getattr(obj, "id", None))
+        if self.__objects.get(key) is obj:
+            self.__changed[key] = obj
+
+    def delete(self, obj=None):
+        """
+        deletes obj, its row is removed before the next read
+        """
+        if obj is None:
+            return
+        key = "{}.{}".format(type(obj).__name__, obj.id)
+        self.__objects.pop(key, None)
+        self.__changed.pop(key, None)
+        self.__removed.add(key)
+
+    def save(self):
+        """
+        commits the changes, at the end of the batch inside one
+        """
+        if self.__depth == 0:
+            self.__commit()
+            return
+        self.__deferred += 1
+        if ((self.__max_saves and self.__deferred >= self.__max_saves) or
+                (self.__max_seconds and time.monotonic() -
+                 self.__committed_at >= self.__max_seconds)):
+            self.__commit()
+
+    def begin(self, max_saves=None, max_seconds=None):
+        """
+        defers saves until the matching commit(), committing early once
+        max_saves saves or max_seconds seconds have piled up
+        """
+        if self.__depth == 0:
+            self.__deferred = 0
+            self.__max_saves = max_saves
+            self.__max_seconds = max_seconds
+            self.__committed_at = time.monotonic()
+        self.__depth += 1
+
+    def commit(self):
+        """
+        ends a begin(), the outermost one commits the deferred saves
+        """
+        if self.__depth == 0:
+            return
+        self.__depth -= 1
+        if self.__depth == 0 and self.__deferred:
+            self.__commit()
+
+    def rollback(self):
+        """
+        ends every open batch without committing its deferred saves
+        and forgets the instances, which are read again from the rows
+        last committed
+        """
+        self.__depth = 0
+        self.__deferred = 0
+        self.reload()
+
+    def flush(self):
+        """
+        does nothing, commits are written when they happen
+        """
+
+    def close(self):
+        """
+        commits open batches and closes the database,
+        which is opened again on the next access
+        """
+        while self.__depth:
+            self.commit()
+        if self.__connection is not None:
+            if self.__connection.in_transaction:
+                self.__connection.rollback()
+            self.__connection.close()
+            self.__connection = None
+
+    def in_batch(self):
+        """
+        tells if saves are being deferred
+        """
+        return self.__depth > 0
+
+    @contextmanager
+    def batch(self, max_saves=None, max_seconds=None):
+        """
+        runs the block between begin() and commit()
+        """
+        self.begin(max_saves, max_seconds)
+        try:
+            yield self
+        finally:
+            self.commit()
+
+    def compact(self):
+        """
+        commits the changes and rebuilds the database file
+        """
+        self.__commit()
+        if self.__depth == 0:
+            self.__connect().execute("VACUUM")
+
+    def reload(self):
+        """
+        drops the changes not committed and the instances built so far
+        """
+        start = time.perf_counter()
+        connection = self.__connect()
+        if connection.in_transaction:
+            connection.rollback()
+        self.__objects = {}
+        self.__changed = {}
+        self.__removed = set()
+        if metrics.enabled:
+            metrics.record("storage.reload", time.perf_counter() - start)
+
+    def __select(self, sql, params=()):
+        """
+        writes the pending changes and returns the instances of the
+        (class, id, record) rows of sql by key
+        """
+        self.__write_changes()
+        objs = {}
+        objects = self.__objects
+        for name, id, record in self.__connect().execute(sql, params):
+            key = "{}.{}".format(name, id)
+            obj = objects.get(key)
+            if obj is None:
+                obj = classes[name](**json.loads(record))
+                objects[key] = obj
+            objs[key] = obj
+        return objs
+
+    def __write_changes(self):
+        """
+        upserts the rows of the changed instances and deletes those
+        of the removed ones, in the open transaction
+        """
+        if not self.__changed and not self.__removed:
+            return
+        timed = metrics.enabled
+        if timed:
+            start = time.perf_counter()
+        connection = self.__connect()
+        if not connection.in_transaction:
+            connection.execute("BEGIN")
+        encode = self.__encoder.encode
+        connection.executemany(UPSERT, (
+            (type(obj).__name__, obj.id, encode(obj))
+            for obj in self.__changed.values()))
+        connection.executemany(
+            "DELETE FROM objects WHERE class = ? AND id = ?",
+            (key.split('.', 1) for key in self.__removed))
+        if timed:
+            metrics.record("storage.encode", time.perf_counter() - start)
+            metrics.count("storage.objects_serialized", len(self.__changed))
+        self.__changed = {}
+        self.__removed = set()
+
+    def __commit(self):
+        """
+        writes the pending changes and commits them
+        """
+        start = time.perf_counter()
+        self.__deferred = 0
+        self.__committed_at = time.monotonic()
+        self.__write_changes()
+        connection = self.__connect()
+        if connection.in_transaction:
+            connection.commit()
+        if metrics.enabled:
+            metrics.record("storage.save", time.perf_counter() - start)
+
+    def refresh(self):
+        """
+        drops the instances kept since another connection committed,
+        but the changed ones, so that they are read again; outside of
+        a transaction only
+        """
+        connection = self.__connect()
+        if connection.in_transaction:
+            return
+        version = connection.execute("PRAGMA data_version").fetchone()[0]
+        if version != self.__data_version:
+            self.__data_version = version
+            self.__objects = dict(self.__changed)
+
+    def __connect(self):
+        """
+        returns the connection to the database, opening it and
+        creating the table and its indexes on first use
+        """
+        if self.__connection is not None:
+            return self.__connection
+        connection = sqlite3.connect(self.path, isolation_level=None,
+                                     check_same_thread=False)
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = {}".format(
+            synchronous[self.fsync]))
+        connection.executescript(SCHEMA)
+        for field in sorted({f for fs in relations.values() for f in fs}):
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS objects_{0} ON objects "
+                "(class, json_extract(record, '$.{0}'))".format(field))
+        self.__connection = connection
+        self.__data_version = connection.execute(
+            "PRAGMA data_version").fetchone()[0]
+        return connection
+
+
+class SQLQuery(Query):
+    """
+    a Query running its conditions, order, offset and limit in SQL
+    when all of them can be, and otherwise only the conditions that
+    can, checking and sorting the rest on the instances
+    """
+
+    def candidates(self):
+        """
+        returns the instances the conditions written in SQL select
+        and the conditions left to check on them
+        """
+        where, params, left = self.__where()
+        return self.storage.select(self.name, where, params).values(), left
+
+    def count(self):
+        """
+        returns the number of results, counted in SQL when every
+        condition is written in SQL
+        """
+        where, params, left = self.__where()
+        if left:
+            return super().count()
+        count = max(self.storage.select_count(self.name, where, params) -
+                    self.start, 0)
+        return count if self.stop is None else min(count, self.stop)
+
+    def __iter__(self):
+        """
+        yields the results, ordered and paged in SQL when every
+        condition and every field of the order are written in SQL
+        """
+        where, params, left = self.__where()
+        order = self.__order()
+        if left or order is None:
+            yield from super().__iter__()
+            return
+        order, order_params = order
+        objs = self.storage.select(self.name, where,
+                                   (*params, *order_params), order,
+                                   self.stop, self.start)
+        for obj in objs.values():
+            if self.fields is None:
+                yield obj
+            else:
+                yield {f: getattr(obj, f, None) for f in self.fields}
+
+    def __where(self):
+        """
+        returns the SQL of the conditions that can be written in SQL,
+        its parameters and the conditions left
+        """
+        cls = classes[self.name]
+        clauses = []
+        params = []
+        left = []
+        for condition in self.conditions:
+            compiled = condition_sql(cls, *condition)
+            if compiled is None:
+                left.append(condition)
+                continue
+            clauses.append(compiled[0])
+            params.extend(compiled[1])
+        return " AND ".join(clauses) or "1", params, left
+
+    def __order(self):
+        """
+        returns the ORDER BY clause of the ordering and its parameters,
+        None when a field cannot be written in SQL
+        """
+        cls = classes[self.name]
+        clauses = []
+        params = []
+        for field in self.ordering:
+            descending = field.startswith('-')
+            compiled = field_sql(cls, field[1:] if descending else field)
+            if compiled is None:
+                return None
+            column, kind, column_params = compiled
+            clauses.append("{0} IS NULL, {0}{1}".format(
+                column, " DESC" if descending else ""))
+            params += [*column_params, *column_params]
+        clauses.append("rowid")
+        return ", ".join(clauses), params
@@ -0,0 +1,158 @@
+#!/usr/bin/python3
+"""
+Module durability
+"""
+import os
+import time
+import atexit
+import threading
+from models.engine import metrics
+
+policies = ("always", "batch", "never")
+BUFFER_SIZE = 1 << 20
+
+
+class FsyncPolicy():
+    """
+    decides when writes are forced to disk:
+    always on every write, batch at most once per interval seconds,
+    never leaves it to the operating system
+
+    In batch mode a write that is not forced to disk right away is
+    recorded by defer() and forced by a timer once the interval since
+    the last sync has passed, or by close(), which also runs at exit
+    """
+
+    def __init__(self, mode="never", interval=1.0):
+        """
+        validates mode, one of `policies`
+        """
+        if mode not in policies:
+            raise ValueError("fsync policy must be one of {}".format(
+                ", ".join(policies)))
+        self.mode = mode
+        self.interval = interval
+        self.__last = None
+        self.__pending = set()
+        self.__timer = None
+        self.__lock = threading.Lock()
+        if mode == "batch":
+            atexit.register(self.close)
+
+    def due(self):
+        """
+        tells if the next write has to be forced to disk
+        """
+        if self.mode == "always":
+            return True
+        if self.mode == "never":
+            return False
+        now = time.monotonic()
+        if self.__last is not None and now - self.__last < self.interval:
+            return False
+        self.__last = now
+        return True
+
+    def defer(self, path):
+        """
+        records that the file at path holds a write that was not forced
+        to disk, to be forced once the interval has passed
+        """
+        if self.mode != "batch":
+            return
+        with self.__lock:
+            self.__pending.add(path)
+            if self.__timer is None:
+                delay = self.interval
+                if self.__last is not None:
+                    delay -= time.monotonic() - self.__last
+                self.__timer = threading.Timer(max(delay, 0),
+                                               self.sync_pending)
+                self.__timer.daemon = True
+                self.__timer.start()
+
+    def sync_pending(self):
+        """
+        forces the deferred writes to disk
+        """
+        with self.__lock:
+            if self.__timer is not None:
+                self.__timer.cancel()
+                self.__timer = None
+            pending, self.__pending = self.__pending, set()
+            if pending:
+                self.__last = time.monotonic()
+        for path in pending:
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            sync_dir(path)
+
+    def close(self):
+        """
+        forces the deferred writes to disk and stops the timer
+        """
+        self.sync_pending()
+
+    def sync(self, f):
+        """
+        flushes f and forces it to disk when due,
+        tells if it did
+        """
+        f.flush()
+        if not self.due():
+            return False
+        os.fsync(f.fileno())
+        return True
+
+
+def sync_dir(path):
+    """
+    forces the directory entry of path to disk
+    """
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path, mode, write, policy=None):
+    """
+    calls write(f) on a temporary file next to path and renames it
+    over path once complete, so path holds either the old or the new
+    content even if the process dies in between; a new file gets the
+    mode open() would give it (0o666 less the umask), a replaced file
+    keeps its mode
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    tmp = os.path.join(directory, ".{}.{}.tmp".format(
+        os.path.basename(path), os.urandom(6).hex()))
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, 'w' + mode, buffering=BUFFER_SIZE) as f:
+            write(f)
+            if metrics.enabled:
+                metrics.count("storage.bytes_written", f.tell())
+            synced = policy.sync(f) if policy else False
+        if os.path.exists(path):
+            os.chmod(tmp, os.stat(path).st_mode & 0o777)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    if synced:
+        sync_dir(path)
+    elif policy:
+        policy.defer(path)
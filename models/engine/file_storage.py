@@ -1,9 +1,42 @@
 #!/usr/bin/python3
 """
 Module file_storage
+
+FileStorage is set up by the environment:
+
+HBNB_STORAGE_PATH         the file, file.json or file.<extension of the
+                          format> by default
+HBNB_STORAGE_FORMAT       json, pickle or snapshot, else picked by the
+                          extension of the file (serializers.for_path)
+HBNB_STORAGE_JOURNAL=1    saves append the changed objects to
+                          file.json.journal, folded back into the file
+                          after HBNB_JOURNAL_LIMIT records or compact()
+HBNB_STORAGE_CACHE=0      no cache of the encoded objects, which holds
+                          HBNB_CACHE_LIMIT bytes of text (1 MiB) at most
+HBNB_STORAGE_LAZY=1       reload keeps the parsed records, an instance
+                          is built the first time it is asked for
+HBNB_STORAGE_FSYNC        always, batch or never, HBNB_FSYNC_INTERVAL
+                          seconds apart in batch (durability.FsyncPolicy)
+HBNB_STORAGE_ASYNC=1      files are written by a background thread,
+                          flush() waits for it
+HBNB_STORAGE_SHARDS=N     one file per class and hash bucket of the id
+                          in file.json.d, N buckets per class, no journal
+HBNB_STORAGE_WORKERS=N    shards parsed by N worker processes
+HBNB_STORAGE_STREAMING=1  reload parses one record at a time
+HBNB_STORAGE_SHARED=1     processes share the file under flock on
+                          file.json.lock, a save merges the changes other
+                          processes saved first; no shards
+HBNB_METRICS=1            saves and reloads record their timings
+
+Snapshots are written to a temporary file renamed over the old one, and
+a .snap file (snapshot.dump) is mapped in memory and decoded on demand.
+Inside batch() saves only write once at the end of the block.
 """
 import os
 import json
+import time
+from itertools import chain
+from contextlib import contextmanager
 from models.base_model import BaseModel
 from models.user import User
 from models.state import State
@@ -11,61 +44,971 @@ from models.city import City
 from models.review import Review
 from models.amenity import Amenity
 from models.place import Place
+from models.engine.journal import Journal
+from models.engine.indexes import Indexes, relations
+from models.engine.columns import Columns, numeric, bounds, matches
+from models.engine.query import Query
+from models.engine import serializers
+from models.engine.durability import FsyncPolicy, atomic_write
+from models.engine.writer import BackgroundWriter
+from models.engine.shards import shard_of, shard_path, list_shards
+from models.engine import parallel
+from models.engine import metrics
+from models.engine.snapshot import Snapshot
+from models.compact import state
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+classes = {'BaseModel': BaseModel, 'User': User,
+           'Amenity': Amenity, 'City': City, 'State': State,
+           'Place': Place, 'Review': Review}
 
 
 class FileStorage():
     """
     serializes instances to a JSON file and
     deserializes JSON file to instances
+
+    Only the objects flagged by new() or touch() since the last save are
+    encoded again, the text of the others comes from a cache; call
+    storage.touch(obj) after changing a list or a dict of obj in place.
+    count(), all_of(), related() and search() go through indexes kept
+    per class, built the first time a lookup needs them.
     """
 
     _FileStorage__file_path = "file.json"
     __objects = {}
+    __owner = None
+    __changed = set()
+    __removed = set()
+    __encoded = {}
+    __encoded_size = 0
+    __raw = {}
+    __by_class = {}
+    __stale = set()
+    __lent = False
+    __indexes = Indexes(lazy=True)
+    __columns = Columns(classes, lazy=True)
+    __unloaded = {}
+    __stale_shards = set()
+    __snapshot = None
+    __unmapped = set()
+
+    def __init__(self):
+        """
+        reads the storage settings from the environment
+        """
+        self.journaled = os.getenv("HBNB_STORAGE_JOURNAL") == "1"
+        self.journal_limit = int(os.getenv("HBNB_JOURNAL_LIMIT", "10000"))
+        self.lazy = os.getenv("HBNB_STORAGE_LAZY") == "1"
+        self.cache = os.getenv("HBNB_STORAGE_CACHE", "1") == "1"
+        self.cache_limit = int(os.getenv("HBNB_CACHE_LIMIT", "1048576"))
+        self.shards = int(os.getenv("HBNB_STORAGE_SHARDS", "0"))
+        self.workers = int(os.getenv("HBNB_STORAGE_WORKERS", "0"))
+        self.streaming = os.getenv("HBNB_STORAGE_STREAMING") == "1"
+        self.format = os.getenv("HBNB_STORAGE_FORMAT")
+        if os.getenv("HBNB_STORAGE_PATH"):
+            FileStorage._FileStorage__file_path = os.getenv(
+                "HBNB_STORAGE_PATH")
+        elif self.format:
+            FileStorage._FileStorage__file_path = "file" + (
+                serializers.serializers[self.format].extension)
+        self.fsync = FsyncPolicy(
+            os.getenv("HBNB_STORAGE_FSYNC", "never"),
+            float(os.getenv("HBNB_FSYNC_INTERVAL", "1.0")))
+        self.writer = None
+        if os.getenv("HBNB_STORAGE_ASYNC") == "1":
+            self.writer = BackgroundWriter()
+        self.__journal = None
+        self.__journaled_records = None
+        self.__snapshot_exists = False
+        self.__serializer = None
+        self.__depth = 0
+        self.__deferred = 0
+        self.__max_saves = None
+        self.__max_seconds = None
+        self.__flushed_at = 0
+        self.__encodes = 0
+        self.__encode_seconds = 0
+        self.shared = os.getenv("HBNB_STORAGE_SHARED") == "1"
+        if self.shared and fcntl is None:
+            raise ValueError("HBNB_STORAGE_SHARED needs fcntl file locks")
+        if self.shared and self.shards:
+            raise ValueError("HBNB_STORAGE_SHARED does not support shards")
+        self.__lock_file = None
+        self.__seen = None
 
     def all(self):
         """
          Prints all string representation of all instances
          based or not on the class name
         """
+        self.__sync()
+        self.__load_shards()
+        for key in list(FileStorage.__raw):
+            self.__load(key)
+        FileStorage.__lent = True
         return FileStorage.__objects
 
+    def get(self, cls, id):
+        """
+        returns the instance of cls (a class or its name) with id,
+        None if there is none
+        """
+        self.__sync()
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        key = "{}.{}".format(cls, id)
+        obj = FileStorage.__objects.get(key)
+        if obj is None and FileStorage.__snapshot is not None:
+            if key not in FileStorage.__raw and self.__mapped(key):
+                record = FileStorage.__snapshot.get(key)
+                FileStorage.__raw[key] = record
+                self.__index([(key, record)])
+        elif obj is None and FileStorage.__unloaded:
+            self.__load_shards([shard_of(key, self.shards)])
+        if obj is None and key in FileStorage.__raw:
+            obj = self.__load(key)
+        return obj
+
+    def all_of(self, cls):
+        """
+        returns the instances of cls (a class or its name) by key
+        """
+        self.__sync()
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        self.__load_shards(cls)
+        keys = FileStorage.__by_class.get(cls, {})
+        return {k: FileStorage.__objects.get(k) or self.__load(k)
+                for k in list(keys)}
+
+    def related(self, cls, field, value):
+        """
+        returns the instances of cls (a class or its name) whose field
+        equals value by key
+        """
+        self.__sync()
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        self.__load_shards(cls)
+        if field in relations.get(cls, ()):
+            self.__reindex()
+            if not FileStorage.__indexes.built(cls, field):
+                FileStorage.__indexes.build(cls, field, self.__entries(cls))
+        try:
+            keys = FileStorage.__indexes.lookup(cls, field, value)
+        except KeyError:
+            return {k: v for k, v in self.all_of(cls).items()
+                    if getattr(v, field, None) == value}
+        return {k: FileStorage.__objects.get(k) or self.__load(k)
+                for k in keys}
+
+    def search(self, cls, **ranges):
+        """
+        returns the ids of the instances of cls (a class or its name)
+        whose numeric fields fall in ranges, each given as an inclusive
+        (low, high) pair where None leaves an end open, or as a value
+        """
+        self.__sync()
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        self.__load_shards(cls)
+        self.__build_columns(cls)
+        try:
+            keys = FileStorage.__columns.search(cls, ranges)
+        except KeyError:
+            keys = [k for k, v in self.all_of(cls).items()
+                    if all(matches(getattr(v, f, None), bounds(r))
+                           for f, r in ranges.items())]
+        return [k.partition('.')[2] for k in keys]
+
+    def column(self, cls, field):
+        """
+        returns the ids of the instances of cls (a class or its name)
+        and the values of their numeric field, see Columns.column()
+        """
+        self.__sync()
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        self.__load_shards(cls)
+        self.__build_columns(cls)
+        keys, values = FileStorage.__columns.column(cls, field)
+        return [k.partition('.')[2] for k in keys], values
+
+    def query(self, cls):
+        """
+        returns a Query over the instances of cls (a class or its name)
+        """
+        return Query(self, cls)
+
+    def count(self, cls=None):
+        """
+        returns the number of instances of cls (a class or its name),
+        of every class when cls is None
+        """
+        self.__sync()
+        if cls is None and FileStorage.__snapshot is not None:
+            return sum(self.count(name) for name in set(
+                FileStorage.__by_class).union(
+                    s[0] for s in FileStorage.__unloaded))
+        if cls is None:
+            self.__load_shards()
+            return len(FileStorage.__objects) + len(FileStorage.__raw)
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        if (FileStorage.__snapshot is not None and
+                (cls, 0) in FileStorage.__unloaded):
+            return self.__mapped_count(cls)
+        self.__load_shards(cls)
+        return len(FileStorage.__by_class.get(cls, ()))
+
     def new(self, obj):
         """
         sets in __objects the obj with key
         """
+        self.__sync()
         key = "{}.{}".format(type(obj).__name__, obj.id)
         FileStorage.__objects[key] = obj
+        FileStorage.__raw.pop(key, None)
+        FileStorage.__by_class.setdefault(type(obj).__name__, {})[key] = None
+        FileStorage.__changed.add(key)
+        FileStorage.__stale.add(key)
+        FileStorage.__removed.discard(key)
+        FileStorage.__unmapped.discard(key)
+        self.__uncache(key)
+
+    def touch(self, obj, name=None):
+        """
+        flags obj as changed since the last save, name is the attribute
+        that was set; the cache, indexes and columns catch up when a
+        save or a lookup needs them
+        """
+        if FileStorage.__owner is not FileStorage.__objects:
+            self.__sync()
+        key = "{}.{}".format(type(obj).__name__, getattr(obj, "id", None))
+        if FileStorage.__objects.get(key) is obj:
+            FileStorage.__changed.add(key)
+            FileStorage.__stale.add(key)
+
+    def delete(self, obj=None):
+        """
+        deletes obj from __objects if it's inside
+        """
+        if obj is None:
+            return
+        self.__sync()
+        key = "{}.{}".format(type(obj).__name__, obj.id)
+        if (FileStorage.__objects.pop(key, None) is None and
+                FileStorage.__raw.pop(key, None) is None and
+                not self.__mapped(key)):
+            return
+        if FileStorage.__snapshot is not None:
+            FileStorage.__unmapped.add(key)
+        FileStorage.__by_class.get(type(obj).__name__, {}).pop(key, None)
+        FileStorage.__indexes.remove(key)
+        FileStorage.__columns.remove(key)
+        FileStorage.__stale.discard(key)
+        FileStorage.__changed.discard(key)
+        FileStorage.__removed.add(key)
+        self.__uncache(key)
 
     def save(self):
         """
         serializes __objects to the JSON file (path: _FileStorage__file_path)
         """
-        with open(FileStorage._FileStorage__file_path, 'w') as f:
-            json.dump(
-                {k: v.to_dict() for k, v in FileStorage.__objects.items()}, f)
+        if self.__depth == 0:
+            self.__flush()
+            return
+        self.__deferred += 1
+        if ((self.__max_saves and self.__deferred >= self.__max_saves) or
+                (self.__max_seconds and time.monotonic() -
+                 self.__flushed_at >= self.__max_seconds)):
+            self.__flush()
+
+    def begin(self, max_saves=None, max_seconds=None):
+        """
+        defers saves until the matching commit(), writing early once
+        max_saves saves or max_seconds seconds have piled up
+        """
+        if self.__depth == 0:
+            self.__deferred = 0
+            self.__max_saves = max_saves
+            self.__max_seconds = max_seconds
+            self.__flushed_at = time.monotonic()
+        self.__depth += 1
+
+    def commit(self):
+        """
+        ends a begin(), the outermost one writes the deferred saves
+        """
+        if self.__depth == 0:
+            return
+        self.__depth -= 1
+        if self.__depth == 0 and self.__deferred:
+            self.__flush()
+
+    def rollback(self):
+        """
+        ends every open batch without writing its deferred saves
+        and reloads what was last written
+        """
+        self.__depth = 0
+        self.__deferred = 0
+        FileStorage.__objects = {}
+        self.reload()
+
+    def flush(self):
+        """
+        waits until every save issued so far is on disk
+        """
+        if self.writer is not None:
+            self.writer.flush()
+
+    def close(self):
+        """
+        commits open batches, waits for the pending writes and
+        forces those the fsync policy deferred to disk
+        """
+        while self.__depth:
+            self.commit()
+        if self.writer is not None:
+            self.writer.close()
+        self.fsync.close()
+
+    def in_batch(self):
+        """
+        tells if saves are being deferred
+        """
+        return self.__depth > 0
+
+    @contextmanager
+    def batch(self, max_saves=None, max_seconds=None):
+        """
+        runs the block between begin() and commit()
+        """
+        self.begin(max_saves, max_seconds)
+        try:
+            yield self
+        finally:
+            self.commit()
+
+    def compact(self):
+        """
+        writes a full snapshot of __objects and drops the journal
+        """
+        if self.shared and self.__lock_file is None:
+            self.__exclusive(self.compact)
+            return
+        self.__sync()
+        self.__settle()
+        serializer = self.__get_serializer()
+        if self.shards:
+            self.__load_shards()
+            existing = list_shards(self.__shard_dir(), serializer.extension)
+            self.__write_shards(
+                set(existing) | {shard_of(k, self.shards)
+                                 for k in (*FileStorage.__objects,
+                                           *FileStorage.__raw)})
+            return
+        journal = self.__get_journal()
+        path = FileStorage._FileStorage__file_path
+        entries = chain(((k, self.__encode(k)) for k in chain(
+            FileStorage.__objects, FileStorage.__raw)),
+            self.__mapped_entries())
+        if self.writer is not None:
+            entries = list(entries)
+
+        def write():
+            atomic_write(path, serializer.mode,
+                         lambda f: serializer.dump(entries, f), self.fsync)
+            journal.clear()
+        self.__run(write, snapshot=True)
 
     def reload(self):
         """
         deserializes the JSON
         """
-        current_classes = {'BaseModel': BaseModel, 'User': User,
-                           'Amenity': Amenity, 'City': City, 'State': State,
-                           'Place': Place, 'Review': Review}
+        if not metrics.enabled:
+            self.__reload_locked()
+            return
+        start = time.perf_counter()
+        self.__reload_locked()
+        metrics.record("storage.reload", time.perf_counter() - start)
+        metrics.count("storage.objects_loaded",
+                      len(FileStorage.__objects) + len(FileStorage.__raw))
 
+    def refresh(self):
+        """
+        in shared mode, merges what other processes saved since the
+        file was last read or written here, keeping the changes not
+        saved yet; only a stat of the file when it did not change
+        """
+        if not self.shared or self.__identity() == self.__seen:
+            return
+        with self.__locked(False):
+            self.__seen = self.__identity()
+            self.__merge()
+
+    def __reload_locked(self):
+        """
+        reloads under the shared lock in shared mode
+        """
+        if not self.shared:
+            self.__reload()
+            return
+        with self.__locked(False):
+            self.__seen = self.__identity()
+            self.__reload()
+
+    def __reload(self):
+        """
+        reads the file, or the shards, and replays the journal
+        """
+        self.flush()
+        serializer = self.__get_serializer()
+        if self.shards and self.__reload_shards():
+            return
+        journal = self.__get_journal()
+        if os.path.exists(FileStorage._FileStorage__file_path):
+            serializers.check(FileStorage._FileStorage__file_path,
+                              serializer)
+        if (serializer.name == "snapshot" and not self.shards and
+                os.path.exists(FileStorage._FileStorage__file_path)):
+            self.__map_snapshot(journal)
+            return
+        build = None
+        if self.streaming and not self.lazy:
+            def build(k, v):
+                return classes[k.partition('.')[0]](**v)
         if not os.path.exists(FileStorage._FileStorage__file_path):
+            if not journal.exists():
+                return
+            deserialized = {}
+        else:
+            with open(FileStorage._FileStorage__file_path,
+                      'r' + serializer.mode) as f:
+                deserialized = None
+
+                try:
+                    if not self.streaming:
+                        deserialized = serializer.load(f)
+                    elif build is None:
+                        deserialized = dict(serializer.iterload(f))
+                    else:
+                        deserialized = {k: build(k, v)
+                                        for k, v in serializer.iterload(f)}
+                except serializer.errors:
+                    pass
+
+                if deserialized is None:
+                    return
+
+        for op, k, v in journal.replay():
+            if op == "put":
+                deserialized[k] = v if build is None else build(k, v)
+            else:
+                deserialized.pop(k, None)
+
+        if self.lazy:
+            FileStorage.__objects = {}
+            self.__sync()
+            FileStorage.__raw = deserialized
+            self.__index(deserialized.items())
+        elif build is not None:
+            FileStorage.__objects = deserialized
+            self.__sync()
+        else:
+            FileStorage.__objects = {
+                k: classes[k.split('.')[0]](**v)
+                for k, v in deserialized.items()}
+            self.__sync()
+        if self.shards:
+            FileStorage.__stale_shards = {
+                shard_of(k, self.shards) for k in deserialized}
+
+    def __flush(self):
+        """
+        writes the changes since the last write
+        """
+        write = self.__write
+        if self.shared:
+            def write():
+                self.__exclusive(self.__write)
+        if not metrics.enabled:
+            write()
             return
+        self.__encodes = 0
+        self.__encode_seconds = 0
+        start = time.perf_counter()
+        write()
+        metrics.record("storage.save", time.perf_counter() - start)
+        metrics.record("storage.encode", self.__encode_seconds)
+        metrics.count("storage.objects_serialized", self.__encodes)
 
-        with open(FileStorage._FileStorage__file_path, 'r') as f:
-            deserialized = None
+    def __write(self):
+        """
+        writes the changed objects to the journal, the snapshot
+        or the shards
+        """
+        self.__deferred = 0
+        self.__flushed_at = time.monotonic()
+        self.__sync()
+        self.__settle()
+        self.__get_serializer()
+        if self.shards:
+            self.__write_shards({shard_of(k, self.shards) for k in (
+                *FileStorage.__changed, *FileStorage.__removed)})
+            FileStorage.__changed.clear()
+            FileStorage.__removed.clear()
+            return
+        journal = self.__get_journal()
+        if self.journaled and (os.path.exists(
+                FileStorage._FileStorage__file_path) or (
+                self.writer is not None and self.__snapshot_exists)):
+            if self.__journaled_records is None:
+                self.__journaled_records = sum(1 for _ in journal.replay())
+            puts = [(k, self.__journal_text(k))
+                    for k in FileStorage.__changed
+                    if k in FileStorage.__objects]
+            deletes = list(FileStorage.__removed)
+            self.__journaled_records += len(puts) + len(deletes)
+            self.__run(lambda: journal.append(puts, deletes))
+            if self.__journaled_records >= self.journal_limit:
+                self.compact()
+        else:
+            self.compact()
+        FileStorage.__changed.clear()
+        FileStorage.__removed.clear()
+
+    @contextmanager
+    def __locked(self, exclusive):
+        """
+        holds the advisory lock of the file, exclusive or shared,
+        unless it is held already
+        """
+        if self.__lock_file is not None:
+            yield
+            return
+        self.__lock_file = open(
+            FileStorage._FileStorage__file_path + ".lock", "a")
+        try:
+            fcntl.flock(self.__lock_file,
+                        fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+        finally:
+            self.__lock_file.close()
+            self.__lock_file = None
 
+    def __identity(self):
+        """
+        returns the (inode, size, modification time) of the file and of
+        its journal, None for a missing one
+        """
+        path = FileStorage._FileStorage__file_path
+        identity = []
+        for name in (path, self.__get_journal().path):
             try:
-                deserialized = json.load(f)
-            except json.JSONDecodeError:
-                pass
+                st = os.stat(name)
+            except FileNotFoundError:
+                identity.append(None)
+            else:
+                identity.append((st.st_ino, st.st_size, st.st_mtime_ns))
+        return tuple(identity)
+
+    def __exclusive(self, write):
+        """
+        runs write under the exclusive lock, first merging what other
+        processes saved since the file was last read or written here
+        """
+        with self.__locked(True):
+            if self.__identity() != self.__seen:
+                self.__merge()
+            write()
+            self.flush()
+            self.__seen = self.__identity()
+
+    def __merge(self):
+        """
+        reloads the file and flags the changes not saved yet over it
+        """
+        self.__sync()
+        changed = [FileStorage.__objects[k] for k in FileStorage.__changed
+                   if k in FileStorage.__objects]
+        removed = list(FileStorage.__removed)
+        FileStorage.__objects = {}
+        self.__reload()
+        for obj in changed:
+            self.new(obj)
+        for key in removed:
+            obj = self.get(*key.split('.', 1))
+            if obj is not None:
+                self.delete(obj)
+
+    def __run(self, job, snapshot=False):
+        """
+        runs the write job now, or hands it to the background writer
+        """
+        if snapshot:
+            self.__snapshot_exists = True
+            self.__journaled_records = 0
+        if self.writer is None:
+            job()
+        else:
+            self.writer.submit(job, snapshot)
+
+    def __shard_dir(self):
+        """
+        returns the directory holding the shards
+        """
+        return FileStorage._FileStorage__file_path + ".d"
+
+    def __reload_shards(self):
+        """
+        reloads the shard directory, reading every shard now
+        unless in lazy mode, tells if there was one
+        """
+        files = list_shards(self.__shard_dir(), self.__serializer.extension)
+        if not files:
+            return False
+        FileStorage.__objects = {}
+        self.__sync()
+        FileStorage.__unloaded = files
+        if not self.lazy:
+            self.__load_shards()
+            for key in list(FileStorage.__raw):
+                self.__load(key)
+        return True
 
-            if deserialized is None:
+    def __load_shards(self, which=None):
+        """
+        reads the unloaded shards of class name which, or in the list
+        which, or all of them when which is None, into the parsed records
+        """
+        unloaded = FileStorage.__unloaded
+        if not unloaded:
+            return
+        if which is None:
+            shards = list(unloaded)
+        elif isinstance(which, str):
+            shards = [s for s in unloaded if s[0] == which]
+        else:
+            shards = [s for s in which if s in unloaded]
+        if not shards:
+            return
+        self.flush()
+        serializer = self.__serializer
+
+        def read(shard):
+            if FileStorage.__snapshot is not None:
+                return shard, dict(FileStorage.__snapshot.items(shard[0]))
+            with open(unloaded[shard], 'r' + serializer.mode) as f:
+                return shard, serializer.load(f)
+        if (self.workers > 1 and len(shards) > 1 and
+                FileStorage.__snapshot is None and not parallel.in_worker()):
+            loaded = list(zip(shards, map(dict, parallel.read_shards(
+                [unloaded[s] for s in shards], serializer.name,
+                min(self.workers, len(shards))))))
+        else:
+            loaded = [read(shard) for shard in shards]
+        for shard, records in loaded:
+            del unloaded[shard]
+            for k in [k for k in records if k in FileStorage.__objects or
+                      k in FileStorage.__raw or k in FileStorage.__removed or
+                      k in FileStorage.__unmapped]:
+                del records[k]
+            FileStorage.__raw.update(records)
+            self.__index(records.items())
+            for k in records:
+                if shard_of(k, self.shards) != shard:
+                    FileStorage.__stale_shards.add(shard)
+                    FileStorage.__stale_shards.add(shard_of(k, self.shards))
+
+    def __write_shards(self, shards):
+        """
+        rewrites the given shards, removing the files of empty ones
+        """
+        shards = shards | FileStorage.__stale_shards
+        if not shards:
+            return
+        self.__load_shards(shards)
+        FileStorage.__stale_shards = set()
+        serializer = self.__serializer
+        directory = self.__shard_dir()
+        os.makedirs(directory, exist_ok=True)
+        members = {s: [] for s in shards}
+        for name in {s[0] for s in shards}:
+            for k in FileStorage.__by_class.get(name, ()):
+                shard = shard_of(k, self.shards)
+                if shard in members:
+                    members[shard].append(k)
+
+        def write(path, entries):
+            if not entries:
+                if os.path.exists(path):
+                    os.remove(path)
                 return
+            atomic_write(path, serializer.mode,
+                         lambda f: serializer.dump(entries, f), self.fsync)
+        for shard, keys in members.items():
+            path = shard_path(directory, shard, serializer.extension)
+            entries = [(k, self.__encode(k)) for k in keys]
+            self.__run(lambda path=path, entries=entries: write(path, entries))
 
-            FileStorage.__objects = {
-                k: current_classes[k.split('.')[0]](**v)
-                for k, v in deserialized.items()}
+    def __map_snapshot(self, journal):
+        """
+        maps the snapshot file and replays the journal over it, every
+        class being decoded when it is first needed and a single record
+        when get() asks for it
+        """
+        try:
+            snapshot = Snapshot(FileStorage._FileStorage__file_path)
+        except self.__serializer.errors:
+            return
+        puts = {}
+        deletes = set()
+        for op, k, v in journal.replay():
+            if op == "put":
+                puts[k] = v
+                deletes.discard(k)
+            else:
+                puts.pop(k, None)
+                deletes.add(k)
+        FileStorage.__objects = {}
+        self.__sync()
+        FileStorage.__snapshot = snapshot
+        FileStorage.__unmapped = deletes
+        FileStorage.__unloaded = {(name, 0): snapshot.path
+                                  for name in snapshot.classes}
+        FileStorage.__raw = puts
+        self.__index(puts.items())
+
+    def __mapped(self, key):
+        """
+        tells if key is only in the mapped snapshot so far
+        """
+        snapshot = FileStorage.__snapshot
+        return (snapshot is not None and
+                (key.partition('.')[0], 0) in FileStorage.__unloaded and
+                key not in FileStorage.__unmapped and key in snapshot)
+
+    def __mapped_count(self, name):
+        """
+        returns the number of `name` instances while the class is only
+        in the mapped snapshot, without decoding it
+        """
+        snapshot = FileStorage.__snapshot
+        first, last = snapshot.range(name)
+        prefix = name + "."
+        return (last - first -
+                sum(1 for k in FileStorage.__unmapped
+                    if k.startswith(prefix) and k in snapshot) +
+                sum(1 for k in FileStorage.__by_class.get(name, ())
+                    if k not in snapshot))
+
+    def __mapped_entries(self):
+        """
+        yields the (key, encoded record) pairs of the classes still only
+        in the mapped snapshot that were not loaded, changed or deleted,
+        copying the records as they are when the file is a snapshot
+        """
+        snapshot = FileStorage.__snapshot
+        if snapshot is None:
+            return
+        copy = self.__serializer.name == "snapshot"
+        for name, _ in list(FileStorage.__unloaded):
+            for k, text in snapshot.texts(name):
+                if (k in FileStorage.__objects or k in FileStorage.__raw or
+                        k in FileStorage.__unmapped):
+                    continue
+                if not copy:
+                    text = self.__serializer.encode_record(json.loads(text))
+                yield k, text
+
+    def __index(self, entries):
+        """
+        adds the (key, instance or record) pairs in entries to the class
+        index, and to the indexes and columns built so far
+        """
+        by_class = FileStorage.__by_class
+        indexes = FileStorage.__indexes
+        columns = FileStorage.__columns
+        for k, v in entries:
+            name = k.partition('.')[0]
+            if name not in by_class:
+                by_class[name] = {}
+            by_class[name][k] = None
+        if indexes or columns:
+            for k, v in entries:
+                indexes.add(k, v)
+                columns.add(k, v)
+
+    def __entries(self, cls):
+        """
+        returns the (key, instance or record) pairs of the loaded
+        objects of class name cls
+        """
+        return [(k, FileStorage.__objects.get(k) or FileStorage.__raw[k])
+                for k in FileStorage.__by_class.get(cls, ())]
+
+    def __reindex(self):
+        """
+        updates the indexes and columns built so far with the objects
+        added or touched since the last update
+        """
+        stale, FileStorage.__stale = FileStorage.__stale, set()
+        if not (FileStorage.__indexes or FileStorage.__columns):
+            return
+        for k in stale:
+            obj = FileStorage.__objects.get(k)
+            if obj is not None:
+                FileStorage.__indexes.add(k, obj)
+                FileStorage.__columns.add(k, obj)
+
+    def __build_columns(self, cls):
+        """
+        builds the columns of class name cls the first time they are
+        needed, and brings them up to date
+        """
+        if cls in numeric:
+            self.__reindex()
+            if not FileStorage.__columns.built(cls):
+                FileStorage.__columns.build(cls, self.__entries(cls))
+
+    def __settle(self):
+        """
+        drops the cached text of the objects touched since the last write
+        """
+        for k in FileStorage.__changed:
+            self.__uncache(k)
+
+    def __load(self, key):
+        """
+        builds the instance of the parsed record at key
+        """
+        obj = classes[key.split('.')[0]](**FileStorage.__raw.pop(key))
+        FileStorage.__objects[key] = obj
+        return obj
+
+    def __encode(self, key):
+        """
+        returns the encoded record of the object at key, encoding it
+        only when it changed since it was last encoded
+        """
+        text = FileStorage.__encoded.get(key)
+        if text is None:
+            timed = metrics.enabled
+            if timed:
+                start = time.perf_counter()
+            obj = FileStorage.__objects.get(key)
+            if obj is None:
+                record = FileStorage.__raw[key]
+                text = self.__serializer.encode_record(record)
+            else:
+                record = state(obj)
+                text = self.__serializer.encode(obj)
+            if timed:
+                self.__encodes += 1
+                self.__encode_seconds += time.perf_counter() - start
+            if (self.cache and FileStorage.__encoded_size + len(text) <=
+                    self.cache_limit and not any(
+                        isinstance(v, (list, dict)) for v in record.values())):
+                FileStorage.__encoded[key] = text
+                FileStorage.__encoded_size += len(text)
+        return text
+
+    def __uncache(self, key):
+        """
+        drops the encoded record of key from the cache
+        """
+        text = FileStorage.__encoded.pop(key, None)
+        if text is not None:
+            FileStorage.__encoded_size -= len(text)
+
+    def __journal_text(self, key):
+        """
+        returns the JSON text of the object at key for the journal
+        """
+        if self.__serializer.name == "json":
+            return self.__encode(key)
+        return serializers.JSONSerializer().encode(FileStorage.__objects[key])
+
+    def __get_serializer(self):
+        """
+        returns the serializer of the file,
+        dropping the encoded records when it changed
+        """
+        serializer = serializers.for_path(
+            FileStorage._FileStorage__file_path, self.format)
+        if type(serializer) is not type(self.__serializer):
+            self.__serializer = serializer
+            FileStorage.__encoded.clear()
+            FileStorage.__encoded_size = 0
+        return self.__serializer
+
+    def __get_journal(self):
+        """
+        returns the journal that sits next to the JSON file
+        """
+        path = FileStorage._FileStorage__file_path + ".journal"
+        if (self.__journal is None or self.__journal.path != path or
+                self.__journal.policy is not self.fsync):
+            self.__journal = Journal(path, self.fsync)
+        return self.__journal
+
+    def __sync(self):
+        """
+        resets the change tracking when __objects was replaced
+        """
+        if FileStorage.__owner is not FileStorage.__objects:
+            FileStorage.__owner = FileStorage.__objects
+            FileStorage.__changed = set()
+            FileStorage.__removed = set()
+            FileStorage.__encoded = {}
+            FileStorage.__encoded_size = 0
+            FileStorage.__raw = {}
+            FileStorage.__by_class = {}
+            FileStorage.__stale = set()
+            FileStorage.__lent = False
+            FileStorage.__indexes = Indexes(lazy=True)
+            FileStorage.__columns = Columns(classes, lazy=True)
+            FileStorage.__unloaded = {}
+            FileStorage.__stale_shards = set()
+            FileStorage.__snapshot = None
+            FileStorage.__unmapped = set()
+            self.__index(FileStorage.__objects.items())
+        elif FileStorage.__lent:
+            self.__reconcile()
+
+    def __reconcile(self):
+        """
+        catches up with the keys set in or deleted from the dictionary
+        returned by all() instead of going through new() or delete()
+        """
+        objects = FileStorage.__objects
+        raw = FileStorage.__raw
+        by_class = FileStorage.__by_class
+        if len(objects) + len(raw) == sum(map(len, by_class.values())):
+            return
+        for keys in by_class.values():
+            for k in [k for k in keys if k not in objects and k not in raw]:
+                del keys[k]
+                if FileStorage.__snapshot is not None:
+                    FileStorage.__unmapped.add(k)
+                FileStorage.__indexes.remove(k)
+                FileStorage.__columns.remove(k)
+                FileStorage.__stale.discard(k)
+                FileStorage.__changed.discard(k)
+                FileStorage.__removed.add(k)
+                self.__uncache(k)
+        for k in objects:
+            name = k.partition('.')[0]
+            if k not in by_class.get(name, ()):
+                by_class.setdefault(name, {})[k] = None
+                FileStorage.__changed.add(k)
+                FileStorage.__stale.add(k)
+                FileStorage.__removed.discard(k)
+                FileStorage.__unmapped.discard(k)
+                self.__uncache(k)
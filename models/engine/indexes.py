@@ -0,0 +1,132 @@
+#!/usr/bin/python3
+"""
+Module indexes
+"""
+
+relations = {'City': ('state_id',),
+             'Place': ('city_id', 'user_id'),
+             'Review': ('place_id', 'user_id')}
+
+
+class ForeignKeyIndex():
+    """
+    reverse map from the values of one foreign key field
+    to the keys of the objects holding them
+    """
+
+    def __init__(self, field):
+        """
+        indexes the values of `field`
+        """
+        self.field = field
+        self.__values = {}
+        self.__keys = {}
+
+    def add(self, key, value):
+        """
+        maps key to value, replacing what key was mapped to before
+        """
+        self.remove(key)
+        if not isinstance(value, (str, int, float)) or value == "":
+            return
+        self.__values[key] = value
+        self.__keys.setdefault(value, {})[key] = None
+
+    def remove(self, key):
+        """
+        forgets key
+        """
+        if key not in self.__values:
+            return
+        value = self.__values.pop(key)
+        keys = self.__keys[value]
+        del keys[key]
+        if not keys:
+            del self.__keys[value]
+
+    def lookup(self, value):
+        """
+        returns the keys mapped to value
+        """
+        return list(self.__keys.get(value, ()))
+
+
+class Indexes():
+    """
+    foreign key indexes of the classes listed in `relations`
+    """
+
+    def __init__(self, lazy=False):
+        """
+        creates one empty index per foreign key field, or none until
+        build() asks for it when lazy
+        """
+        self.__indexes = {} if lazy else {
+            name: {f: ForeignKeyIndex(f) for f in fields}
+            for name, fields in relations.items()}
+
+    def __len__(self):
+        """
+        returns the number of indexes built
+        """
+        return sum(map(len, self.__indexes.values()))
+
+    def built(self, name, field):
+        """
+        tells if field of the `name` objects is indexed
+        """
+        return field in self.__indexes.get(name, ())
+
+    def build(self, name, field, entries):
+        """
+        indexes field of the `name` objects from entries, the (key,
+        instance or parsed record) pairs of all of them
+        """
+        index = ForeignKeyIndex(field)
+        for key, entry in entries:
+            if isinstance(entry, dict):
+                index.add(key, entry.get(field))
+            else:
+                index.add(key, getattr(entry, field, None))
+        self.__indexes.setdefault(name, {})[field] = index
+
+    def add(self, key, entry):
+        """
+        indexes the fields of entry, an instance or its parsed record
+        """
+        indexes = self.__indexes.get(key.partition('.')[0])
+        if indexes is None:
+            return
+        for field, index in indexes.items():
+            if isinstance(entry, dict):
+                index.add(key, entry.get(field))
+            else:
+                index.add(key, getattr(entry, field, None))
+
+    def update(self, key, obj, field):
+        """
+        re-indexes field of obj after it was set
+        """
+        indexes = self.__indexes.get(key.partition('.')[0])
+        if indexes is None:
+            return
+        if field is None:
+            self.add(key, obj)
+        elif field in indexes:
+            indexes[field].add(key, getattr(obj, field, None))
+
+    def remove(self, key):
+        """
+        drops key from every index
+        """
+        for index in self.__indexes.get(key.partition('.')[0], {}).values():
+            index.remove(key)
+
+    def lookup(self, name, field, value):
+        """
+        returns the keys of the `name` objects whose field equals value
+        """
+        indexes = self.__indexes.get(name)
+        if indexes is None or field not in indexes:
+            raise KeyError("{}.{} is not indexed".format(name, field))
+        return indexes[field].lookup(value)
@@ -0,0 +1,90 @@
+#!/usr/bin/python3
+"""
+Module journal
+"""
+import os
+import json
+from models.engine import metrics
+
+
+class Journal():
+    """
+    append-only log of the mutations made since the last snapshot,
+    one JSON record per line
+    """
+
+    def __init__(self, path, policy=None):
+        """
+        binds the journal to `path`, the file does not need to exist,
+        policy is the FsyncPolicy applied after each append
+        """
+        self.path = path
+        self.policy = policy
+        self.records = None
+
+    def exists(self):
+        """
+        tells if there is a journal on disk
+        """
+        return os.path.exists(self.path)
+
+    def append(self, puts, deletes):
+        """
+        appends one `put` record per (key, JSON text) pair in `puts`
+        and one `delete` record per key in `deletes`
+        """
+        lines = []
+        for k, v in puts:
+            lines.append('{{"op": "put", "key": {}, "value": {}}}'.format(
+                json.dumps(k), v))
+        for k in deletes:
+            lines.append(json.dumps({"op": "delete", "key": k}))
+        if not lines:
+            return
+        prefix = ""
+        if self.records is None:
+            self.records = sum(1 for _ in self.replay())
+            if self.exists() and not self.__ends_with_newline():
+                prefix = "\n"
+        text = prefix + "\n".join(lines) + "\n"
+        with open(self.path, 'a') as f:
+            f.write(text)
+            if self.policy and not self.policy.sync(f):
+                self.policy.defer(self.path)
+        self.records += len(lines)
+        if metrics.enabled:
+            metrics.count("storage.bytes_written", len(text.encode()))
+
+    def replay(self):
+        """
+        yields the (op, key, value) records in the order they were written,
+        skipping a torn record left by an interrupted append
+        """
+        if not self.exists():
+            return
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                yield record["op"], record["key"], record.get("value")
+
+    def __ends_with_newline(self):
+        """
+        checks that a previous append was not cut short
+        """
+        with open(self.path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return True
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def clear(self):
+        """
+        removes the journal once its records are folded into a snapshot
+        """
+        if self.exists():
+            os.remove(self.path)
+        self.records = 0
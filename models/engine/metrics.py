@@ -0,0 +1,154 @@
+#!/usr/bin/python3
+"""
+Module metrics
+"""
+import json
+import time
+import atexit
+import functools
+import threading
+
+enabled = False
+counters = {}
+timers = {}
+sinks = []
+lock = threading.Lock()
+
+
+def enable(path=None):
+    """
+    starts recording, appending every measure to the file at path
+    when one is given
+    """
+    global enabled
+    if path:
+        sink = FileSink(path)
+        add_sink(sink)
+        atexit.register(sink.close)
+    enabled = True
+
+
+def disable():
+    """
+    stops recording, keeping what was recorded so far
+    """
+    global enabled
+    enabled = False
+
+
+def add_sink(sink):
+    """
+    calls sink(kind, name, value) for every measure from now on,
+    kind being "counter" or "timer" and value a count or seconds
+    """
+    sinks.append(sink)
+
+
+def remove_sink(sink):
+    """
+    stops calling sink
+    """
+    if sink in sinks:
+        sinks.remove(sink)
+
+
+def count(name, value=1):
+    """
+    adds value to the counter name
+    """
+    with lock:
+        counters[name] = counters.get(name, 0) + value
+    for sink in sinks:
+        sink("counter", name, value)
+
+
+def record(name, seconds):
+    """
+    adds a call lasting seconds to the timer name
+    """
+    with lock:
+        timer = timers.get(name)
+        if timer is None:
+            timers[name] = [1, seconds, seconds]
+        else:
+            timer[0] += 1
+            timer[1] += seconds
+            if seconds > timer[2]:
+                timer[2] = seconds
+    for sink in sinks:
+        sink("timer", name, seconds)
+
+
+def timed(name):
+    """
+    decorator recording each call of a function in the timer name
+    while enabled, and only checking the flag otherwise
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def snapshot():
+    """
+    returns the counters and, by timer, its calls, total, mean
+    and max milliseconds
+    """
+    with lock:
+        return {"counters": dict(counters),
+                "timers": {name: {"calls": calls,
+                                  "total_ms": total * 1000,
+                                  "mean_ms": total / calls * 1000,
+                                  "max_ms": longest * 1000}
+                           for name, (calls, total, longest)
+                           in timers.items()}}
+
+
+def reset():
+    """
+    drops every counter and timer
+    """
+    with lock:
+        counters.clear()
+        timers.clear()
+
+
+class FileSink():
+    """
+    appends one JSON line per measure to a file:
+    {"time": ..., "kind": ..., "name": ..., "value": ...}
+    """
+
+    def __init__(self, path):
+        """
+        opens the file at path for appending
+        """
+        self.path = path
+        self.__file = open(path, 'a', buffering=1)
+        self.__lock = threading.Lock()
+
+    def __call__(self, kind, name, value):
+        """
+        writes the line of a measure
+        """
+        line = json.dumps({"time": time.time(), "kind": kind,
+                           "name": name, "value": value}) + "\n"
+        with self.__lock:
+            if not self.__file.closed:
+                self.__file.write(line)
+
+    def close(self):
+        """
+        closes the file
+        """
+        with self.__lock:
+            self.__file.close()
@@ -0,0 +1,45 @@
+#!/usr/bin/python3
+"""
+Module parallel
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from models.engine import serializers
+
+
+def in_worker():
+    """
+    tells if this process is a worker started by a parent process,
+    which must not start workers of its own
+    """
+    return multiprocessing.parent_process() is not None
+
+
+def read_shard(path, format):
+    """
+    returns the (key, record) pairs of the shard file at path
+    """
+    serializer = serializers.serializers[format]()
+    with open(path, 'r' + serializer.mode) as f:
+        return list(serializer.load(f).items())
+
+
+def pool(workers):
+    """
+    returns a process pool of workers processes, forked where the
+    platform allows it so that they start with the models loaded
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+    else:
+        context = multiprocessing.get_context()
+    return ProcessPoolExecutor(workers, mp_context=context)
+
+
+def read_shards(paths, format, workers):
+    """
+    returns the (key, record) pairs of each shard file in paths,
+    read by workers processes
+    """
+    with pool(workers) as p:
+        return list(p.map(read_shard, paths, [format] * len(paths)))
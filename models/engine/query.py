@@ -0,0 +1,252 @@
+#!/usr/bin/python3
+"""
+Module query
+"""
+import heapq
+import operator
+from models.engine.indexes import relations
+from models.engine.columns import numeric
+
+operators = {'eq': operator.eq, 'ne': operator.ne,
+             'lt': operator.lt, 'le': operator.le,
+             'gt': operator.gt, 'ge': operator.ge,
+             'in': lambda value, values: value in values}
+ranges = {'eq': lambda v: (v, v), 'lt': lambda v: (None, v),
+          'le': lambda v: (None, v), 'gt': lambda v: (v, None),
+          'ge': lambda v: (v, None)}
+MISSING = object()
+
+
+def parse_condition(name, value):
+    """
+    returns the (field, operator name, value) of a where() keyword,
+    field__op=value or field=value for equality
+    """
+    field, _, op = name.rpartition('__')
+    if not field or op not in operators:
+        field, op = name, 'eq'
+    return field, op, value
+
+
+def matches(obj, conditions):
+    """
+    tells if obj satisfies every (field, operator name, value) condition,
+    a missing attribute or a value of another type never does
+    """
+    for field, op, value in conditions:
+        attr = getattr(obj, field, MISSING)
+        if attr is MISSING:
+            return False
+        try:
+            if not operators[op](attr, value):
+                return False
+        except TypeError:
+            return False
+    return True
+
+
+def sort_key(field, descending=False):
+    """
+    returns a key function ordering objects on field the way SQLite
+    orders JSON values: numbers, then strings, then other values by
+    their text, objects without it last in both directions
+    """
+    def key(obj):
+        value = getattr(obj, field, None)
+        if value is None:
+            return (descending is False, 0)
+        if isinstance(value, (int, float)):
+            return (descending is True, 0, value)
+        if isinstance(value, str):
+            return (descending is True, 1, value)
+        return (descending is True, 2, type(value).__name__, str(value))
+    return key
+
+
+class Query():
+    """
+    a query over the instances of one class of a storage:
+    storage.query(Place).where(price_by_night__lt=100)
+                        .order_by("-max_guest").limit(10).only("id")
+
+    where() keywords are field=value or field__op=value with op one of
+    `operators`, order_by() fields starting with "-" sort descending;
+    each call returns a new query and nothing runs until the results
+    are asked for with all(), first(), count() or iteration
+    """
+
+    def __init__(self, storage, cls):
+        """
+        queries every instance of cls (a class or its name) in storage
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        self.storage = storage
+        self.name = cls
+        self.conditions = ()
+        self.ordering = ()
+        self.start = 0
+        self.stop = None
+        self.fields = None
+
+    def where(self, **conditions):
+        """
+        returns the query narrowed to the instances matching conditions
+        """
+        query = self.__copy()
+        query.conditions += tuple(parse_condition(k, v)
+                                  for k, v in conditions.items())
+        return query
+
+    def order_by(self, *fields):
+        """
+        returns the query sorted on fields
+        """
+        query = self.__copy()
+        query.ordering = fields
+        return query
+
+    def offset(self, count):
+        """
+        returns the query skipping its first count results
+        """
+        if count < 0:
+            raise ValueError("offset must be positive")
+        query = self.__copy()
+        query.start = count
+        return query
+
+    def limit(self, count):
+        """
+        returns the query stopping after count results
+        """
+        if count < 0:
+            raise ValueError("limit must be positive")
+        query = self.__copy()
+        query.stop = count
+        return query
+
+    def only(self, *fields):
+        """
+        returns the query giving dicts of fields instead of instances
+        """
+        query = self.__copy()
+        query.fields = fields
+        return query
+
+    def all(self):
+        """
+        returns the results as a list
+        """
+        return list(self)
+
+    def first(self):
+        """
+        returns the first result, None if there is none
+        """
+        return next(iter(self.limit(1)), None)
+
+    def count(self):
+        """
+        returns the number of results
+        """
+        count = max(sum(1 for obj in self.__matching()) - self.start, 0)
+        return count if self.stop is None else min(count, self.stop)
+
+    def __iter__(self):
+        """
+        yields the results
+        """
+        objs = self.__matching()
+        end = None if self.stop is None else self.start + self.stop
+        if self.ordering:
+            objs = self.__sorted(objs, end)
+        count = 0
+        for obj in objs:
+            if end is not None and count >= end:
+                return
+            count += 1
+            if count <= self.start:
+                continue
+            if self.fields is None:
+                yield obj
+            else:
+                yield {f: getattr(obj, f, None) for f in self.fields}
+
+    def __matching(self):
+        """
+        yields the instances satisfying the conditions, starting from
+        the smallest set the indexes give
+        """
+        candidates, conditions = self.candidates()
+        if not conditions:
+            yield from candidates
+            return
+        for obj in candidates:
+            if matches(obj, conditions):
+                yield obj
+
+    def candidates(self):
+        """
+        returns the instances a foreign key index or the numeric columns
+        narrow the conditions to, every instance of the class otherwise,
+        and the conditions left to check on them; storages with a query
+        engine of their own override it in a subclass
+        """
+        storage = self.storage
+        for field, op, value in self.conditions:
+            if (op == 'eq' and field in relations.get(self.name, ()) and
+                    isinstance(value, str) and value):
+                return (storage.related(self.name, field, value).values(),
+                        self.conditions)
+        bounds = {}
+        left = []
+        for field, op, value in self.conditions:
+            if (op in ranges and field in numeric.get(self.name, ()) and
+                    isinstance(value, (int, float))):
+                if op in ('lt', 'gt'):
+                    left.append((field, op, value))
+                low, high = bounds.get(field, (None, None))
+                new_low, new_high = ranges[op](value)
+                if new_low is not None and (low is None or new_low > low):
+                    low = new_low
+                if new_high is not None and (high is None or new_high < high):
+                    high = new_high
+                bounds[field] = (low, high)
+            else:
+                left.append((field, op, value))
+        if bounds:
+            return ((storage.get(self.name, id)
+                     for id in storage.search(self.name, **bounds)), left)
+        return storage.all_of(self.name).values(), self.conditions
+
+    def __sorted(self, objs, end):
+        """
+        returns objs in order, only picking the first end of them
+        when there are that few and one field to sort on
+        """
+        if end is not None and len(self.ordering) == 1:
+            field = self.ordering[0]
+            if field.startswith('-'):
+                return heapq.nlargest(end, objs,
+                                      key=sort_key(field[1:], True))
+            return heapq.nsmallest(end, objs, key=sort_key(field))
+        objs = list(objs)
+        for field in reversed(self.ordering):
+            if field.startswith('-'):
+                objs.sort(key=sort_key(field[1:], True), reverse=True)
+            else:
+                objs.sort(key=sort_key(field))
+        return objs
+
+    def __copy(self):
+        """
+        returns a copy of the query
+        """
+        query = type(self)(self.storage, self.name)
+        query.conditions = self.conditions
+        query.ordering = self.ordering
+        query.start = self.start
+        query.stop = self.stop
+        query.fields = self.fields
+        return query
@@ -0,0 +1,281 @@
+#!/usr/bin/python3
+"""
+Module serializers
+"""
+import os
+import re
+import json
+import pickle
+from datetime import datetime, timedelta
+from json.encoder import encode_basestring_ascii
+from models.compact import state
+from models.engine import snapshot
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class FormatError(ValueError):
+    """
+    raised for a file in another format than the configured one
+    """
+
+
+class JSONSerializer():
+    """
+    the file.json format: one JSON object mapping every key
+    to the to_dict() of its instance
+    """
+
+    name = "json"
+    extension = ".json"
+    mode = ""
+    errors = (json.JSONDecodeError,)
+
+    def encode(self, obj):
+        """
+        returns the JSON text of an instance
+        """
+        return json.dumps(obj.to_dict())
+
+    def encode_record(self, record):
+        """
+        returns the JSON text of a parsed record
+        """
+        return json.dumps(record, default=datetime.isoformat)
+
+    def dump(self, entries, f):
+        """
+        writes the (key, encoded record) pairs of entries to f
+        one after the other
+        """
+        write = f.write
+        separator = "{"
+        for k, v in entries:
+            write(separator)
+            write(encode_basestring_ascii(k))
+            write(": ")
+            write(v)
+            separator = ", "
+        write("{}" if separator == "{" else "}")
+
+    def load(self, f):
+        """
+        returns the records of f by key
+        """
+        return json.load(f)
+
+    def iterload(self, f, chunk_size=65536):
+        """
+        yields the (key, record) pairs of f one at a time,
+        reading f by chunks of chunk_size characters
+        """
+        decoder = json.JSONDecoder()
+        buf = ""
+        pos = 0
+        eof = False
+
+        def more():
+            nonlocal buf, pos, eof
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+            buf = buf[pos:] + chunk
+            pos = 0
+
+        def skip():
+            nonlocal pos
+            while True:
+                pos = WHITESPACE.match(buf, pos).end()
+                if pos < len(buf) or eof:
+                    return
+                more()
+
+        def expect(chars):
+            nonlocal pos
+            skip()
+            if pos >= len(buf) or buf[pos] not in chars:
+                raise json.JSONDecodeError(
+                    "Expecting one of {!r}".format(chars), buf, pos)
+            pos += 1
+            return buf[pos - 1]
+
+        def decode():
+            nonlocal pos
+            skip()
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    more()
+                    continue
+                if end == len(buf) and not eof:
+                    more()
+                    continue
+                pos = end
+                return value
+
+        expect("{")
+        skip()
+        if buf[pos:pos + 1] == "}":
+            return
+        while True:
+            key = decode()
+            expect(":")
+            yield key, decode()
+            if expect(",}") == "}":
+                return
+
+
+class PickleSerializer():
+    """
+    a binary format: a stream of pickle protocol 5 (key, record) pairs
+    where created_at and updated_at are stored as epoch microseconds,
+    only load files you wrote yourself
+    """
+
+    name = "pickle"
+    extension = ".pickle"
+    mode = "b"
+    errors = (pickle.UnpicklingError, EOFError, ValueError)
+
+    def encode(self, obj):
+        """
+        returns the pickled record of an instance
+        """
+        record = dict(state(obj))
+        record["__class__"] = type(obj).__name__
+        return self.encode_record(record)
+
+    def encode_record(self, record):
+        """
+        returns the pickled record
+        """
+        record = dict(record)
+        for k in ("created_at", "updated_at"):
+            v = record.get(k)
+            if isinstance(v, str):
+                v = datetime.fromisoformat(v)
+            if isinstance(v, datetime):
+                record[k] = (v - EPOCH) // MICROSECOND
+        return pickle.dumps(record, protocol=5)
+
+    def dump(self, entries, f):
+        """
+        writes the (key, encoded record) pairs of entries to f
+        """
+        for k, v in entries:
+            f.write(pickle.dumps(k, protocol=5))
+            f.write(v)
+
+    def load(self, f):
+        """
+        returns the records of f by key
+        """
+        return dict(self.iterload(f))
+
+    def iterload(self, f):
+        """
+        yields the (key, record) pairs of f one at a time
+        """
+        while True:
+            try:
+                k = pickle.load(f)
+            except EOFError:
+                return
+            record = pickle.load(f)
+            for field in ("created_at", "updated_at"):
+                if field in record:
+                    record[field] = EPOCH + record[field] * MICROSECOND
+            yield k, record
+
+
+class SnapshotSerializer():
+    """
+    a binary format with an index, see snapshot.dump: the JSON record
+    of every key and a sorted table of their offsets, so FileStorage
+    can map the file and decode one record at a time
+    """
+
+    name = "snapshot"
+    extension = ".snap"
+    mode = "b"
+    errors = (snapshot.SnapshotError, json.JSONDecodeError)
+
+    def encode(self, obj):
+        """
+        returns the JSON bytes of an instance
+        """
+        return json.dumps(obj.to_dict()).encode()
+
+    def encode_record(self, record):
+        """
+        returns the JSON bytes of a parsed record
+        """
+        return json.dumps(record, default=datetime.isoformat).encode()
+
+    def dump(self, entries, f):
+        """
+        writes the (key, encoded record) pairs of entries to f
+        """
+        snapshot.dump(entries, f)
+
+    def load(self, f):
+        """
+        returns the records of f by key
+        """
+        return dict(self.iterload(f))
+
+    def iterload(self, f):
+        """
+        yields the (key, record) pairs of f in key order
+        """
+        yield from snapshot.Snapshot(data=f.read()).items()
+
+
+serializers = {'json': JSONSerializer, 'pickle': PickleSerializer,
+               'snapshot': SnapshotSerializer}
+extensions = {'.json': 'json', '.pickle': 'pickle', '.pkl': 'pickle',
+              '.snap': 'snapshot'}
+
+
+def sniff(path):
+    """
+    returns the name of the format of the file at path picked from its
+    first bytes, None when it is empty or in no known format
+    """
+    with open(path, 'rb') as f:
+        head = f.read(len(snapshot.MAGIC) + 64).lstrip()
+    if head.startswith(snapshot.MAGIC):
+        return 'snapshot'
+    if head.startswith(b"\x80"):
+        return 'pickle'
+    if head.startswith(b"{"):
+        return 'json'
+    return None
+
+
+def check(path, serializer):
+    """
+    raises FormatError when the file at path is not in the format of
+    serializer, rather than reading it as nothing and overwriting it
+    """
+    found = sniff(path)
+    if found is not None and found != serializer.name:
+        raise FormatError(
+            "{} is a {} file, not {}: set HBNB_STORAGE_FORMAT={} or "
+            "HBNB_STORAGE_PATH to another file".format(
+                path, found, serializer.name, found))
+
+
+def for_path(path, name=None):
+    """
+    returns the serializer called name,
+    or the one matching the extension of path when name is None
+    """
+    if not name:
+        name = extensions.get(os.path.splitext(path)[1], 'json')
+    return serializers[name]()
@@ -0,0 +1,40 @@
+#!/usr/bin/python3
+"""
+Module shards
+"""
+import os
+import zlib
+
+
+def shard_of(key, buckets):
+    """
+    returns the (class name, bucket) shard of key
+    """
+    name, _, id = key.partition('.')
+    if buckets <= 1:
+        return name, 0
+    return name, zlib.crc32(id.encode()) % buckets
+
+
+def shard_path(directory, shard, extension):
+    """
+    returns the path of the file holding shard
+    """
+    return os.path.join(directory, "{}.{}{}".format(
+        shard[0], shard[1], extension))
+
+
+def list_shards(directory, extension):
+    """
+    returns the shard files found in directory by shard
+    """
+    found = {}
+    if not os.path.isdir(directory):
+        return found
+    for entry in os.listdir(directory):
+        if not entry.endswith(extension):
+            continue
+        name, _, bucket = entry[:-len(extension)].rpartition('.')
+        if name and bucket.isdigit():
+            found[(name, int(bucket))] = os.path.join(directory, entry)
+    return found
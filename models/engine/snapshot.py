@@ -0,0 +1,206 @@
+#!/usr/bin/python3
+"""
+Module snapshot
+"""
+import mmap
+import json
+import struct
+
+MAGIC = b"HBNBSNAP"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQQQ")
+ENTRY = struct.Struct("<QIQI")
+
+
+class SnapshotError(ValueError):
+    """
+    raised for a file that is no snapshot or is truncated
+    """
+
+
+def dump(entries, f):
+    """
+    writes the (key, JSON bytes) pairs of entries to f as a snapshot:
+
+    - a header: MAGIC, VERSION, the number of records and the offsets
+      of the keys, of the table and of the classes;
+    - the records, in the order of entries;
+    - the keys, sorted, in UTF-8;
+    - the table, one (key offset, key length, record offset, record
+      length) entry per key in the order of the keys;
+    - the classes, a JSON object of the [first, last + 1] range of
+      table entries of each class name
+
+    f must be seekable, the header is written last
+    """
+    start = f.tell()
+    f.write(bytes(HEADER.size))
+    offset = HEADER.size
+    records = []
+    for k, v in entries:
+        f.write(v)
+        records.append((k, offset, len(v)))
+        offset += len(v)
+    records.sort()
+    keys_offset = offset
+    table = []
+    classes = {}
+    key_offset = 0
+    for i, (k, record_offset, length) in enumerate(records):
+        key = k.encode()
+        f.write(key)
+        table.append(ENTRY.pack(key_offset, len(key), record_offset, length))
+        key_offset += len(key)
+        name = k.partition('.')[0]
+        classes.setdefault(name, [i, i])[1] = i + 1
+    table_offset = keys_offset + key_offset
+    f.write(b"".join(table))
+    classes_offset = table_offset + ENTRY.size * len(records)
+    f.write(json.dumps(classes).encode())
+    end = f.tell()
+    f.seek(start)
+    f.write(HEADER.pack(MAGIC, VERSION, len(records), keys_offset,
+                        table_offset, classes_offset))
+    f.seek(end)
+
+
+class Snapshot():
+    """
+    a read-only view of a snapshot written by dump(): the file is
+    mapped in memory, keys are found by binary search in the table
+    and a record is only decoded when it is asked for
+    """
+
+    def __init__(self, path=None, data=None):
+        """
+        maps the file at path, or reads the bytes data
+        """
+        self.path = path
+        self.__map = None
+        if data is None:
+            with open(path, 'rb') as f:
+                try:
+                    data = self.__map = mmap.mmap(f.fileno(), 0,
+                                                  access=mmap.ACCESS_READ)
+                except ValueError:
+                    raise SnapshotError("{} is empty".format(path)) from None
+        self.data = data
+        if len(data) < HEADER.size:
+            raise SnapshotError("truncated snapshot header")
+        (magic, version, self.count, self.keys_offset, self.table_offset,
+         classes_offset) = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise SnapshotError("not a version {} snapshot".format(VERSION))
+        if (self.table_offset + ENTRY.size * self.count != classes_offset or
+                classes_offset > len(data)):
+            raise SnapshotError("truncated snapshot")
+        try:
+            self.classes = {name: range(*bounds) for name, bounds in
+                            json.loads(bytes(data[classes_offset:])).items()}
+        except (ValueError, TypeError):
+            raise SnapshotError("truncated snapshot classes") from None
+
+    def __len__(self):
+        """
+        returns the number of records
+        """
+        return self.count
+
+    def __contains__(self, key):
+        """
+        tells if there is a record at key
+        """
+        return self.find(key) >= 0
+
+    def entry(self, i):
+        """
+        returns the (key offset, key length, record offset, record
+        length) entry of the i-th key
+        """
+        return ENTRY.unpack_from(self.data, self.table_offset + ENTRY.size * i)
+
+    def key(self, i):
+        """
+        returns the i-th key in sorted order
+        """
+        offset, length, _, _ = self.entry(i)
+        start = self.keys_offset + offset
+        return self.data[start:start + length].decode()
+
+    def find(self, key):
+        """
+        returns the position of key in the table, -1 if it is not there
+        """
+        lo, hi = self.range(key.partition('.')[0])
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self.key(lo) == key:
+            return lo
+        return -1
+
+    def range(self, name):
+        """
+        returns the (first, last + 1) positions of the keys of class name
+        """
+        found = self.classes.get(name)
+        if found is None:
+            return 0, 0
+        return found.start, found.stop
+
+    def text(self, i):
+        """
+        returns the JSON bytes of the i-th record
+        """
+        _, _, offset, length = self.entry(i)
+        return self.data[offset:offset + length]
+
+    def record(self, i):
+        """
+        returns the decoded i-th record
+        """
+        return json.loads(self.text(i))
+
+    def get(self, key, default=None):
+        """
+        returns the decoded record at key, default if there is none
+        """
+        i = self.find(key)
+        return default if i < 0 else self.record(i)
+
+    def keys(self, name=None):
+        """
+        yields the keys of class name, of every class when it is None
+        """
+        lo, hi = (0, self.count) if name is None else self.range(name)
+        for i in range(lo, hi):
+            yield self.key(i)
+
+    def texts(self, name=None):
+        """
+        yields the (key, JSON bytes) pairs of class name,
+        of every class when it is None
+        """
+        lo, hi = (0, self.count) if name is None else self.range(name)
+        for i in range(lo, hi):
+            yield self.key(i), self.text(i)
+
+    def items(self, name=None):
+        """
+        yields the (key, decoded record) pairs of class name,
+        of every class when it is None
+        """
+        lo, hi = (0, self.count) if name is None else self.range(name)
+        for i in range(lo, hi):
+            yield self.key(i), self.record(i)
+
+    def close(self):
+        """
+        unmaps the file
+        """
+        if self.__map is not None:
+            self.__map.close()
+            self.__map = None
@@ -0,0 +1,98 @@
+#!/usr/bin/python3
+"""
+Module writer
+"""
+import atexit
+import threading
+
+
+class BackgroundWriter():
+    """
+    runs the write jobs handed to submit() one after the other
+    on a single background thread
+    """
+
+    def __init__(self):
+        """
+        creates an idle writer, the thread starts with the first job
+        """
+        self.__cond = threading.Condition()
+        self.__jobs = []
+        self.__submitted = 0
+        self.__done = 0
+        self.__error = None
+        self.__thread = None
+        atexit.register(self.close)
+
+    def submit(self, job, snapshot=False):
+        """
+        queues job, a callable taking no argument; a snapshot job
+        replaces the jobs still waiting since it writes everything
+        they would have
+        """
+        with self.__cond:
+            self.__submitted += 1
+            if snapshot:
+                self.__jobs.clear()
+            self.__jobs.append((self.__submitted, job))
+            if self.__thread is None:
+                self.__thread = threading.Thread(
+                    target=self.__run, name="hbnb-writer", daemon=True)
+                self.__thread.start()
+            self.__cond.notify_all()
+
+    def pending(self):
+        """
+        returns the number of jobs submitted but not written yet
+        """
+        with self.__cond:
+            return self.__submitted - self.__done
+
+    def flush(self):
+        """
+        waits until every job submitted so far is written,
+        raises the error of a job that failed in between
+        """
+        with self.__cond:
+            target = self.__submitted
+            self.__cond.wait_for(lambda: self.__done >= target)
+            error, self.__error = self.__error, None
+        if error is not None:
+            raise error
+
+    def close(self):
+        """
+        drains the queue and stops the thread,
+        a later submit() starts a new one
+        """
+        with self.__cond:
+            thread = self.__thread
+            if thread is None:
+                return
+            self.__thread = None
+            self.__jobs.append((self.__submitted, None))
+            self.__cond.notify_all()
+        thread.join()
+        with self.__cond:
+            error, self.__error = self.__error, None
+        if error is not None:
+            raise error
+
+    def __run(self):
+        """
+        the thread loop
+        """
+        while True:
+            with self.__cond:
+                self.__cond.wait_for(lambda: self.__jobs)
+                seq, job = self.__jobs.pop(0)
+            if job is None:
+                return
+            try:
+                job()
+            except Exception as e:
+                with self.__cond:
+                    self.__error = e
+            with self.__cond:
+                self.__done = max(self.__done, seq)
+                self.__cond.notify_all()
@@ -4,7 +4,7 @@
 It defines one class, `Place(),
 which sub-classes the `BaseModel()` class.`
 """
-from models.base_model import BaseModel
+from models.base_model import BaseModel, Relation
 
 
 class Place(BaseModel):
@@ -22,3 +22,4 @@ class Place(BaseModel):
     latitude = 0.0
     max_guest = 0
     amenity_ids = []
+    reviews = Relation("Review", "place_id")
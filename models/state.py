@@ -1,10 +1,11 @@
 #!/usr/bin/python3
 """`state` module
 """
-from models.base_model import BaseModel
+from models.base_model import BaseModel, Relation
 
 
 class State(BaseModel):
     """state class inheriting from BaseModel
     """
     name = ""
+    cities = Relation("City", "state_id")
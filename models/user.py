@@ -1,5 +1,5 @@
 #!usr/bin/python3
-from models.base_model import BaseModel
+from models.base_model import BaseModel, Relation
 
 
 class User(BaseModel):
@@ -8,3 +8,5 @@ class User(BaseModel):
     password = ""
     first_name = ""
     last_name = ""
+    places = Relation("Place", "user_id")
+    reviews = Relation("Review", "user_id")
@@ -5,8 +5,9 @@ from io import StringIO
 import os
 import unittest
 from unittest.mock import patch
-from console import HBNBCommand
+from console import HBNBCommand, run_batch, tokenize
 from models import storage
+from models.engine import metrics
 import json
 from models.base_model import BaseModel
 from models.user import User
@@ -142,6 +143,374 @@ class TestConsole(unittest.TestCase):
                              "To get help on a command, type help <topic>.")
 
 
+class TestBatch(unittest.TestCase):
+    """Testing the begin and commit commands.
+    """
+
+    def tearDown(self) -> None:
+        """Defaults/resets FileStorage data."""
+        while storage.in_batch():
+            storage.commit()
+        storage._FileStorage__objects = {}
+        if os.path.exists(storage._FileStorage__file_path):
+            os.remove(storage._FileStorage__file_path)
+
+    def test_begin_commit(self):
+        """Test that saves wait for commit.
+        """
+        if os.path.exists(storage._FileStorage__file_path):
+            os.remove(storage._FileStorage__file_path)
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd('begin')
+            HBNBCommand().onecmd('create User')
+            self.assertFalse(os.path.exists(storage._FileStorage__file_path))
+            HBNBCommand().onecmd('commit')
+            self.assertTrue(os.path.exists(storage._FileStorage__file_path))
+
+    def test_quit_commits(self):
+        """Test that quit writes the deferred saves.
+        """
+        if os.path.exists(storage._FileStorage__file_path):
+            os.remove(storage._FileStorage__file_path)
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd('begin 100')
+            HBNBCommand().onecmd('create User')
+            self.assertTrue(HBNBCommand().onecmd('quit'))
+            self.assertFalse(storage.in_batch())
+            self.assertTrue(os.path.exists(storage._FileStorage__file_path))
+
+    def test_begin_invalid(self):
+        """Test begin with a bad argument.
+        """
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd('begin many')
+            self.assertEqual(f.getvalue().strip(), "** invalid syntax")
+            self.assertFalse(storage.in_batch())
+
+
+class TestWhere(unittest.TestCase):
+    """Testing the <class>.where() queries.
+    """
+
+    def setUp(self):
+        type(storage)._FileStorage__objects = {}
+        self.places = [Place() for i in range(4)]
+        for i, pl in enumerate(self.places):
+            pl.price_by_night = i * 100
+            pl.name = "p{}".format(i)
+
+    def tearDown(self) -> None:
+        """Defaults/resets FileStorage data."""
+        type(storage)._FileStorage__objects = {}
+        if os.path.exists(storage._FileStorage__file_path):
+            os.remove(storage._FileStorage__file_path)
+
+    def run_line(self, line):
+        """Returns what running line printed.
+        """
+        with patch('sys.stdout', new=StringIO()) as f:
+            cmd = HBNBCommand()
+            cmd.onecmd(cmd.precmd(line))
+        return f.getvalue().strip()
+
+    def test_where(self):
+        """Test a query printing instances.
+        """
+        out = self.run_line('Place.where(price_by_night__ge=200)')
+        self.assertEqual(out, str([str(pl) for pl in self.places[2:]]))
+
+    def test_where_chain(self):
+        """Test a query with ordering, limit and fields.
+        """
+        out = self.run_line('Place.where(price_by_night__lt=300)'
+                            '.order_by("-price_by_night").limit(2)'
+                            '.only("name")')
+        self.assertEqual(out, str([{"name": "p2"}, {"name": "p1"}]))
+
+    def test_where_order_mixed(self):
+        """Test a query sorting numbers and strings together.
+        """
+        self.places[1].name = 5
+        out = self.run_line('Place.where().order_by("name").only("name")')
+        self.assertEqual(out, str([{"name": 5}, {"name": "p0"},
+                                   {"name": "p2"}, {"name": "p3"}]))
+
+    def test_where_count(self):
+        """Test a query printing its count.
+        """
+        out = self.run_line('Place.where(name__in=["p1", "p3"]).count()')
+        self.assertEqual(out, "2")
+
+    def test_where_errors(self):
+        """Test bad queries.
+        """
+        self.assertEqual(self.run_line('Nope.where()'),
+                         "** class doesn't exist **")
+        self.assertEqual(self.run_line('Place.where(name=p1)'),
+                         "** invalid syntax")
+        self.assertEqual(self.run_line('Place.where().save()'),
+                         "** invalid syntax")
+        self.assertEqual(self.run_line('Place.where().limit(-1)'),
+                         "** invalid syntax")
+
+
+class TestAllOptions(unittest.TestCase):
+    """Testing the streaming and paging of all.
+    """
+
+    def setUp(self):
+        type(storage)._FileStorage__objects = {}
+        self.users = [User() for i in range(5)]
+        self.place = Place()
+
+    def tearDown(self) -> None:
+        """Defaults/resets FileStorage data."""
+        type(storage)._FileStorage__objects = {}
+        if os.path.exists(storage._FileStorage__file_path):
+            os.remove(storage._FileStorage__file_path)
+
+    def run_line(self, line):
+        """Returns what running line printed.
+        """
+        with patch('sys.stdout', new=StringIO()) as f:
+            cmd = HBNBCommand()
+            cmd.onecmd(cmd.precmd(line))
+        return f.getvalue()
+
+    def test_default_output(self):
+        """Test that all prints the list repr it always did.
+        """
+        self.assertEqual(self.run_line("all"), "{}\n".format(
+            [str(v) for v in storage.all().values()]))
+        self.assertEqual(self.run_line("all User"), "{}\n".format(
+            [str(v) for v in self.users]))
+        self.assertEqual(self.run_line("Amenity.all()"), "[]\n")
+
+    def test_limit_offset(self):
+        """Test paging with --offset and --limit.
+        """
+        self.assertEqual(self.run_line("all User --offset 1 --limit 2"),
+                         "{}\n".format([str(v) for v in self.users[1:3]]))
+        self.assertEqual(self.run_line("all --limit 0 User"), "[]\n")
+        self.assertEqual(self.run_line("all User --offset 9"), "[]\n")
+
+    def test_after(self):
+        """Test paging with a cursor.
+        """
+        self.assertEqual(
+            self.run_line("all User --after {}".format(self.users[2].id)),
+            "{}\n".format([str(v) for v in self.users[3:]]))
+        self.assertEqual(
+            self.run_line("all --after User.{} --limit 1".format(
+                self.users[4].id)),
+            "{}\n".format([str(self.place)]))
+
+    def test_lines(self):
+        """Test the one instance per line output.
+        """
+        self.assertEqual(self.run_line("all User --lines --limit 2"),
+                         "".join("{}\n".format(v) for v in self.users[:2]))
+
+    def test_invalid(self):
+        """Test bad options.
+        """
+        for line in ("all --limit", "all --limit x", "all --offset -1",
+                     "all --after", "all User --sort"):
+            self.assertEqual(self.run_line(line), "** invalid syntax\n")
+
+
+class TestBatchMode(unittest.TestCase):
+    """Testing the --batch mode.
+    """
+
+    def setUp(self):
+        type(storage)._FileStorage__objects = {}
+        if os.path.exists(storage._FileStorage__file_path):
+            os.remove(storage._FileStorage__file_path)
+
+    def tearDown(self) -> None:
+        """Defaults/resets FileStorage data."""
+        while storage.in_batch():
+            storage.commit()
+        type(storage)._FileStorage__objects = {}
+        if os.path.exists(storage._FileStorage__file_path):
+            os.remove(storage._FileStorage__file_path)
+
+    def run_batch(self, text):
+        """Returns the exit status and the output of a batch run.
+        """
+        with patch('sys.stdout', new=StringIO()) as out, \
+                patch('sys.stderr', new=StringIO()) as err, \
+                patch.object(storage, "compact",
+                             wraps=storage.compact) as compact:
+            status = run_batch(StringIO(text))
+        self.writes = compact.call_count
+        return status, out.getvalue(), err.getvalue()
+
+    def test_single_write(self):
+        """Test that the whole run is written once.
+        """
+        status, out, err = self.run_batch(
+            "create User\ncreate State\nUser.count()\nall Place\n")
+        self.assertEqual(status, 0)
+        self.assertEqual(err, "")
+        self.assertEqual(out.splitlines()[2:], ["1", "[]"])
+        self.assertEqual(self.writes, 1)
+        self.assertFalse(storage.in_batch())
+        with open(storage._FileStorage__file_path) as f:
+            self.assertEqual(len(json.load(f)), 2)
+
+    def test_rollback(self):
+        """Test that a failing command drops the whole run.
+        """
+        us = User()
+        us.save()
+        status, out, err = self.run_batch(
+            'create State\nupdate User {} first_name "Bob"\n'
+            'show User nope\ncreate City\n'.format(us.id))
+        self.assertEqual(status, 1)
+        self.assertEqual(out.splitlines()[1], "** no instance found **")
+        self.assertEqual(err, "** line 3: rolled back\n")
+        self.assertEqual(self.writes, 0)
+        self.assertEqual(storage.count(), 1)
+        self.assertEqual(storage.count("City"), 0)
+        self.assertNotIn("first_name", storage.get(User, us.id).__dict__)
+
+    def test_unknown_command(self):
+        """Test that an unknown command counts as an error.
+        """
+        status, out, err = self.run_batch("create User\nfly away\n")
+        self.assertEqual(status, 1)
+        self.assertEqual(out.splitlines()[1], "*** Unknown syntax: fly away")
+        self.assertEqual(storage.count(), 0)
+
+    def test_quit(self):
+        """Test that quit ends the run and keeps it.
+        """
+        status, out, err = self.run_batch(
+            "create User\nquit\ncreate User\n")
+        self.assertEqual(status, 0)
+        self.assertEqual(storage.count("User"), 1)
+        self.assertEqual(self.writes, 1)
+
+
+class TestStats(unittest.TestCase):
+    """Testing the stats command.
+    """
+
+    def setUp(self):
+        type(storage)._FileStorage__objects = {}
+
+    def tearDown(self) -> None:
+        """Defaults/resets FileStorage data."""
+        metrics.disable()
+        metrics.reset()
+        type(storage)._FileStorage__objects = {}
+        if os.path.exists(storage._FileStorage__file_path):
+            os.remove(storage._FileStorage__file_path)
+
+    def run_lines(self, *lines):
+        """Returns the output of lines run through the console.
+        """
+        console = HBNBCommand()
+        with patch('sys.stdout', new=StringIO()) as f:
+            for line in lines:
+                console.onecmd(console.precmd(line))
+        return f.getvalue()
+
+    def test_stats_off(self):
+        """Test that nothing is recorded until stats on.
+        """
+        output = self.run_lines("create User", "stats")
+        self.assertEqual(output.splitlines()[1:],
+                         ["metrics are off, turn them on with: stats on"])
+
+    def test_stats_on(self):
+        """Test the timers of each command.
+        """
+        output = self.run_lines("stats on", "create User", "User.count()",
+                                "fly", "stats")
+        lines = output.splitlines()[2:]
+        names = [line.split()[0] for line in lines]
+        self.assertIn("storage.objects_serialized 1", lines)
+        for name in ("console.create", "console.count", "console.default",
+                     "console.precmd", "storage.save"):
+            self.assertIn(name, names)
+        self.assertIn("calls=4 ", lines[names.index("console.precmd")])
+
+    def test_stats_reset_off(self):
+        """Test that reset drops the metrics and off stops them.
+        """
+        output = self.run_lines("stats on", "User.count()", "stats reset",
+                                "stats off", "User.count()", "stats")
+        lines = output.splitlines()
+        self.assertEqual(lines[1:3],
+                         ["0", "metrics are off, turn them on with: stats on"])
+        self.assertNotIn("console.count", output)
+        self.assertIn("console.precmd calls=1 ", output)
+
+    def test_stats_invalid(self):
+        """Test an unknown argument.
+        """
+        self.assertEqual(self.run_lines("stats loud"), "** invalid syntax\n")
+
+
+class TestTokenize(unittest.TestCase):
+    """Testing the parsing of the <class>.<command>() syntax.
+    """
+
+    def test_tokenize(self):
+        """Test the command and argument of each form.
+        """
+        self.assertIsNone(tokenize("show User 1"))
+        self.assertEqual(tokenize("User.all()"), ("all", "User"))
+        self.assertEqual(tokenize('User.show("1")'), ("show", "User 1"))
+        self.assertEqual(tokenize('User.update("1", "age", 3)'),
+                         ("update", "User 1 age 3"))
+        self.assertEqual(tokenize('User.update("1", "age")'),
+                         ("update", "User 1 age "))
+        self.assertEqual(tokenize("User.update(\"1\", {'age': 3})"),
+                         ("update", 'User 1 {"age": 3}'))
+        self.assertEqual(tokenize("Place.where(max_guest=2).limit(1)"),
+                         ("where", "Place where(max_guest=2).limit(1)"))
+
+    def test_direct_dispatch(self):
+        """Test that onecmd() calls the handler precmd() parsed.
+        """
+        cmd = HBNBCommand()
+        line = cmd.precmd("User.count()")
+        self.assertEqual(line, "count User")
+        with patch.object(HBNBCommand, "do_count") as count, \
+                patch.object(HBNBCommand, "parseline") as parseline:
+            cmd.onecmd(line)
+        count.assert_called_once_with("User")
+        self.assertEqual(parseline.call_count, 0)
+        with patch('sys.stdout', new=StringIO()) as f:
+            cmd.onecmd("count User")
+            cmd.onecmd(cmd.precmd("Nope.fly()"))
+        self.assertEqual(f.getvalue().splitlines()[1],
+                         "*** Unknown syntax: fly Nope")
+
+    def test_update_relation_name(self):
+        """Test that update can set an attribute named like a relation.
+        """
+        st = State()
+        with patch('sys.stdout', new=StringIO()) as f:
+            HBNBCommand().onecmd('update State {} cities "x"'.format(st.id))
+        self.assertEqual(f.getvalue(), "")
+        self.assertEqual(st.cities, "x")
+
+    def test_count_unknown_class(self):
+        """Test that count checks the class name like the other commands.
+        """
+        cmd = HBNBCommand()
+        with patch('sys.stdout', new=StringIO()) as f:
+            cmd.onecmd("count Nope")
+            cmd.onecmd(cmd.precmd("Nope.count()"))
+        self.assertEqual(f.getvalue().splitlines(),
+                         ["** class doesn't exist **"] * 2)
+
+
 class TestBaseModel(unittest.TestCase):
     """Test Basemodel commands.
     """
@@ -1283,6 +1652,19 @@ class TestCity(unittest.TestCase):
             self.assertNotIn("color", cty.__dict__.keys())
             self.assertEqual(cty.__dict__["age"], 10)
 
+    def test_update_city_state_id(self):
+        """Test update_city method on the state_id foreign key.
+        """
+        with patch('sys.stdout', new=StringIO()):
+            st1 = State()
+            st2 = State()
+            cty = City()
+            HBNBCommand().onecmd(f'update City {cty.id} state_id {st1.id}')
+            self.assertEqual(st1.cities, [cty])
+            HBNBCommand().onecmd(f'update City {cty.id} state_id "{st2.id}"')
+            self.assertEqual(st1.cities, [])
+            self.assertEqual(st2.cities, [cty])
+
     def test_destroy_city(self):
         """Test destroy_city method.
         """
@@ -5,7 +5,7 @@ import time
 import unittest
 import uuid
 from datetime import datetime
-from models.base_model import BaseModel
+from models.base_model import BaseModel, to_datetime, to_isoformat
 from models.engine.file_storage import FileStorage
 
 
@@ -97,5 +97,67 @@ class TestBase(unittest.TestCase):
         self.assertEqual(b1.__str__(), string)
 
 
+class TestTimestamp(unittest.TestCase):
+    """Test cases for the lazy created_at and updated_at.
+    """
+
+    def tearDown(self) -> None:
+        """Resets FileStorage data."""
+        FileStorage._FileStorage__objects = {}
+        if os.path.exists(FileStorage._FileStorage__file_path):
+            os.remove(FileStorage._FileStorage__file_path)
+
+    def test_raw_until_read(self):
+        """The ISO string is kept until the attribute is read"""
+        b1 = BaseModel(id="1", created_at="2023-10-14T10:28:45.815454",
+                       updated_at="2023-10-14T10:28:45")
+        self.assertEqual(b1.__dict__["created_at"],
+                         "2023-10-14T10:28:45.815454")
+        self.assertEqual(b1.created_at,
+                         datetime(2023, 10, 14, 10, 28, 45, 815454))
+        self.assertIsInstance(b1.__dict__["created_at"], datetime)
+        self.assertIsInstance(b1.__dict__["updated_at"], str)
+
+    def test_to_dict_reuses_string(self):
+        """to_dict() gives back the string the instance was loaded with"""
+        b1 = BaseModel(id="1", created_at="2023-10-14T10:28:45.815454",
+                       updated_at="2023-10-14T10:28:45.815454")
+        self.assertEqual(b1.to_dict()["created_at"],
+                         "2023-10-14T10:28:45.815454")
+        self.assertIsInstance(b1.__dict__["created_at"], str)
+
+    def test_epoch_microseconds(self):
+        """Integer timestamps are epoch microseconds"""
+        b1 = BaseModel(id="1", created_at=1697279325815454,
+                       updated_at=0)
+        self.assertEqual(b1.created_at,
+                         datetime(2023, 10, 14, 10, 28, 45, 815454))
+        self.assertEqual(b1.to_dict()["updated_at"], "1970-01-01T00:00:00")
+
+    def test_str_shows_datetimes(self):
+        """__str__ shows datetimes whatever the instance was loaded with"""
+        b1 = BaseModel()
+        b2 = BaseModel(**b1.to_dict())
+        self.assertEqual(str(b2), str(b1))
+
+    def test_set(self):
+        """Setting the attribute replaces the raw value"""
+        b1 = BaseModel(id="1", created_at="2023-10-14T10:28:45",
+                       updated_at="2023-10-14T10:28:45")
+        b1.updated_at = datetime(2024, 1, 1)
+        self.assertEqual(b1.to_dict()["updated_at"], "2024-01-01T00:00:00")
+        del b1.updated_at
+        with self.assertRaises(AttributeError):
+            b1.updated_at
+
+    def test_helpers(self):
+        """to_datetime and to_isoformat accept every raw form"""
+        dt = datetime(2023, 10, 14)
+        self.assertEqual(to_datetime("2023-10-14T00:00:00"), dt)
+        self.assertEqual(to_datetime(dt), dt)
+        self.assertEqual(to_isoformat(dt), "2023-10-14T00:00:00")
+        self.assertEqual(to_isoformat("2023-10-14"), "2023-10-14")
+
+
 if __name__ == "__main__":
     unittest.main()
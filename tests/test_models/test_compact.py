@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+"""Tests for the compact module.
+"""
+import os
+import unittest
+from io import StringIO
+from unittest.mock import patch
+import models
+from models import compact
+from models.engine.file_storage import FileStorage, classes
+from models.place import Place
+from models.user import User
+from console import HBNBCommand
+
+
+class TestCompact(unittest.TestCase):
+    """Test cases for the compact classes."""
+
+    def setUp(self):
+        compact.enable(classes)
+
+    def tearDown(self) -> None:
+        """Defaults/resets FileStorage data."""
+        compact.disable(classes)
+        FileStorage._FileStorage__objects = {}
+        if os.path.exists(FileStorage._FileStorage__file_path):
+            os.remove(FileStorage._FileStorage__file_path)
+
+    def test_registry(self):
+        self.assertIsNot(classes["Place"], Place)
+        self.assertTrue(issubclass(classes["Place"], Place))
+        self.assertEqual(classes["Place"].__name__, "Place")
+        compact.enable(classes)
+        self.assertIs(classes["Place"].__bases__[0], Place)
+        compact.disable(classes)
+        self.assertIs(classes["Place"], Place)
+
+    def test_fields(self):
+        self.assertEqual(compact.fields_of(User)[:3],
+                         ["id", "created_at", "updated_at"])
+        self.assertIn("email", compact.fields_of(User))
+        self.assertNotIn("reviews", compact.fields_of(Place))
+        self.assertNotIn("save", compact.fields_of(Place))
+
+    def test_slots(self):
+        pl = classes["Place"]()
+        pl.name = "Home"
+        self.assertEqual(pl.name, "Home")
+        self.assertEqual(pl.max_guest, 0)
+        self.assertEqual(pl.amenity_ids, [])
+        self.assertNotIn("name", pl.__dict__)
+        with self.assertRaises(AttributeError):
+            pl.missing
+
+    def test_overflow(self):
+        pl = classes["Place"]()
+        self.assertFalse(pl._extra)
+        pl.pool = True
+        self.assertEqual(pl.__dict__, {"pool": True})
+        self.assertTrue(pl.to_dict()["pool"])
+        self.assertNotIn("_extra", pl.to_dict())
+        self.assertTrue(classes["Place"](**pl.to_dict())._extra)
+
+    def test_same_output(self):
+        regular = Place()
+        regular.name = "Home"
+        regular.pool = True
+        pl = classes["Place"](**regular.to_dict())
+        self.assertEqual(pl.to_dict(), regular.to_dict())
+        self.assertEqual(str(pl), str(regular))
+        self.assertEqual(compact.state(regular), regular.__dict__)
+
+    def test_timestamps(self):
+        pl = classes["Place"](id="1", created_at="2023-10-14T10:28:45",
+                              updated_at="2023-10-14T10:28:45")
+        self.assertEqual(pl._created_at, "2023-10-14T10:28:45")
+        self.assertEqual(pl.to_dict()["created_at"], "2023-10-14T10:28:45")
+        self.assertEqual(pl.created_at.year, 2023)
+        self.assertEqual(pl._created_at, pl.created_at)
+        self.assertNotIn("created_at", pl.__dict__)
+        self.assertFalse(pl._extra)
+
+    def test_reload(self):
+        us = User()
+        us.first_name = "Betty"
+        us.nickname = "B"
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        loaded = models.storage.get("User", us.id)
+        self.assertIsInstance(loaded, classes["User"])
+        self.assertEqual(loaded.to_dict(), us.to_dict())
+
+    def test_console_create(self):
+        cmd = HBNBCommand()
+        with patch("sys.stdout", new=StringIO()):
+            cmd.onecmd("create Place")
+        self.assertEqual(len(models.storage.all_of("Place")), 1)
+        pl = list(models.storage.all_of("Place").values())[0]
+        self.assertIsInstance(pl, classes["Place"])
+        with patch("sys.stdout", new=StringIO()):
+            cmd.onecmd('update Place {} pool "yes"'.format(pl.id))
+        self.assertEqual(pl.pool, "yes")
+
+
+if __name__ == '__main__':
+    unittest.main()
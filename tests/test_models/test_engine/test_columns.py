@@ -0,0 +1,124 @@
+#!/usr/bin/python3
+"""Test cases for columns
+"""
+import math
+import unittest
+from unittest.mock import patch
+from models.engine import columns
+from models.engine.columns import Table, Columns, as_number, matches
+from models.place import Place
+
+
+class TestTable(unittest.TestCase):
+    """Test case for the Table class."""
+
+    def setUp(self):
+        self.table = Table(("price", "guests"))
+        for i in range(5):
+            self.table.add("Place.{}".format(i),
+                           {"price": i * 10, "guests": i % 2}.get)
+
+    def test_search(self):
+        self.assertEqual(self.table.search({"price": (10, 30)}),
+                         ["Place.1", "Place.2", "Place.3"])
+        self.assertEqual(
+            self.table.search({"price": (10, None), "guests": (1, 1)}),
+            ["Place.1", "Place.3"])
+        self.assertEqual(self.table.search({"price": (None, 0)}),
+                         ["Place.0"])
+        self.assertEqual(len(self.table.search({})), 5)
+
+    def test_add_replaces(self):
+        self.table.add("Place.1", {"price": 100, "guests": 1}.get)
+        self.assertEqual(self.table.search({"price": (100, 100)}),
+                         ["Place.1"])
+        self.assertEqual(len(self.table.keys), 5)
+
+    def test_set(self):
+        self.table.set("Place.4", "price", 5)
+        self.table.set("Place.9", "price", 5)
+        self.assertEqual(self.table.search({"price": (5, 5)}), ["Place.4"])
+
+    def test_remove(self):
+        self.table.remove("Place.1")
+        self.table.remove("Place.9")
+        self.assertEqual(self.table.keys,
+                         ["Place.0", "Place.4", "Place.2", "Place.3"])
+        self.assertEqual(list(self.table.columns["price"]),
+                         [0.0, 40.0, 20.0, 30.0])
+        self.assertEqual(self.table.search({"price": (40, 40)}),
+                         ["Place.4"])
+        self.table.remove("Place.3")
+        self.assertEqual(self.table.keys, ["Place.0", "Place.4", "Place.2"])
+
+    def test_missing(self):
+        self.table.add("Place.5", {"price": "cheap"}.get)
+        self.assertTrue(math.isnan(self.table.columns["price"][5]))
+        self.assertTrue(math.isnan(self.table.columns["guests"][5]))
+        self.assertNotIn("Place.5", self.table.search({"price": (None, None)}))
+
+    def test_without_numpy(self):
+        with patch.object(columns, "numpy", None):
+            self.assertEqual(self.table.search({"price": (10, 20)}),
+                             ["Place.1", "Place.2"])
+
+
+class TestColumns(unittest.TestCase):
+    """Test case for the Columns class."""
+
+    def test_instances_and_records(self):
+        cols = Columns()
+        pl = Place(price_by_night=50, max_guest=2)
+        cols.add("Place.1", pl)
+        cols.add("Place.2", {"price_by_night": 80, "max_guest": 4})
+        cols.add("City.1", {"price_by_night": 80})
+        self.assertEqual(cols.search("Place", {"price_by_night": (40, 90)}),
+                         ["Place.1", "Place.2"])
+        self.assertEqual(cols.search("Place", {"max_guest": 4}),
+                         ["Place.2"])
+
+    def test_update(self):
+        cols = Columns()
+        pl = Place(price_by_night=50)
+        cols.add("Place.1", pl)
+        pl.__dict__["price_by_night"] = 70
+        cols.update("Place.1", pl, "name")
+        self.assertEqual(cols.search("Place", {"price_by_night": 70}), [])
+        cols.update("Place.1", pl, "price_by_night")
+        self.assertEqual(cols.search("Place", {"price_by_night": 70}),
+                         ["Place.1"])
+
+    def test_not_a_column(self):
+        cols = Columns()
+        with self.assertRaises(KeyError):
+            cols.search("Place", {"name": "x"})
+        with self.assertRaises(KeyError):
+            cols.search("City", {"price_by_night": 1})
+        with self.assertRaises(KeyError):
+            cols.column("Place", "name")
+
+    def test_column(self):
+        cols = Columns()
+        cols.add("Place.1", {"latitude": 1.5})
+        keys, values = cols.column("Place", "latitude")
+        self.assertEqual(keys, ["Place.1"])
+        self.assertEqual(list(values), [1.5])
+
+
+class TestHelpers(unittest.TestCase):
+    """Test case for as_number and matches."""
+
+    def test_as_number(self):
+        self.assertEqual(as_number(3), 3.0)
+        self.assertTrue(math.isnan(as_number("3")))
+        self.assertTrue(math.isnan(as_number(None)))
+
+    def test_matches(self):
+        self.assertTrue(matches(3, (3, 3)))
+        self.assertTrue(matches(3, (None, None)))
+        self.assertFalse(matches(None, (None, None)))
+        self.assertFalse(matches(4, (None, 3)))
+
+
+if __name__ == "__main__":
+    unittest.main()
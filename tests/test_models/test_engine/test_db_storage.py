@@ -0,0 +1,193 @@
+#!/usr/bin/python3
+"""Test cases for db_storage
+"""
+import os
+import sys
+import math
+import shutil
+import random
+import tempfile
+import unittest
+import subprocess
+from unittest.mock import patch
+from models.engine.db_storage import DBStorage, SQLQuery
+from models.engine.query import Query
+from models.user import User
+from models.place import Place
+from models.state import State
+from models.review import Review
+
+
+class TestDBStorage(unittest.TestCase):
+    """Test case for the SQLite storage."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.storage = self.open()
+        patcher = patch("models.storage", self.storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self) -> None:
+        self.storage.close()
+        shutil.rmtree(self.tmp)
+
+    def open(self):
+        """Returns a DBStorage of the test database."""
+        storage = DBStorage()
+        storage.path = os.path.join(self.tmp, "file.db")
+        storage.reload()
+        return storage
+
+    def test_save_reload(self):
+        us = User()
+        us.first_name = "Betty"
+        us.save()
+        other = self.open()
+        self.assertEqual(other.count(), 1)
+        self.assertEqual(other.get(User, us.id).first_name, "Betty")
+        self.assertIsNot(other.get(User, us.id), us)
+        other.close()
+
+    def test_unsaved(self):
+        us = User()
+        self.assertEqual(self.storage.count("User"), 1)
+        self.assertIs(self.storage.all()["User." + us.id], us)
+        self.storage.reload()
+        self.assertEqual(self.storage.count(), 0)
+
+    def test_touch(self):
+        us = User()
+        us.save()
+        us.last_name = "Holberton"
+        self.storage.save()
+        self.assertEqual(self.open().get("User", us.id).last_name,
+                         "Holberton")
+
+    def test_delete(self):
+        us = User()
+        st = State()
+        self.storage.save()
+        self.storage.delete(us)
+        self.storage.save()
+        self.assertEqual(list(self.open().all()), ["State." + st.id])
+
+    def test_refresh(self):
+        us = User()
+        us.save()
+        self.storage.refresh()
+        self.assertIs(self.storage.get(User, us.id), us)
+        other = self.open()
+        with patch("models.storage", other):
+            other.get(User, us.id).first_name = "Betty"
+            other.save()
+        other.close()
+        self.storage.refresh()
+        self.assertEqual(self.storage.get(User, us.id).first_name, "Betty")
+
+    def test_get(self):
+        us = User()
+        us.save()
+        self.storage.reload()
+        found = self.storage.get(User, us.id)
+        self.assertEqual(found.id, us.id)
+        self.assertIs(self.storage.get("User", us.id), found)
+        self.assertIsNone(self.storage.get(User, "nope"))
+
+    def test_batch_rollback(self):
+        us = User()
+        us.save()
+        self.storage.begin()
+        State().save()
+        self.assertEqual(self.open().count(), 1)
+        self.storage.rollback()
+        self.assertFalse(self.storage.in_batch())
+        self.assertEqual(list(self.storage.all()), ["User." + us.id])
+
+    def test_batch_commit(self):
+        with self.storage.batch():
+            User().save()
+            State().save()
+        self.assertEqual(self.open().count(), 2)
+
+    def test_related(self):
+        us = User()
+        pl = Place()
+        pl.user_id = us.id
+        Place()
+        rv = Review()
+        rv.place_id = pl.id
+        self.assertEqual(list(self.storage.related("Place", "user_id",
+                                                   us.id)), ["Place." + pl.id])
+        self.assertEqual(pl.reviews, [rv])
+        plan = self.storage._DBStorage__connect().execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM objects WHERE class = ? AND "
+            "json_extract(record, '$.place_id') = ?", ("Review", "x"))
+        self.assertIn("objects_place_id", str(plan.fetchall()))
+
+    def test_search_column(self):
+        pl = Place()
+        pl.price_by_night = 100
+        pl.latitude = "north"
+        Place().price_by_night = 300
+        self.assertEqual(self.storage.search(Place, price_by_night=(50, 150),
+                                             max_guest=0), [pl.id])
+        ids, values = self.storage.column(Place, "latitude")
+        self.assertEqual(ids[0], pl.id)
+        self.assertTrue(math.isnan(values[0]))
+        self.assertEqual(values[1], 0.0)
+
+    def test_query_matches_python(self):
+        rng = random.Random(1)
+        for i in range(60):
+            pl = Place()
+            pl.name = rng.choice(["a", "b", "c"])
+            if rng.random() < 0.7:
+                pl.price_by_night = rng.randrange(0, 5)
+            if rng.random() < 0.2:
+                pl.max_guest = rng.choice([None, "many", 2.5, True])
+            if rng.random() < 0.1:
+                pl.city_id = 7
+        self.storage.save()
+        queries = [lambda q: q.where(price_by_night=0),
+                   lambda q: q.where(price_by_night__ne=0),
+                   lambda q: q.where(price_by_night__lt=3, name="b"),
+                   lambda q: q.where(max_guest__ge=1),
+                   lambda q: q.where(max_guest__ne=None),
+                   lambda q: q.where(max_guest="many"),
+                   lambda q: q.where(max_guest__in=[0, "many"]),
+                   lambda q: q.where(city_id=""),
+                   lambda q: q.where(amenity_ids=[]),
+                   lambda q: q.where(name__gt="a").order_by("-name"),
+                   lambda q: q.order_by("name", "-price_by_night"),
+                   lambda q: q.order_by("price_by_night").offset(5).limit(7),
+                   lambda q: q.order_by("max_guest"),
+                   lambda q: q.order_by("-max_guest").limit(9),
+                   lambda q: q.where(amenity_ids=[]).order_by("max_guest"),
+                   lambda q: q.where(name="c").order_by("-created_at")]
+        self.assertIsInstance(self.storage.query(Place), SQLQuery)
+        for build in queries:
+            sql = build(self.storage.query(Place))
+            python = build(Query(self.storage, Place))
+            self.assertEqual([o.id for o in sql], [o.id for o in python])
+            self.assertEqual(sql.count(), python.count())
+
+    def test_schema(self):
+        indexes = self.storage._DBStorage__connect().execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'").fetchall()
+        self.assertIn(("objects_key",), indexes)
+
+    def test_selected_by_environment(self):
+        root = os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__)))))
+        env = dict(os.environ, HBNB_TYPE_STORAGE="db", PYTHONPATH=root,
+                   HBNB_STORAGE_PATH=os.path.join(self.tmp, "env.db"))
+        output = subprocess.run(
+            [sys.executable, "-c", "import models; "
+             "print(type(models.storage).__name__)"],
+            env=env, cwd=self.tmp, capture_output=True, text=True).stdout
+        self.assertEqual(output, "DBStorage\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
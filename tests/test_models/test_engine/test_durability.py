@@ -0,0 +1,110 @@
+#!/usr/bin/python3
+"""Test cases for durability
+"""
+import os
+import time
+import unittest
+from unittest.mock import patch
+from models.engine.durability import FsyncPolicy, atomic_write
+
+
+class TestFsyncPolicy(unittest.TestCase):
+    """Test case for the FsyncPolicy class."""
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            FsyncPolicy("sometimes")
+
+    def test_always_never(self):
+        self.assertTrue(FsyncPolicy("always").due())
+        self.assertFalse(FsyncPolicy("never").due())
+
+    def test_batch(self):
+        policy = FsyncPolicy("batch", interval=3600)
+        self.assertTrue(policy.due())
+        self.assertFalse(policy.due())
+        policy = FsyncPolicy("batch", interval=0)
+        self.assertTrue(policy.due())
+        self.assertTrue(policy.due())
+
+    def test_batch_syncs_deferred_writes(self):
+        with open("test.sync", "w") as f:
+            f.write("x")
+        self.addCleanup(os.remove, "test.sync")
+        policy = FsyncPolicy("batch", interval=0.05)
+        policy.due()
+        with patch("os.fsync") as fsync:
+            policy.defer("test.sync")
+            self.assertEqual(fsync.call_count, 0)
+            time.sleep(0.2)
+            self.assertGreaterEqual(fsync.call_count, 1)
+        policy = FsyncPolicy("batch", interval=3600)
+        policy.due()
+        with patch("os.fsync") as fsync:
+            policy.defer("test.sync")
+            policy.close()
+            self.assertGreaterEqual(fsync.call_count, 1)
+
+    def test_sync(self):
+        with open("test.sync", "w") as f, \
+                patch("os.fsync") as fsync:
+            f.write("x")
+            self.assertTrue(FsyncPolicy("always").sync(f))
+            self.assertFalse(FsyncPolicy("never").sync(f))
+            self.assertEqual(fsync.call_count, 1)
+        os.remove("test.sync")
+
+
+class TestAtomicWrite(unittest.TestCase):
+    """Test case for the atomic_write function."""
+
+    path = "test.atomic"
+
+    def tearDown(self) -> None:
+        """Removes the written file."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_write(self):
+        atomic_write(self.path, "", lambda f: f.write("new"))
+        with open(self.path, "r") as f:
+            self.assertEqual(f.read(), "new")
+
+    def test_failed_write_keeps_old_content(self):
+        with open(self.path, "w") as f:
+            f.write("old")
+
+        def write(f):
+            f.write("ne")
+            raise RuntimeError("crash")
+        with self.assertRaises(RuntimeError):
+            atomic_write(self.path, "", write)
+        with open(self.path, "r") as f:
+            self.assertEqual(f.read(), "old")
+        self.assertEqual([p for p in os.listdir(".")
+                          if p.startswith("." + self.path)], [])
+
+    def test_keeps_mode(self):
+        with open(self.path, "w") as f:
+            f.write("old")
+        os.chmod(self.path, 0o600)
+        atomic_write(self.path, "b", lambda f: f.write(b"new"))
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o600)
+
+    def test_new_file_mode(self):
+        mask = os.umask(0o027)
+        try:
+            atomic_write(self.path, "", lambda f: f.write("new"))
+        finally:
+            os.umask(mask)
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o640)
+
+    def test_fsync_always(self):
+        with patch("os.fsync") as fsync:
+            atomic_write(self.path, "", lambda f: f.write("new"),
+                         FsyncPolicy("always"))
+        self.assertEqual(fsync.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
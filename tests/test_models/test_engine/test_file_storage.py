@@ -2,10 +2,22 @@
 """Test cases for file_storage
 """
 import os
+import json
+import time
+import sys
+import shutil
 import models
+import tempfile
 import unittest
+import subprocess
+import threading
+from unittest.mock import patch
 from models.base_model import BaseModel
 from models.engine.file_storage import FileStorage
+from models.engine.writer import BackgroundWriter
+from models.engine.shards import shard_of
+from models.engine import parallel
+from models.engine.serializers import FormatError
 from models.user import User
 from models.state import State
 from models.place import Place
@@ -49,6 +61,27 @@ class TestFileStorage_methods(unittest.TestCase):
     def test_all(self):
         self.assertEqual(dict, type(models.storage.all()))
 
+    def test_all_is_live(self):
+        us = User()
+        st = State()
+        models.storage.save()
+        objs = models.storage.all()
+        self.assertIs(objs, FileStorage._FileStorage__objects)
+        del objs["User." + us.id]
+        objs.pop("State." + st.id)
+        cy = City(id="1", created_at="2023-10-14T10:28:45.815454",
+                  updated_at="2023-10-14T10:28:45.815454")
+        objs["City.1"] = cy
+        self.assertNotIn("User." + us.id, models.storage.all_of(User))
+        self.assertEqual(models.storage.count(), len(objs))
+        self.assertEqual(models.storage.all_of(City)["City.1"], cy)
+        models.storage.save()
+        with open("file.json", "r") as f:
+            saved = json.load(f)
+        self.assertNotIn("User." + us.id, saved)
+        self.assertNotIn("State." + st.id, saved)
+        self.assertIn("City.1", saved)
+
     def test_all_with_arg(self):
         with self.assertRaises(TypeError):
             models.storage.all(None)
@@ -118,6 +151,16 @@ class TestFileStorage_methods(unittest.TestCase):
             self.assertIn("Amenity." + am.id, save_text)
             self.assertIn("Review." + rv.id, save_text)
 
+    def test_save_deleted_object(self):
+        us = User()
+        us.save()
+        models.storage.delete(us)
+        models.storage.save()
+        us.save()
+        self.assertIsNone(models.storage.get(User, us.id))
+        with open("file.json", "r") as f:
+            self.assertNotIn("User." + us.id, f.read())
+
     def test_save_with_arg(self):
         with self.assertRaises(TypeError):
             models.storage.save(None)
@@ -152,6 +195,1055 @@ class TestFileStorage_methods(unittest.TestCase):
         with self.assertRaises(TypeError):
             models.storage.reload(None)
 
+    def test_save_crash_keeps_file(self):
+        us = User()
+        models.storage.save()
+        with open("file.json", "r") as f:
+            before = f.read()
+        User()
+        with patch("models.engine.serializers.JSONSerializer.dump",
+                   side_effect=RuntimeError("crash")):
+            with self.assertRaises(RuntimeError):
+                models.storage.save()
+        with open("file.json", "r") as f:
+            self.assertEqual(f.read(), before)
+
+
+class TestFileStorage_by_class(unittest.TestCase):
+    """Test case for the class name index of FileStorage."""
+
+    def tearDown(self) -> None:
+        """Defaults/resets FileStorage data."""
+        models.storage.lazy = False
+        FileStorage._FileStorage__objects = {}
+        if os.path.exists(FileStorage._FileStorage__file_path):
+            os.remove(FileStorage._FileStorage__file_path)
+
+    def test_count(self):
+        us1 = User()
+        us2 = User()
+        st = State()
+        self.assertEqual(models.storage.count(), 3)
+        self.assertEqual(models.storage.count(User), 2)
+        self.assertEqual(models.storage.count("State"), 1)
+        self.assertEqual(models.storage.count("Place"), 0)
+        models.storage.delete(us1)
+        self.assertEqual(models.storage.count("User"), 1)
+
+    def test_all_of(self):
+        us = User()
+        st = State()
+        self.assertEqual(models.storage.all_of(User), {"User." + us.id: us})
+        self.assertEqual(models.storage.all_of("State"),
+                         {"State." + st.id: st})
+        self.assertEqual(models.storage.all_of("Place"), {})
+
+    def test_reload(self):
+        us = User()
+        st = State()
+        models.storage.save()
+        models.storage.lazy = True
+        models.storage.reload()
+        self.assertEqual(models.storage.count("User"), 1)
+        self.assertEqual(list(models.storage.all_of("User")),
+                         ["User." + us.id])
+        self.assertNotIn("State." + st.id,
+                         FileStorage._FileStorage__objects)
+
+    def test_objects_replaced(self):
+        User()
+        FileStorage._FileStorage__objects = {}
+        self.assertEqual(models.storage.count("User"), 0)
+
+
+class TestFileStorage_related(unittest.TestCase):
+    """Test case for the foreign key indexes of FileStorage."""
+
+    def tearDown(self) -> None:
+        """Defaults/resets FileStorage data."""
+        models.storage.lazy = False
+        FileStorage._FileStorage__objects = {}
+        if os.path.exists(FileStorage._FileStorage__file_path):
+            os.remove(FileStorage._FileStorage__file_path)
+
+    def test_related(self):
+        st = State()
+        cy1 = City()
+        cy1.state_id = st.id
+        cy2 = City()
+        self.assertEqual(models.storage.related(City, "state_id", st.id),
+                         {"City." + cy1.id: cy1})
+        self.assertEqual(st.cities, [cy1])
+        cy2.state_id = st.id
+        cy1.state_id = "other"
+        self.assertEqual(st.cities, [cy2])
+        models.storage.delete(cy2)
+        self.assertEqual(st.cities, [])
+
+    def test_index_built_on_first_related(self):
+        st = State()
+        cy1 = City()
+        cy1.state_id = st.id
+        indexes = FileStorage._FileStorage__indexes
+        self.assertFalse(indexes.built("City", "state_id"))
+        self.assertEqual(st.cities, [cy1])
+        self.assertTrue(indexes.built("City", "state_id"))
+        self.assertFalse(indexes.built("Place", "city_id"))
+        cy2 = City()
+        cy2.state_id = st.id
+        cy1.state_id = "other"
+        self.assertEqual(st.cities, [cy2])
+
+    def test_relation_set_on_instance(self):
+        st = State()
+        City().state_id = st.id
+        st.cities = "x"
+        self.assertEqual(st.cities, "x")
+        self.assertEqual(st.to_dict()["cities"], "x")
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(models.storage.get(State, st.id).cities, "x")
+
+    def test_related_unindexed_field(self):
+        us = User()
+        us.email = "a@b.c"
+        self.assertEqual(models.storage.related(User, "email", "a@b.c"),
+                         {"User." + us.id: us})
+
+    def test_related_after_reload(self):
+        pl = Place()
+        us = User()
+        rv = Review()
+        rv.place_id = pl.id
+        rv.user_id = us.id
+        pl.user_id = us.id
+        models.storage.save()
+        models.storage.lazy = True
+        models.storage.reload()
+        self.assertEqual([r.id for r in pl.reviews], [rv.id])
+        self.assertEqual([r.id for r in us.reviews], [rv.id])
+        self.assertEqual([p.id for p in us.places], [pl.id])
+
+
+class TestFileStorage_columns(unittest.TestCase):
+    """Test case for the numeric columns of FileStorage."""
+
+    def tearDown(self) -> None:
+        """Defaults/resets FileStorage data."""
+        models.storage.lazy = False
+        FileStorage._FileStorage__objects = {}
+        if os.path.exists(FileStorage._FileStorage__file_path):
+            os.remove(FileStorage._FileStorage__file_path)
+
+    def places(self):
+        places = [Place() for i in range(6)]
+        for i, pl in enumerate(places):
+            pl.price_by_night = i * 50
+            pl.max_guest = i % 3
+        return places
+
+    def test_search(self):
+        places = self.places()
+        self.assertEqual(
+            models.storage.search(Place, price_by_night=(50, 150)),
+            [pl.id for pl in places[1:4]])
+        self.assertEqual(
+            models.storage.search("Place", price_by_night=(100, None),
+                                  max_guest=2),
+            [places[2].id, places[5].id])
+
+    def test_search_follows_changes(self):
+        places = self.places()
+        places[0].price_by_night = 1000
+        models.storage.delete(places[5])
+        self.assertCountEqual(
+            models.storage.search(Place, price_by_night=(200, None)),
+            [places[4].id, places[0].id])
+        FileStorage._FileStorage__objects = {}
+        self.assertEqual(models.storage.search(Place, max_guest=0), [])
+
+    def test_columns_built_on_first_search(self):
+        places = self.places()
+        columns = FileStorage._FileStorage__columns
+        self.assertFalse(columns.built("Place"))
+        self.assertEqual(models.storage.search(Place, max_guest=1),
+                         [places[1].id, places[4].id])
+        self.assertTrue(columns.built("Place"))
+        places[1].max_guest = 0
+        pl = Place()
+        pl.max_guest = 1
+        self.assertCountEqual(models.storage.search(Place, max_guest=1),
+                              [places[4].id, pl.id])
+
+    def test_search_unset_field_lazy(self):
+        pl = Place()
+        pl.save()
+        expected = models.storage.search("Place", price_by_night=(0, 10))
+        self.assertEqual(expected, [pl.id])
+        models.storage.lazy = True
+        models.storage.reload()
+        self.assertEqual(FileStorage._FileStorage__objects, {})
+        self.assertEqual(
+            models.storage.search("Place", price_by_night=(0, 10)), expected)
+
+    def test_search_not_a_column(self):
+        places = self.places()
+        places[1].rating = 4
+        self.assertEqual(models.storage.search(Place, rating=(3, 5)),
+                         [places[1].id])
+
+    def test_search_after_reload(self):
+        places = self.places()
+        models.storage.save()
+        models.storage.lazy = True
+        models.storage.reload()
+        self.assertEqual(
+            models.storage.search(Place, price_by_night=(None, 50)),
+            [places[0].id, places[1].id])
+        self.assertEqual(FileStorage._FileStorage__objects, {})
+
+    def test_column(self):
+        places = self.places()
+        ids, values = models.storage.column(Place, "price_by_night")
+        self.assertEqual(ids, [pl.id for pl in places])
+        self.assertEqual(sum(values), 750)
+        with self.assertRaises(KeyError):
+            models.storage.column(Place, "name")
+
+
+class TestFileStorage_dirty(unittest.TestCase):
+    """Test case for the dirty tracking of FileStorage."""
+
+    def tearDown(self) -> None:
+        """Defaults/resets FileStorage data."""
+        FileStorage._FileStorage__objects = {}
+        if os.path.exists(FileStorage._FileStorage__file_path):
+            os.remove(FileStorage._FileStorage__file_path)
+
+    def test_save_encodes_changed_only(self):
+        us = User()
+        st = State()
+        models.storage.save()
+        us.first_name = "Betty"
+        with patch.object(BaseModel, "to_dict",
+                          autospec=True,
+                          side_effect=BaseModel.to_dict) as to_dict:
+            models.storage.save()
+        self.assertEqual(to_dict.call_count, 1)
+        self.assertIs(to_dict.call_args[0][0], us)
+
+    def test_save_output_unchanged(self):
+        us = User()
+        st = State()
+        models.storage.save()
+        st.name = "Lagos"
+        models.storage.save()
+        expected = json.dumps({k: v.to_dict()
+                               for k, v in models.storage.all().items()})
+        with open("file.json", "r") as f:
+            self.assertEqual(f.read(), expected)
+
+    def test_changed_in_place(self):
+        pl = Place()
+        pl.amenity_ids = ["a"]
+        pl.save()
+        pl.amenity_ids.append("b")
+        models.storage.save()
+        with open("file.json", "r") as f:
+            self.assertEqual(json.load(f)["Place." + pl.id]["amenity_ids"],
+                             ["a", "b"])
+
+    def test_cache_limit(self):
+        models.storage.cache_limit = 500
+        self.addCleanup(setattr, models.storage, "cache_limit", 1048576)
+        for i in range(20):
+            User()
+        models.storage.save()
+        encoded = FileStorage._FileStorage__encoded
+        self.assertTrue(0 < len(encoded) < 20)
+        self.assertLessEqual(sum(map(len, encoded.values())), 500)
+        with open("file.json", "r") as f:
+            self.assertEqual(len(json.load(f)), 20)
+
+    def test_cache_off(self):
+        models.storage.cache = False
+        try:
+            us = User()
+            models.storage.save()
+            self.assertEqual(FileStorage._FileStorage__encoded, {})
+            with patch.object(BaseModel, "to_dict",
+                              autospec=True,
+                              side_effect=BaseModel.to_dict) as to_dict:
+                models.storage.save()
+            self.assertEqual(to_dict.call_count, 1)
+            with open("file.json", "r") as f:
+                self.assertEqual(json.load(f), {"User." + us.id: us.to_dict()})
+        finally:
+            models.storage.cache = True
+
+    def test_touch_ignores_unknown_objects(self):
+        us = User(id="1", created_at="2023-10-14T10:28:45.815454",
+                  updated_at="2023-10-14T10:28:45.815454")
+        us.first_name = "Betty"
+        self.assertNotIn("User.1", models.storage.all())
+
+    def test_init_skips_touch(self):
+        with patch.object(models.storage, "touch") as touch:
+            us = User()
+        touch.assert_not_called()
+        self.assertIn("User." + us.id, models.storage.all())
+
+    def test_touch_only_flags(self):
+        us = User()
+        models.storage.save()
+        key = "User." + us.id
+        us.first_name = "Betty"
+        self.assertIn(key, FileStorage._FileStorage__encoded)
+        self.assertIn(key, FileStorage._FileStorage__changed)
+        models.storage.save()
+        with open("file.json", "r") as f:
+            self.assertEqual(json.load(f)[key]["first_name"], "Betty")
+
+
+class TestFileStorage_lazy(unittest.TestCase):
+    """Test case for the lazy reload mode of FileStorage."""
+
+    def setUp(self):
+        self.us = User()
+        self.st = State()
+        models.storage.save()
+        models.storage.lazy = True
+        models.storage.reload()
+
+    def tearDown(self) -> None:
+        """Defaults/resets FileStorage data."""
+        models.storage.lazy = False
+        FileStorage._FileStorage__objects = {}
+        if os.path.exists(FileStorage._FileStorage__file_path):
+            os.remove(FileStorage._FileStorage__file_path)
+
+    def test_reload_builds_nothing(self):
+        self.assertEqual(FileStorage._FileStorage__objects, {})
+
+    def test_get(self):
+        us = models.storage.get(User, self.us.id)
+        self.assertIsInstance(us, User)
+        self.assertEqual(us.to_dict(), self.us.to_dict())
+        self.assertIs(models.storage.get("User", self.us.id), us)
+        self.assertNotIn("State." + self.st.id,
+                         FileStorage._FileStorage__objects)
+        self.assertIsNone(models.storage.get(User, "missing"))
+
+    def test_all(self):
+        objs = models.storage.all()
+        self.assertIsInstance(objs["User." + self.us.id], User)
+        self.assertIsInstance(objs["State." + self.st.id], State)
+
+    def test_save_keeps_unloaded(self):
+        us = models.storage.get(User, self.us.id)
+        us.first_name = "Betty"
+        models.storage.save()
+        models.storage.lazy = False
+        models.storage.reload()
+        objs = models.storage.all()
+        self.assertEqual(objs["User." + self.us.id].first_name, "Betty")
+        self.assertIn("State." + self.st.id, objs)
+
+
+class TestFileStorage_format(unittest.TestCase):
+    """Test case for the pickle file format of FileStorage."""
+
+    def setUp(self):
+        models.storage.format = "pickle"
+
+    def tearDown(self) -> None:
+        """Defaults/resets FileStorage data."""
+        models.storage.format = None
+        models.storage.lazy = False
+        FileStorage._FileStorage__objects = {}
+        if os.path.exists(FileStorage._FileStorage__file_path):
+            os.remove(FileStorage._FileStorage__file_path)
+
+    def test_save_reload(self):
+        us = User()
+        us.first_name = "Betty"
+        pl = Place()
+        models.storage.save()
+        with open("file.json", "rb") as f:
+            self.assertFalse(f.read().startswith(b"{"))
+        models.storage.reload()
+        objs = models.storage.all()
+        self.assertEqual(objs["User." + us.id].to_dict(), us.to_dict())
+        self.assertEqual(objs["Place." + pl.id].to_dict(), pl.to_dict())
+
+    def test_lazy_save(self):
+        us = User()
+        models.storage.save()
+        models.storage.lazy = True
+        models.storage.reload()
+        models.storage.save()
+        models.storage.lazy = False
+        models.storage.reload()
+        self.assertEqual(models.storage.all()["User." + us.id].to_dict(),
+                         us.to_dict())
+
+    def test_switch_back_to_json(self):
+        us = User()
+        models.storage.save()
+        models.storage.format = None
+        models.storage.save()
+        with open("file.json", "r") as f:
+            self.assertIn("User." + us.id, json.load(f))
+
+    def test_other_format_raises(self):
+        models.storage.format = None
+        for i in range(3):
+            User()
+        models.storage.save()
+        with open("file.json") as f:
+            saved = f.read()
+        for name in ("pickle", "snapshot"):
+            models.storage.format = name
+            with self.assertRaises(FormatError):
+                models.storage.reload()
+        models.storage.format = None
+        models.storage.reload()
+        self.assertEqual(models.storage.count(), 3)
+        with open("file.json") as f:
+            self.assertEqual(f.read(), saved)
+
+    def test_default_path_of_format(self):
+        path = FileStorage._FileStorage__file_path
+        self.addCleanup(setattr, FileStorage, "_FileStorage__file_path", path)
+        with patch.dict(os.environ, {"HBNB_STORAGE_FORMAT": "pickle"}):
+            FileStorage()
+        self.assertEqual(FileStorage._FileStorage__file_path, "file.pickle")
+
+
+class TestFileStorage_snapshot(unittest.TestCase):
+    """Test case for the mapped snapshot format of FileStorage."""
+
+    def setUp(self):
+        models.storage.format = "snapshot"
+        self.us = User()
+        self.st = State()
+        self.pl = Place()
+        self.pl.user_id = self.us.id
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+
+    def tearDown(self) -> None:
+        """Defaults/resets FileStorage data."""
+        models.storage.format = None
+        models.storage.journaled = False
+        FileStorage._FileStorage__objects = {}
+        for path in (FileStorage._FileStorage__file_path,
+                     FileStorage._FileStorage__file_path + ".journal"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def loaded(self):
+        """Returns the keys decoded so far."""
+        return (set(FileStorage._FileStorage__objects) |
+                set(FileStorage._FileStorage__raw))
+
+    def test_reload_decodes_nothing(self):
+        with open("file.json", "rb") as f:
+            self.assertTrue(f.read().startswith(b"HBNBSNAP"))
+        self.assertEqual(self.loaded(), set())
+
+    def test_get(self):
+        us = models.storage.get(User, self.us.id)
+        self.assertEqual(us.to_dict(), self.us.to_dict())
+        self.assertIs(models.storage.get("User", self.us.id), us)
+        self.assertIsNone(models.storage.get(User, "missing"))
+        self.assertEqual(self.loaded(), {"User." + self.us.id})
+
+    def test_count(self):
+        self.assertEqual(models.storage.count("User"), 1)
+        self.assertEqual(models.storage.count(), 3)
+        self.assertEqual(self.loaded(), set())
+        User()
+        models.storage.delete(models.storage.get(State, self.st.id))
+        self.assertEqual(models.storage.count("User"), 2)
+        self.assertEqual(models.storage.count("State"), 0)
+        self.assertEqual(models.storage.count(), 3)
+
+    def test_related(self):
+        places = models.storage.related("Place", "user_id", self.us.id)
+        self.assertEqual(list(places), ["Place." + self.pl.id])
+        self.assertNotIn("User." + self.us.id, self.loaded())
+
+    def test_save_copies_unloaded(self):
+        us = models.storage.get(User, self.us.id)
+        us.first_name = "Betty"
+        models.storage.delete(models.storage.get(State, self.st.id))
+        models.storage.save()
+        self.assertEqual(self.loaded(), {"User." + self.us.id})
+        self.assertNotIn("State." + self.st.id, models.storage.all())
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        objs = models.storage.all()
+        self.assertEqual(set(objs), {"User." + self.us.id,
+                                     "Place." + self.pl.id})
+        self.assertEqual(objs["User." + self.us.id].first_name, "Betty")
+        self.assertEqual(objs["Place." + self.pl.id].to_dict(),
+                         self.pl.to_dict())
+
+    def test_journal(self):
+        models.storage.journaled = True
+        us = models.storage.get(User, self.us.id)
+        us.first_name = "Betty"
+        models.storage.delete(models.storage.get(State, self.st.id))
+        models.storage.save()
+        self.assertTrue(os.path.exists("file.json.journal"))
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(models.storage.count("State"), 0)
+        self.assertIsNone(models.storage.get(State, self.st.id))
+        self.assertEqual(models.storage.get(User, self.us.id).first_name,
+                         "Betty")
+        self.assertEqual(len(models.storage.all()), 2)
+
+
+class TestFileStorage_shared(unittest.TestCase):
+    """Test case for the multi-process mode of FileStorage."""
+
+    def setUp(self):
+        models.storage.shared = True
+        self.us = User()
+        models.storage.save()
+
+    def tearDown(self) -> None:
+        """Defaults/resets FileStorage data."""
+        models.storage.shared = False
+        FileStorage._FileStorage__objects = {}
+        for path in (FileStorage._FileStorage__file_path,
+                     FileStorage._FileStorage__file_path + ".lock"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def elsewhere(self, change):
+        """Changes the records in the file as another process would."""
+        with open("file.json") as f:
+            records = json.load(f)
+        change(records)
+        with open("file.json", "w") as f:
+            json.dump(records, f)
+
+    def test_save_merges(self):
+        st = State()
+        self.elsewhere(lambda records: records.update(
+            {"City.1": dict(self.us.to_dict(), id="1", __class__="City")}))
+        models.storage.save()
+        with open("file.json") as f:
+            self.assertEqual(set(json.load(f)), {
+                "User." + self.us.id, "State." + st.id, "City.1"})
+        self.assertIsNotNone(models.storage.get(City, "1"))
+        self.assertIs(models.storage.get(State, st.id), st)
+
+    def test_deleted_elsewhere(self):
+        self.elsewhere(lambda records: records.pop("User." + self.us.id))
+        State().save()
+        self.assertIsNone(models.storage.get(User, self.us.id))
+        self.assertEqual(models.storage.count(), 1)
+
+    def test_unchanged_save_does_not_read(self):
+        with patch.object(FileStorage, "_FileStorage__reload") as reload:
+            for i in range(3):
+                State().save()
+        reload.assert_not_called()
+        self.assertTrue(os.path.exists("file.json.lock"))
+
+    def test_refresh(self):
+        with patch.object(FileStorage, "_FileStorage__reload") as reload:
+            models.storage.refresh()
+        reload.assert_not_called()
+        st = State()
+        self.elsewhere(lambda records: records.update(
+            {"City.1": dict(self.us.to_dict(), id="1", __class__="City")}))
+        models.storage.refresh()
+        self.assertEqual(models.storage.count(City), 1)
+        self.assertIs(models.storage.get(State, st.id), st)
+
+    def test_processes(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        root = os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__)))))
+        env = dict(os.environ, HBNB_STORAGE_SHARED="1", PYTHONPATH=root)
+        script = ("from models.user import User\n"
+                  "for i in range(50):\n"
+                  "    User().save()\n")
+        writers = [subprocess.Popen([sys.executable, "-c", script],
+                                    env=env, cwd=tmp) for i in range(4)]
+        for writer in writers:
+            self.assertEqual(writer.wait(), 0)
+        with open(os.path.join(tmp, "file.json")) as f:
+            self.assertEqual(len(json.load(f)), 200)
+
+
+class TestFileStorage_batch(unittest.TestCase):
+    """Test case for the deferred saves of FileStorage."""
+
+    def tearDown(self) -> None:
+        """Defaults/resets FileStorage data."""
+        while models.storage.in_batch():
+            models.storage.commit()
+        FileStorage._FileStorage__objects = {}
+        if os.path.exists(FileStorage._FileStorage__file_path):
+            os.remove(FileStorage._FileStorage__file_path)
+
+    def test_batch_writes_once(self):
+        with patch("models.engine.file_storage.atomic_write") as write:
+            with models.storage.batch():
+                for _ in range(10):
+                    User().save()
+                self.assertEqual(write.call_count, 0)
+            self.assertEqual(write.call_count, 1)
+
+    def test_batch_output(self):
+        with models.storage.batch():
+            us = User()
+            us.save()
+            self.assertFalse(os.path.exists("file.json"))
+        with open("file.json", "r") as f:
+            self.assertIn("User." + us.id, f.read())
+
+    def test_rollback(self):
+        us = User()
+        us.save()
+        with patch("models.engine.file_storage.atomic_write") as write:
+            models.storage.begin()
+            models.storage.begin()
+            us.first_name = "Betty"
+            State().save()
+            models.storage.rollback()
+        self.assertEqual(write.call_count, 0)
+        self.assertFalse(models.storage.in_batch())
+        self.assertEqual(list(models.storage.all()), ["User." + us.id])
+        self.assertNotIn("first_name",
+                         models.storage.get(User, us.id).__dict__)
+
+    def test_nested(self):
+        with patch("models.engine.file_storage.atomic_write") as write:
+            with models.storage.batch():
+                with models.storage.batch():
+                    User().save()
+                self.assertEqual(write.call_count, 0)
+            self.assertEqual(write.call_count, 1)
+
+    def test_max_saves(self):
+        with patch("models.engine.file_storage.atomic_write") as write:
+            with models.storage.batch(max_saves=3):
+                for _ in range(7):
+                    User().save()
+                self.assertEqual(write.call_count, 2)
+            self.assertEqual(write.call_count, 3)
+
+    def test_max_seconds(self):
+        with patch("models.engine.file_storage.atomic_write") as write:
+            with models.storage.batch(max_seconds=0.001):
+                time.sleep(0.01)
+                User().save()
+                self.assertEqual(write.call_count, 1)
+
+    def test_no_save_no_write(self):
+        with patch("models.engine.file_storage.atomic_write") as write:
+            with models.storage.batch():
+                pass
+            self.assertEqual(write.call_count, 0)
+
+    def test_begin_commit(self):
+        models.storage.begin()
+        self.assertTrue(models.storage.in_batch())
+        User().save()
+        self.assertFalse(os.path.exists("file.json"))
+        models.storage.commit()
+        self.assertFalse(models.storage.in_batch())
+        self.assertTrue(os.path.exists("file.json"))
+        models.storage.commit()
+
+
+class TestFileStorage_async(unittest.TestCase):
+    """Test case for the background writes of FileStorage."""
+
+    def setUp(self):
+        models.storage.writer = BackgroundWriter()
+
+    def tearDown(self) -> None:
+        """Defaults/resets FileStorage data."""
+        models.storage.close()
+        models.storage.writer = None
+        models.storage.journaled = False
+        FileStorage._FileStorage__objects = {}
+        for path in (FileStorage._FileStorage__file_path,
+                     FileStorage._FileStorage__file_path + ".journal"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_flush(self):
+        us = User()
+        us.save()
+        models.storage.flush()
+        with open("file.json", "r") as f:
+            self.assertIn("User." + us.id, f.read())
+
+    def test_close(self):
+        us = User()
+        us.save()
+        models.storage.close()
+        with open("file.json", "r") as f:
+            self.assertIn("User." + us.id, f.read())
+
+    def test_coalesces(self):
+        with patch("models.engine.file_storage.atomic_write") as write:
+            busy = threading.Event()
+            models.storage.writer.submit(
+                lambda: busy.set() or time.sleep(0.1))
+            busy.wait()
+            for _ in range(5):
+                User().save()
+            models.storage.flush()
+        self.assertEqual(write.call_count, 1)
+
+    def test_journal(self):
+        models.storage.journaled = True
+        us = User()
+        models.storage.save()
+        for i in range(3):
+            us.first_name = str(i)
+            us.save()
+        models.storage.reload()
+        self.assertEqual(models.storage.all()["User." + us.id].first_name,
+                         "2")
+
+    def test_error_raised_on_flush(self):
+        with patch("models.engine.file_storage.atomic_write",
+                   side_effect=OSError("disk full")):
+            User().save()
+            with self.assertRaises(OSError):
+                models.storage.flush()
+
+
+class TestFileStorage_shards(unittest.TestCase):
+    """Test case for the sharded layout of FileStorage."""
+
+    directory = "file.json.d"
+
+    def setUp(self):
+        models.storage.shards = 4
+
+    def tearDown(self) -> None:
+        """Defaults/resets FileStorage data."""
+        models.storage.shards = 0
+        models.storage.lazy = False
+        FileStorage._FileStorage__objects = {}
+        shutil.rmtree(self.directory, ignore_errors=True)
+        if os.path.exists(FileStorage._FileStorage__file_path):
+            os.remove(FileStorage._FileStorage__file_path)
+
+    def test_reload_without_workers(self):
+        objs = [User() for _ in range(8)] + [State() for _ in range(8)]
+        models.storage.save()
+        with patch("models.engine.parallel.read_shards") as read_shards:
+            models.storage.reload()
+        read_shards.assert_not_called()
+        self.assertEqual(models.storage.count(), len(objs))
+
+    def test_save_layout(self):
+        us = User()
+        st = State()
+        models.storage.save()
+        self.assertFalse(os.path.exists("file.json"))
+        files = os.listdir(self.directory)
+        self.assertEqual(len(files), 2)
+        self.assertIn("User.{}.json".format(
+            shard_of("User." + us.id, 4)[1]), files)
+        self.assertIn("State.{}.json".format(
+            shard_of("State." + st.id, 4)[1]), files)
+
+    def test_save_rewrites_dirty_shards_only(self):
+        us = User()
+        for _ in range(20):
+            State()
+        models.storage.save()
+        us.first_name = "Betty"
+        with patch("models.engine.file_storage.atomic_write") as write:
+            models.storage.save()
+        self.assertEqual(write.call_count, 1)
+        self.assertEqual(write.call_args[0][0], os.path.join(
+            self.directory, "User.{}.json".format(
+                shard_of("User." + us.id, 4)[1])))
+
+    def test_reload(self):
+        us = User()
+        us.first_name = "Betty"
+        sts = [State() for _ in range(10)]
+        models.storage.save()
+        models.storage.reload()
+        objs = models.storage.all()
+        self.assertEqual(len(objs), 11)
+        self.assertEqual(objs["User." + us.id].first_name, "Betty")
+
+    def test_delete_removes_empty_shard(self):
+        us = User()
+        models.storage.save()
+        models.storage.delete(us)
+        models.storage.save()
+        self.assertEqual(os.listdir(self.directory), [])
+        models.storage.reload()
+        self.assertEqual(models.storage.all(), {})
+
+    def test_lazy_loads_needed_shards(self):
+        us = User()
+        sts = [State() for _ in range(10)]
+        models.storage.save()
+        models.storage.lazy = True
+        models.storage.reload()
+        unloaded = FileStorage._FileStorage__unloaded
+        self.assertEqual(len(unloaded), len(os.listdir(self.directory)))
+        self.assertEqual(models.storage.get(User, us.id).id, us.id)
+        self.assertNotIn(("User", shard_of("User." + us.id, 4)[1]), unloaded)
+        self.assertTrue(all(s[0] == "State" for s in unloaded))
+        self.assertEqual(models.storage.count(State), 10)
+        self.assertEqual(unloaded, {})
+
+    def test_lazy_save_keeps_unloaded(self):
+        sts = [State() for _ in range(10)]
+        models.storage.save()
+        models.storage.lazy = True
+        models.storage.reload()
+        User().save()
+        models.storage.lazy = False
+        models.storage.reload()
+        self.assertEqual(models.storage.count(State), 10)
+        self.assertEqual(models.storage.count(User), 1)
+
+    def test_change_bucket_count(self):
+        sts = [State() for _ in range(10)]
+        models.storage.save()
+        models.storage.shards = 2
+        models.storage.reload()
+        models.storage.save()
+        self.assertEqual(sorted(os.listdir(self.directory)),
+                         ["State.0.json", "State.1.json"])
+        models.storage.reload()
+        self.assertEqual(models.storage.count(State), 10)
+
+    def test_migrates_single_file(self):
+        models.storage.shards = 0
+        us = User()
+        models.storage.save()
+        models.storage.shards = 4
+        models.storage.reload()
+        models.storage.save()
+        os.remove("file.json")
+        models.storage.reload()
+        self.assertIn("User." + us.id, models.storage.all())
+
+
+class TestFileStorage_workers(unittest.TestCase):
+    """Test case for the parallel reload of FileStorage."""
+
+    def setUp(self):
+        models.storage.workers = 2
+
+    def tearDown(self) -> None:
+        """Defaults/resets FileStorage data."""
+        models.storage.workers = 0
+        models.storage.shards = 0
+        FileStorage._FileStorage__objects = {}
+        shutil.rmtree("file.json.d", ignore_errors=True)
+        if os.path.exists(FileStorage._FileStorage__file_path):
+            os.remove(FileStorage._FileStorage__file_path)
+
+    def test_reload(self):
+        objs = [User(), State(), Place(), City(), Review()]
+        objs[0].first_name = "Betty"
+        models.storage.save()
+        with patch("models.engine.parallel.pool") as pool:
+            models.storage.reload()
+        pool.assert_not_called()
+        for obj in objs:
+            key = "{}.{}".format(type(obj).__name__, obj.id)
+            self.assertEqual(models.storage.all()[key].to_dict(),
+                             obj.to_dict())
+
+    def test_reload_shards(self):
+        models.storage.shards = 2
+        objs = [User() for _ in range(5)] + [State() for _ in range(5)]
+        models.storage.save()
+        with patch("models.engine.parallel.read_shards",
+                   wraps=parallel.read_shards) as read_shards:
+            models.storage.reload()
+        self.assertEqual(read_shards.call_count, 1)
+        self.assertEqual(models.storage.count(), 10)
+        for obj in objs:
+            key = "{}.{}".format(type(obj).__name__, obj.id)
+            self.assertEqual(models.storage.all()[key].to_dict(),
+                             obj.to_dict())
+
+
+    def test_import_with_workers(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        root = os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__)))))
+        env = dict(os.environ, HBNB_STORAGE_SHARDS="3", PYTHONPATH=root)
+        subprocess.run([sys.executable, "-c", "import models\n"
+                        "from models.user import User\n"
+                        "for i in range(30):\n"
+                        "    User()\n"
+                        "models.storage.save()\n"],
+                       env=env, cwd=tmp, check=True, timeout=60)
+        env["HBNB_STORAGE_WORKERS"] = "2"
+        output = subprocess.run(
+            [sys.executable, "-c", "import models; "
+             "print(models.storage.count())"],
+            env=env, cwd=tmp, capture_output=True, text=True,
+            timeout=60).stdout
+        self.assertEqual(output, "30\n")
+
+
+class TestFileStorage_streaming(unittest.TestCase):
+    """Test case for the streaming reload of FileStorage."""
+
+    def setUp(self):
+        models.storage.streaming = True
+
+    def tearDown(self) -> None:
+        """Defaults/resets FileStorage data."""
+        models.storage.streaming = False
+        models.storage.journaled = False
+        models.storage.lazy = False
+        FileStorage._FileStorage__objects = {}
+        for path in (FileStorage._FileStorage__file_path,
+                     FileStorage._FileStorage__file_path + ".journal"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_reload(self):
+        objs = [User(), State(), Place(), City(), Review()]
+        objs[0].first_name = "Betty"
+        models.storage.save()
+        with patch("json.load") as load:
+            models.storage.reload()
+        self.assertEqual(load.call_count, 0)
+        for obj in objs:
+            key = "{}.{}".format(type(obj).__name__, obj.id)
+            self.assertEqual(models.storage.all()[key].to_dict(),
+                             obj.to_dict())
+
+    def test_reload_lazy(self):
+        us = User()
+        models.storage.save()
+        models.storage.lazy = True
+        models.storage.reload()
+        self.assertEqual(FileStorage._FileStorage__objects, {})
+        self.assertEqual(models.storage.get(User, us.id).to_dict(),
+                         us.to_dict())
+
+    def test_reload_journal(self):
+        models.storage.journaled = True
+        us = User()
+        st = State()
+        models.storage.save()
+        us.first_name = "Betty"
+        us.save()
+        models.storage.delete(st)
+        models.storage.save()
+        models.storage.reload()
+        self.assertEqual(models.storage.all()["User." + us.id].first_name,
+                         "Betty")
+        self.assertNotIn("State." + st.id, models.storage.all())
+
+    def test_reload_corrupt_keeps_objects(self):
+        us = User()
+        with open("file.json", "w") as f:
+            f.write('{"User.1": {"id": "1", "__class__": "User"}, "Us')
+        models.storage.reload()
+        self.assertEqual(list(models.storage.all()), ["User." + us.id])
+
+
+class TestFileStorage_journal(unittest.TestCase):
+    """Test case for the journaled save mode of FileStorage."""
+
+    def setUp(self):
+        models.storage.journaled = True
+
+    def tearDown(self) -> None:
+        """Defaults/resets FileStorage data."""
+        models.storage.journaled = False
+        FileStorage._FileStorage__objects = {}
+        for path in (FileStorage._FileStorage__file_path,
+                     FileStorage._FileStorage__file_path + ".journal"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_save_appends_changes_only(self):
+        us = User()
+        st = State()
+        models.storage.save()
+        with open("file.json", "r") as f:
+            snapshot = f.read()
+        us.first_name = "Betty"
+        us.save()
+        with open("file.json", "r") as f:
+            self.assertEqual(f.read(), snapshot)
+        with open("file.json.journal", "r") as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertIn("User." + us.id, lines[0])
+        self.assertNotIn(st.id, lines[0])
+
+    def test_reload_replays_journal(self):
+        us = User()
+        st = State()
+        models.storage.save()
+        us.first_name = "Betty"
+        us.save()
+        models.storage.delete(st)
+        models.storage.save()
+        models.storage.reload()
+        objs = models.storage.all()
+        self.assertEqual(objs["User." + us.id].first_name, "Betty")
+        self.assertNotIn("State." + st.id, objs)
+
+    def test_reload_skips_torn_record(self):
+        us = User()
+        models.storage.save()
+        us.save()
+        with open("file.json.journal", "a") as f:
+            f.write('{"op": "put", "key": "User.x"')
+        models.storage.reload()
+        self.assertIn("User." + us.id, models.storage.all())
+        self.assertNotIn("User.x", models.storage.all())
+
+    def test_compact(self):
+        us = User()
+        models.storage.save()
+        us.first_name = "Betty"
+        us.save()
+        models.storage.compact()
+        self.assertFalse(os.path.exists("file.json.journal"))
+        with open("file.json", "r") as f:
+            self.assertIn("Betty", f.read())
+
+    def test_compacts_at_limit(self):
+        models.storage.journal_limit = 2
+        try:
+            us = User()
+            models.storage.save()
+            us.save()
+            self.assertTrue(os.path.exists("file.json.journal"))
+            us.save()
+            self.assertFalse(os.path.exists("file.json.journal"))
+        finally:
+            models.storage.journal_limit = 10000
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,71 @@
+#!/usr/bin/python3
+"""Test cases for indexes
+"""
+import unittest
+from models.engine.indexes import ForeignKeyIndex, Indexes
+from models.city import City
+
+
+class TestForeignKeyIndex(unittest.TestCase):
+    """Test case for the ForeignKeyIndex class."""
+
+    def test_add_lookup(self):
+        idx = ForeignKeyIndex("state_id")
+        idx.add("City.1", "s1")
+        idx.add("City.2", "s1")
+        idx.add("City.3", "s2")
+        self.assertEqual(idx.lookup("s1"), ["City.1", "City.2"])
+        self.assertEqual(idx.lookup("s2"), ["City.3"])
+        self.assertEqual(idx.lookup("s3"), [])
+
+    def test_add_replaces(self):
+        idx = ForeignKeyIndex("state_id")
+        idx.add("City.1", "s1")
+        idx.add("City.1", "s2")
+        self.assertEqual(idx.lookup("s1"), [])
+        self.assertEqual(idx.lookup("s2"), ["City.1"])
+
+    def test_skips_empty(self):
+        idx = ForeignKeyIndex("state_id")
+        idx.add("City.1", "")
+        idx.add("City.2", ["s1"])
+        self.assertEqual(idx.lookup(""), [])
+
+    def test_remove(self):
+        idx = ForeignKeyIndex("state_id")
+        idx.add("City.1", "s1")
+        idx.remove("City.1")
+        idx.remove("City.2")
+        self.assertEqual(idx.lookup("s1"), [])
+
+
+class TestIndexes(unittest.TestCase):
+    """Test case for the Indexes class."""
+
+    def test_add_record(self):
+        idx = Indexes()
+        idx.add("Review.1", {"place_id": "p1", "user_id": "u1"})
+        self.assertEqual(idx.lookup("Review", "place_id", "p1"),
+                         ["Review.1"])
+        self.assertEqual(idx.lookup("Review", "user_id", "u1"),
+                         ["Review.1"])
+
+    def test_update(self):
+        idx = Indexes()
+        cy = City(id="1", state_id="s1")
+        idx.add("City.1", cy)
+        cy.__dict__["state_id"] = "s2"
+        idx.update("City.1", cy, "name")
+        self.assertEqual(idx.lookup("City", "state_id", "s1"), ["City.1"])
+        idx.update("City.1", cy, "state_id")
+        self.assertEqual(idx.lookup("City", "state_id", "s2"), ["City.1"])
+
+    def test_unindexed(self):
+        idx = Indexes()
+        idx.add("User.1", {"email": "a"})
+        with self.assertRaises(KeyError):
+            idx.lookup("User", "email", "a")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+#!/usr/bin/python3
+"""Test cases for journal
+"""
+import os
+import unittest
+from models.engine.journal import Journal
+
+
+class TestJournal(unittest.TestCase):
+    """Test case for the Journal class."""
+
+    path = "test.journal"
+
+    def tearDown(self) -> None:
+        """Removes the journal file."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_append_and_replay(self):
+        j = Journal(self.path)
+        j.append([("User.1", '{"id": "1"}')], ["User.2"])
+        self.assertEqual(j.records, 2)
+        self.assertEqual(list(j.replay()),
+                         [("put", "User.1", {"id": "1"}),
+                          ("delete", "User.2", None)])
+
+    def test_replay_missing_file(self):
+        self.assertEqual(list(Journal(self.path).replay()), [])
+
+    def test_append_after_torn_record(self):
+        with open(self.path, "w") as f:
+            f.write('{"op": "delete", "key": "User.1"}\n{"op": "put"')
+        j = Journal(self.path)
+        j.append([], ["User.3"])
+        self.assertEqual(list(j.replay()),
+                         [("delete", "User.1", None),
+                          ("delete", "User.3", None)])
+
+    def test_clear(self):
+        j = Journal(self.path)
+        j.append([], ["User.1"])
+        j.clear()
+        self.assertFalse(j.exists())
+        self.assertEqual(j.records, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
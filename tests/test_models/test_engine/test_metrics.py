@@ -0,0 +1,103 @@
+#!/usr/bin/python3
+"""Test cases for metrics
+"""
+import os
+import json
+import shutil
+import tempfile
+import unittest
+import models
+from models.engine import metrics
+from models.engine.file_storage import FileStorage
+from models.user import User
+
+
+class TestMetrics(unittest.TestCase):
+    """Test case for the counters, timers and sinks."""
+
+    def tearDown(self) -> None:
+        metrics.disable()
+        metrics.reset()
+        metrics.sinks.clear()
+
+    def test_disabled_timed(self):
+        @metrics.timed("work")
+        def work(x):
+            return x * 2
+        self.assertEqual(work(2), 4)
+        self.assertEqual(metrics.snapshot(), {"counters": {}, "timers": {}})
+
+    def test_enabled_timed(self):
+        @metrics.timed("work")
+        def work(x):
+            return x * 2
+        metrics.enable()
+        work(1)
+        work(2)
+        timer = metrics.snapshot()["timers"]["work"]
+        self.assertEqual(timer["calls"], 2)
+        self.assertGreaterEqual(timer["max_ms"], timer["mean_ms"])
+
+    def test_count_reset(self):
+        metrics.count("objects", 3)
+        metrics.count("objects")
+        self.assertEqual(metrics.snapshot()["counters"], {"objects": 4})
+        metrics.reset()
+        self.assertEqual(metrics.snapshot()["counters"], {})
+
+    def test_callback_sink(self):
+        events = []
+        metrics.add_sink(lambda *event: events.append(event))
+        metrics.count("objects", 2)
+        metrics.record("save", 0.5)
+        self.assertEqual(events, [("counter", "objects", 2),
+                                  ("timer", "save", 0.5)])
+
+    def test_file_sink(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        sink = metrics.FileSink(os.path.join(tmp, "metrics.jsonl"))
+        metrics.add_sink(sink)
+        metrics.count("objects", 2)
+        sink.close()
+        metrics.count("objects", 2)
+        with open(sink.path) as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(len(lines), 1)
+        self.assertEqual((lines[0]["kind"], lines[0]["name"],
+                          lines[0]["value"]), ("counter", "objects", 2))
+
+
+class TestMetrics_storage(unittest.TestCase):
+    """Test case for the metrics FileStorage records."""
+
+    def tearDown(self) -> None:
+        metrics.disable()
+        metrics.reset()
+        FileStorage._FileStorage__objects = {}
+        if os.path.exists(FileStorage._FileStorage__file_path):
+            os.remove(FileStorage._FileStorage__file_path)
+
+    def test_disabled(self):
+        User().save()
+        models.storage.reload()
+        self.assertEqual(metrics.snapshot(), {"counters": {}, "timers": {}})
+
+    def test_save_reload(self):
+        FileStorage._FileStorage__objects = {}
+        metrics.enable()
+        User().save()
+        User().save()
+        models.storage.reload()
+        stats = metrics.snapshot()
+        self.assertEqual(stats["counters"]["storage.objects_serialized"], 2)
+        self.assertEqual(stats["counters"]["storage.objects_loaded"], 2)
+        self.assertEqual(stats["timers"]["storage.save"]["calls"], 2)
+        self.assertEqual(stats["timers"]["storage.reload"]["calls"], 1)
+        path = FileStorage._FileStorage__file_path
+        self.assertGreater(stats["counters"]["storage.bytes_written"],
+                           os.path.getsize(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+#!/usr/bin/python3
+"""Test cases for parallel
+"""
+import os
+import shutil
+import unittest
+from models.engine import parallel
+
+
+class TestParallel(unittest.TestCase):
+    """Test case for the parallel module."""
+
+    directory = "test.d"
+
+    def tearDown(self) -> None:
+        """Removes the shard directory."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_in_worker(self):
+        self.assertFalse(parallel.in_worker())
+
+    def test_read_shards(self):
+        os.makedirs(self.directory)
+        paths = []
+        for i in range(3):
+            paths.append(os.path.join(self.directory,
+                                      "User.{}.json".format(i)))
+            with open(paths[-1], "w") as f:
+                f.write('{{"User.{0}": {{"id": "{0}", "created_at": '
+                        '"2023-10-14T10:28:45"}}}}'.format(i))
+        shards = parallel.read_shards(paths, "json", 2)
+        self.assertEqual([[k for k, _ in s] for s in shards],
+                         [["User.0"], ["User.1"], ["User.2"]])
+        self.assertEqual(shards[0][0][1]["created_at"],
+                         "2023-10-14T10:28:45")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+#!/usr/bin/python3
+"""Test cases for query
+"""
+import os
+import unittest
+from unittest.mock import patch
+import models
+from models.engine.file_storage import FileStorage
+from models.engine.query import Query, parse_condition, matches
+from models.place import Place
+from models.city import City
+from models.user import User
+
+
+class TestHelpers(unittest.TestCase):
+    """Test case for parse_condition and matches."""
+
+    def test_parse_condition(self):
+        self.assertEqual(parse_condition("price__lt", 3),
+                         ("price", "lt", 3))
+        self.assertEqual(parse_condition("city_id", "x"),
+                         ("city_id", "eq", "x"))
+        self.assertEqual(parse_condition("a__b", 1), ("a__b", "eq", 1))
+
+    def test_matches(self):
+        pl = Place(id="1", price_by_night=50)
+        self.assertTrue(matches(pl, [("price_by_night", "le", 50)]))
+        self.assertFalse(matches(pl, [("price_by_night", "lt", 50)]))
+        self.assertFalse(matches(pl, [("price_by_night", "lt", "50")]))
+        self.assertFalse(matches(pl, [("rating", "eq", None)]))
+        self.assertTrue(matches(pl, [("name", "eq", "")]))
+
+
+class TestQuery(unittest.TestCase):
+    """Test case for the Query class."""
+
+    def setUp(self):
+        self.city = City()
+        self.places = []
+        for i in range(6):
+            pl = Place()
+            pl.name = "p{}".format(i)
+            pl.price_by_night = i * 10
+            pl.max_guest = i % 3
+            if i % 2:
+                pl.city_id = self.city.id
+            self.places.append(pl)
+
+    def tearDown(self) -> None:
+        """Defaults/resets FileStorage data."""
+        models.storage.lazy = False
+        FileStorage._FileStorage__objects = {}
+        if os.path.exists(FileStorage._FileStorage__file_path):
+            os.remove(FileStorage._FileStorage__file_path)
+
+    def names(self, query):
+        return [pl.name for pl in query]
+
+    def test_all(self):
+        query = models.storage.query(Place)
+        self.assertIsInstance(query, Query)
+        self.assertCountEqual(query.all(), self.places)
+        self.assertEqual(query.count(), 6)
+
+    def test_where(self):
+        query = models.storage.query("Place")
+        self.assertCountEqual(
+            self.names(query.where(price_by_night__gt=10,
+                                   price_by_night__le=40)),
+            ["p2", "p3", "p4"])
+        self.assertCountEqual(
+            self.names(query.where(city_id=self.city.id, max_guest=0)),
+            ["p3"])
+        self.assertCountEqual(
+            self.names(query.where(name__in=("p0", "p5"))), ["p0", "p5"])
+        self.assertCountEqual(
+            self.names(query.where(max_guest__ne=0)),
+            ["p1", "p2", "p4", "p5"])
+        self.assertEqual(query.count(), 6)
+
+    def test_order_limit_offset(self):
+        query = models.storage.query(Place)
+        self.assertEqual(self.names(query.order_by("-price_by_night")),
+                         ["p5", "p4", "p3", "p2", "p1", "p0"])
+        self.assertEqual(
+            self.names(query.order_by("max_guest", "-price_by_night")),
+            ["p3", "p0", "p4", "p1", "p5", "p2"])
+        self.assertEqual(
+            self.names(query.order_by("price_by_night").offset(1).limit(2)),
+            ["p1", "p2"])
+        self.assertEqual(query.order_by("price_by_night").offset(5)
+                         .limit(2).count(), 1)
+        self.assertEqual(query.order_by("-price_by_night").first().name,
+                         "p5")
+        self.assertIsNone(query.where(name="none").first())
+
+    def test_order_missing_last(self):
+        self.places[2].rating = 1
+        self.places[4].rating = 2
+        query = models.storage.query(Place)
+        self.assertEqual(self.names(query.order_by("rating").limit(2)),
+                         ["p2", "p4"])
+        self.assertEqual(self.names(query.order_by("-rating").limit(2)),
+                         ["p4", "p2"])
+
+    def test_order_mixed_types(self):
+        self.places[1].rating = "good"
+        self.places[2].rating = 3
+        self.places[3].rating = 2.5
+        query = models.storage.query(Place)
+        self.assertEqual(self.names(query.order_by("rating").limit(3)),
+                         ["p3", "p2", "p1"])
+        self.assertEqual(self.names(query.order_by("-rating").limit(3)),
+                         ["p1", "p2", "p3"])
+
+    def test_only(self):
+        query = models.storage.query(Place).where(price_by_night=50)
+        self.assertEqual(query.only("name", "max_guest").all(),
+                         [{"name": "p5", "max_guest": 2}])
+
+    def test_uses_indexes(self):
+        query = models.storage.query(Place)
+        with patch.object(FileStorage, "all_of") as all_of:
+            self.assertEqual(
+                self.names(query.where(city_id=self.city.id,
+                                       price_by_night__lt=20)), ["p1"])
+            self.assertEqual(
+                self.names(query.where(price_by_night__ge=50)), ["p5"])
+        self.assertEqual(all_of.call_count, 0)
+
+    def test_chaining_copies(self):
+        query = models.storage.query(Place)
+        cheap = query.where(price_by_night__lt=20)
+        self.assertEqual(query.count(), 6)
+        self.assertEqual(cheap.count(), 2)
+        with self.assertRaises(ValueError):
+            query.limit(-1)
+
+    def test_lazy_reload(self):
+        models.storage.save()
+        models.storage.lazy = True
+        models.storage.reload()
+        query = models.storage.query(Place).where(price_by_night__ge=40)
+        self.assertCountEqual(self.names(query), ["p4", "p5"])
+
+    def test_other_class(self):
+        us = User()
+        us.email = "a@b.c"
+        self.assertEqual(models.storage.query(User).where(
+            email="a@b.c").all(), [us])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+#!/usr/bin/python3
+"""Test cases for serializers
+"""
+import io
+import json
+import unittest
+from datetime import datetime
+from models.engine import serializers
+from models.engine.serializers import JSONSerializer, PickleSerializer
+from models.user import User
+
+
+class TestSerializers(unittest.TestCase):
+    """Test case for the serializers module."""
+
+    def setUp(self):
+        self.us = User(id="1", created_at="2023-10-14T10:28:45.815454",
+                       updated_at="2023-10-14T10:28:45.815543",
+                       first_name="Betty")
+
+    def test_for_path(self):
+        self.assertIsInstance(serializers.for_path("file.json"),
+                              JSONSerializer)
+        self.assertIsInstance(serializers.for_path("file.pickle"),
+                              PickleSerializer)
+        self.assertIsInstance(serializers.for_path("file.pkl"),
+                              PickleSerializer)
+        self.assertIsInstance(serializers.for_path("file"), JSONSerializer)
+        self.assertIsInstance(serializers.for_path("file.json", "pickle"),
+                              PickleSerializer)
+
+    def test_json_round_trip(self):
+        s = JSONSerializer()
+        f = io.StringIO()
+        s.dump([("User.1", s.encode(self.us))], f)
+        self.assertEqual(f.getvalue(),
+                         json.dumps({"User.1": self.us.to_dict()}))
+        f.seek(0)
+        self.assertEqual(s.load(f), {"User.1": self.us.to_dict()})
+
+    def test_json_dump_streams(self):
+        s = JSONSerializer()
+        f = io.StringIO()
+        writes = []
+        f.write = writes.append
+        s.dump([("User.1", s.encode(self.us)), ("User.2", "{}")], f)
+        self.assertGreater(len(writes), 2)
+        self.assertEqual("".join(writes), json.dumps(
+            {"User.1": self.us.to_dict(), "User.2": {}}))
+
+    def test_json_dump_empty(self):
+        f = io.StringIO()
+        JSONSerializer().dump([], f)
+        self.assertEqual(f.getvalue(), "{}")
+
+    def test_json_encode_record(self):
+        s = JSONSerializer()
+        record = {"created_at": datetime(2023, 10, 14)}
+        self.assertEqual(json.loads(s.encode_record(record)),
+                         {"created_at": "2023-10-14T00:00:00"})
+
+    def test_json_iterload(self):
+        s = JSONSerializer()
+        records = {"User.{}".format(i): {"id": str(i), "text": "}\", {"}
+                   for i in range(20)}
+        for text in (json.dumps(records), json.dumps(records, indent=4)):
+            for size in (1, 7, 65536):
+                self.assertEqual(
+                    list(s.iterload(io.StringIO(text), size)),
+                    list(records.items()))
+        self.assertEqual(list(s.iterload(io.StringIO(" {} "))), [])
+
+    def test_json_iterload_errors(self):
+        s = JSONSerializer()
+        for text in ('', '[]', '{"User.1": {}', '{"User.1" {}}',
+                     '{"User.1": {"id": }}'):
+            with self.assertRaises(json.JSONDecodeError):
+                list(s.iterload(io.StringIO(text), 4))
+
+    def test_pickle_iterload(self):
+        s = PickleSerializer()
+        f = io.BytesIO()
+        s.dump([("User.1", s.encode(self.us))], f)
+        f.seek(0)
+        self.assertEqual([k for k, _ in s.iterload(f)], ["User.1"])
+
+    def test_pickle_round_trip(self):
+        s = PickleSerializer()
+        f = io.BytesIO()
+        s.dump([("User.1", s.encode(self.us)),
+                ("User.2", s.encode_record(self.us.to_dict()))], f)
+        f.seek(0)
+        records = s.load(f)
+        self.assertEqual(list(records), ["User.1", "User.2"])
+        for record in records.values():
+            self.assertEqual(record["created_at"], self.us.created_at)
+            self.assertEqual(record["updated_at"], self.us.updated_at)
+            self.assertEqual(record["first_name"], "Betty")
+            self.assertEqual(record["__class__"], "User")
+            self.assertEqual(User(**record).to_dict(), self.us.to_dict())
+
+
+if __name__ == "__main__":
+    unittest.main()
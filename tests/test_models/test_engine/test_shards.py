@@ -0,0 +1,48 @@
+#!/usr/bin/python3
+"""Test cases for shards
+"""
+import os
+import shutil
+import unittest
+from models.engine.shards import shard_of, shard_path, list_shards
+
+
+class TestShards(unittest.TestCase):
+    """Test case for the shards module."""
+
+    directory = "test.d"
+
+    def tearDown(self) -> None:
+        """Removes the shard directory."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_shard_of(self):
+        self.assertEqual(shard_of("User.abc", 0), ("User", 0))
+        self.assertEqual(shard_of("User.abc", 1), ("User", 0))
+        name, bucket = shard_of("User.abc", 4)
+        self.assertEqual(name, "User")
+        self.assertIn(bucket, range(4))
+        self.assertEqual(shard_of("User.abc", 4), (name, bucket))
+
+    def test_spread(self):
+        buckets = {shard_of("User.{}".format(i), 4)[1] for i in range(100)}
+        self.assertEqual(buckets, {0, 1, 2, 3})
+
+    def test_shard_path(self):
+        self.assertEqual(shard_path("d", ("User", 2), ".json"),
+                         os.path.join("d", "User.2.json"))
+
+    def test_list_shards(self):
+        self.assertEqual(list_shards(self.directory, ".json"), {})
+        os.makedirs(self.directory)
+        for name in ("User.0.json", "BaseModel.3.json", "User.0.pickle",
+                     "notes.txt", ".User.0.json.x.tmp"):
+            open(os.path.join(self.directory, name), "w").close()
+        self.assertEqual(list_shards(self.directory, ".json"), {
+            ("User", 0): os.path.join(self.directory, "User.0.json"),
+            ("BaseModel", 3): os.path.join(self.directory,
+                                           "BaseModel.3.json")})
+
+
+if __name__ == "__main__":
+    unittest.main()
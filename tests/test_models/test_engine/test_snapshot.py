@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+"""Test cases for snapshot
+"""
+import io
+import unittest
+from models.engine.snapshot import Snapshot, SnapshotError, dump
+
+
+def snapshot_of(records):
+    """Returns the bytes of the snapshot of records."""
+    f = io.BytesIO()
+    dump(((k, v.encode()) for k, v in records.items()), f)
+    return f.getvalue()
+
+
+class TestSnapshot(unittest.TestCase):
+    """Test case for the snapshot format."""
+
+    def setUp(self):
+        self.records = {"User.b": '{"id": "b"}', "City.a": '{"id": "a"}',
+                        "User.a": '{"id": "a", "name": "Betty"}'}
+        self.snapshot = Snapshot(data=snapshot_of(self.records))
+
+    def test_sorted_keys(self):
+        self.assertEqual(len(self.snapshot), 3)
+        self.assertEqual(list(self.snapshot.keys()),
+                         ["City.a", "User.a", "User.b"])
+
+    def test_find(self):
+        self.assertEqual(self.snapshot.find("User.b"), 2)
+        self.assertEqual(self.snapshot.find("User.c"), -1)
+        self.assertEqual(self.snapshot.find("Place.a"), -1)
+        self.assertIn("City.a", self.snapshot)
+        self.assertNotIn("City.b", self.snapshot)
+
+    def test_records(self):
+        self.assertEqual(self.snapshot.get("User.a"),
+                         {"id": "a", "name": "Betty"})
+        self.assertIsNone(self.snapshot.get("User.c"))
+        self.assertEqual(self.snapshot.text(0), b'{"id": "a"}')
+
+    def test_classes(self):
+        self.assertEqual(self.snapshot.range("User"), (1, 3))
+        self.assertEqual(self.snapshot.range("Place"), (0, 0))
+        self.assertEqual(list(self.snapshot.keys("User")),
+                         ["User.a", "User.b"])
+        self.assertEqual(dict(self.snapshot.items("City")),
+                         {"City.a": {"id": "a"}})
+
+    def test_empty(self):
+        snapshot = Snapshot(data=snapshot_of({}))
+        self.assertEqual(len(snapshot), 0)
+        self.assertEqual(snapshot.find("User.a"), -1)
+
+    def test_invalid(self):
+        data = snapshot_of(self.records)
+        for bad in (b"", b"{}", b"X" + data[1:], data[:60]):
+            with self.assertRaises(SnapshotError):
+                Snapshot(data=bad)
+
+
+if __name__ == "__main__":
+    unittest.main()
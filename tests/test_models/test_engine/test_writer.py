@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+"""Test cases for writer
+"""
+import time
+import threading
+import unittest
+from models.engine.writer import BackgroundWriter
+
+
+class TestBackgroundWriter(unittest.TestCase):
+    """Test case for the BackgroundWriter class."""
+
+    def setUp(self):
+        self.writer = BackgroundWriter()
+
+    def tearDown(self) -> None:
+        """Stops the writer thread."""
+        self.writer.close()
+
+    def test_runs_in_order(self):
+        done = []
+        for i in range(5):
+            self.writer.submit(lambda i=i: done.append(i))
+        self.writer.flush()
+        self.assertEqual(done, [0, 1, 2, 3, 4])
+        self.assertEqual(self.writer.pending(), 0)
+
+    def test_runs_on_other_thread(self):
+        threads = []
+        self.writer.submit(lambda: threads.append(threading.get_ident()))
+        self.writer.flush()
+        self.assertNotEqual(threads, [threading.get_ident()])
+
+    def test_snapshot_replaces_waiting_jobs(self):
+        done = []
+        self.writer.submit(lambda: time.sleep(0.1))
+        self.writer.submit(lambda: done.append("append"))
+        self.writer.submit(lambda: done.append(1), snapshot=True)
+        self.writer.submit(lambda: done.append(2), snapshot=True)
+        self.writer.submit(lambda: done.append("after"))
+        self.writer.flush()
+        self.assertEqual(done, [2, "after"])
+
+    def test_close_drains(self):
+        done = []
+        self.writer.submit(lambda: time.sleep(0.05))
+        self.writer.submit(lambda: done.append(1))
+        self.writer.close()
+        self.assertEqual(done, [1])
+        self.writer.submit(lambda: done.append(2))
+        self.writer.flush()
+        self.assertEqual(done, [1, 2])
+
+    def test_error(self):
+        def fail():
+            raise OSError("disk full")
+        self.writer.submit(fail)
+        with self.assertRaises(OSError):
+            self.writer.flush()
+        self.writer.flush()
+
+
+if __name__ == "__main__":
+    unittest.main()